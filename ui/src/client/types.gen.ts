@@ -153,7 +153,7 @@ export type AttendanceItem = {
 
 export type CopyAssignmentsRequest = {
     source_day_id: number;
-    target_day_id: number;
+    target_day_ids: Array<number>;
     overwrite_existing?: boolean;
     replace_all?: boolean;
 };
@@ -167,6 +167,7 @@ export type CopyAssignmentsResponse = {
  * Simplified day assignment item for user-facing API
  */
 export type DayAssignmentItem = {
+    user_day_id: number;
     name: string;
     telegram: string | null;
     position: string;
@@ -179,6 +180,7 @@ export type DayAssignmentItem = {
 export type DayAssignmentsResponse = {
     assignments: Array<DayAssignmentItem>;
     is_published: boolean;
+    version: number;
 };
 
 export type DayOutAdmin = {
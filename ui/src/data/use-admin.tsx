@@ -499,10 +499,12 @@ export const useCopyAssignments = () => {
       return response.data;
     },
     onSuccess: (_, variables) => {
-      // Invalidate assignments for the target day
-      queryClient.invalidateQueries({
-        queryKey: queryKeys.admin.assignments.day(variables.target_day_id),
-      });
+      // Invalidate assignments for the target days
+      for (const dayId of variables.target_day_ids) {
+        queryClient.invalidateQueries({
+          queryKey: queryKeys.admin.assignments.day(dayId),
+        });
+      }
       // Also invalidate assignments for the source day in case it's being viewed
       queryClient.invalidateQueries({
         queryKey: queryKeys.admin.assignments.day(variables.source_day_id),
@@ -1,5 +1,10 @@
 import { useQueryClient } from "@tanstack/react-query";
 import { useEffect } from "react";
+import type {
+  DayAssignmentItem,
+  DayAssignmentsResponse,
+} from "@/client/types.gen";
+import { queryKeys } from "@/data/query-keys";
 import { getSocket } from "@/lib/socket";
 
 interface AssignmentUpdateEvent {
@@ -9,16 +14,77 @@ interface AssignmentUpdateEvent {
     | "deleted"
     | "published"
     | "unpublished"
-    | "bulk_created";
+    | "bulk_created"
+    | "changed"
+    // Too large to pass between server workers, so it carries no changes
+    | "refetch";
   day_id: number;
-  assignment?: {
-    user_day_id: number;
-  } | null;
+  // The changes apply on top of this version of the day's assignments
+  base_version: number;
+  version: number;
+  published: boolean;
+  assignments: DayAssignmentItem[];
+  deleted: number[];
+  user_day_ids: number[];
 }
 
+// Acknowledgement of a subscription that resumes from a cached copy
+interface SubscribeReply {
+  events?: AssignmentUpdateEvent[];
+  snapshot?: {
+    version: number;
+    published: boolean;
+    assignments: DayAssignmentItem[];
+  };
+}
+
+/**
+ * Apply an event to the cached assignments of a day.
+ * Returns undefined when the cache cannot be brought up to date and must be refetched.
+ */
+const applyUpdate = (
+  data: DayAssignmentsResponse | undefined,
+  event: AssignmentUpdateEvent,
+): DayAssignmentsResponse | undefined => {
+  if (!data || data.is_published !== event.published) {
+    return undefined;
+  }
+  if (data.version >= event.version) {
+    return data;
+  }
+  if (data.version !== event.base_version || event.type === "refetch") {
+    return undefined;
+  }
+
+  const updated = new Map(
+    event.assignments.map((assignment) => [assignment.user_day_id, assignment]),
+  );
+  const deleted = new Set(event.deleted);
+  // Updated rows keep their place, created ones go last like in the API
+  const assignments = data.assignments.flatMap((assignment) => {
+    if (deleted.has(assignment.user_day_id)) {
+      return [];
+    }
+    const update = updated.get(assignment.user_day_id);
+    if (update) {
+      updated.delete(assignment.user_day_id);
+      return [update];
+    }
+    return [assignment];
+  });
+  return {
+    ...data,
+    version: event.version,
+    assignments: [...assignments, ...updated.values()],
+  };
+};
+
 /**
  * Hook to subscribe to real-time assignment updates for a specific day.
- * Automatically refetches assignment data when updates are received.
+ * Applies the changes carried by the updates to the cached assignments, and
+ * refetches them only when the cache is missing an earlier update. After a
+ * reconnect the subscription resumes from the cached version, so the server
+ * sends what was missed instead of every client refetching the day.
  *
  * @param dayId - The ID of the day to subscribe to
  * @param yearId - The year ID for query invalidation
@@ -35,38 +101,86 @@ export const useAssignmentUpdates = (
     if (!enabled || !dayId) return;
 
     const socket = getSocket();
+    const adminKey = ["admin", "assignments", "day", String(dayId)];
+    const yearKey = yearId
+      ? queryKeys.year.dayAssignments(yearId, dayId)
+      : undefined;
+
+    const applyEvent = (event: AssignmentUpdateEvent) => {
+      // The admin view has its own format, so it still refetches
+      queryClient.invalidateQueries({ queryKey: adminKey });
+      if (!yearKey) {
+        return;
+      }
+      const data = queryClient.getQueryData<DayAssignmentsResponse>(yearKey);
+      const updated = applyUpdate(data, event);
+      if (updated) {
+        queryClient.setQueryData(yearKey, updated);
+      } else {
+        queryClient.invalidateQueries({ queryKey: yearKey });
+      }
+    };
+
+    // Events received while a subscription is being resumed wait for its reply
+    let pending: AssignmentUpdateEvent[] | null = null;
 
-    // Subscribe to assignment updates for this day
-    socket.emit("subscribe_day_assignments", { day_id: dayId });
+    const subscribe = async () => {
+      const data = yearKey
+        ? queryClient.getQueryData<DayAssignmentsResponse>(yearKey)
+        : undefined;
+      if (!data) {
+        socket.emit("subscribe_day_assignments", { day_id: dayId });
+        return;
+      }
+      pending = [];
+      try {
+        const reply: SubscribeReply | null = await socket.emitWithAck(
+          "subscribe_day_assignments",
+          {
+            day_id: dayId,
+            last_version: data.version,
+            published: data.is_published,
+          },
+        );
+        if (reply?.snapshot && yearKey) {
+          queryClient.invalidateQueries({ queryKey: adminKey });
+          queryClient.setQueryData<DayAssignmentsResponse>(yearKey, {
+            assignments: reply.snapshot.assignments,
+            is_published: reply.snapshot.published,
+            version: reply.snapshot.version,
+          });
+        }
+        reply?.events?.forEach(applyEvent);
+      } finally {
+        const received = pending;
+        pending = null;
+        received.forEach(applyEvent);
+      }
+    };
 
     // Handle assignment update events
     const handleAssignmentUpdate = (event: AssignmentUpdateEvent) => {
-      console.log("Assignment update received:", event);
-
       if (event.day_id !== dayId) {
         return;
       }
-
-      const adminKey = ["admin", "assignments", "day", String(dayId)];
-      const yearKey = [
-        "year",
-        String(yearId),
-        "day",
-        String(dayId),
-        "assignments",
-      ];
-
-      queryClient.invalidateQueries({ queryKey: adminKey });
-      if (yearId) {
-        queryClient.invalidateQueries({ queryKey: yearKey });
+      if (pending) {
+        pending.push(event);
+      } else {
+        applyEvent(event);
       }
     };
 
     socket.on("assignment_updated", handleAssignmentUpdate);
+    // Rooms do not survive a reconnect, so subscribe again each time
+    socket.on("connect", subscribe);
+    if (socket.connected) {
+      subscribe();
+    }
 
     // Cleanup on unmount
     return () => {
       socket.off("assignment_updated", handleAssignmentUpdate);
+      socket.off("connect", subscribe);
       socket.emit("unsubscribe_day_assignments", { day_id: dayId });
     };
   }, [dayId, yearId, enabled, queryClient]);
@@ -1,4 +1,5 @@
 import { io, type Socket } from "socket.io-client";
+import { authStore } from "@/store/auth";
 
 let socket: Socket | null = null;
 
@@ -14,6 +15,8 @@ export const getSocket = (): Socket => {
 
     socket = io(socketUrl, {
       path: "/socket.io/",
+      // Read on every (re)connection, so a refreshed token is picked up
+      auth: (cb) => cb({ token: authStore.getAccessToken() }),
       transports: ["polling", "websocket"], // Try polling first, then upgrade to websocket
       reconnection: true,
       reconnectionDelay: 1000,
@@ -1155,7 +1155,7 @@ function RouteComponent() {
     copyAssignmentsMutation.mutate(
       {
         source_day_id: Number(selectedSourceDayId),
-        target_day_id: Number(dayId),
+        target_day_ids: [Number(dayId)],
         replace_all: copyMethod === "replace",
         overwrite_existing: copyMethod === "overwrite",
       },
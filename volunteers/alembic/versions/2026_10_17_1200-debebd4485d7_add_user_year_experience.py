@@ -0,0 +1,91 @@
+"""add user_year_experience
+
+Revision ID: debebd4485d7
+Revises: 1a2b3c4d5e6f
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "debebd4485d7"
+down_revision: str | None = "1a2b3c4d5e6f"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_year_experience",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("year_id", sa.Integer(), nullable=False),
+        sa.Column("experience", sa.Double(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["year_id"], ["years.id"]),
+        sa.PrimaryKeyConstraint("user_id", "year_id"),
+    )
+    # Initial fill, same formula as volunteers.core.experience.user_year_experience_query.
+    # Attendance is stored by enum name.
+    op.execute(
+        """
+        INSERT INTO user_year_experience (user_id, year_id, experience)
+        SELECT
+            f.user_id,
+            f.year_id,
+            COALESCE(att.attendance_sum / md.mandatory_days, 0.0)
+                + COALESCE(asm.assessments_sum, 0.0)
+        FROM application_forms f
+        LEFT JOIN (
+            SELECT year_id, count(id) AS mandatory_days
+            FROM days
+            WHERE mandatory IS true
+            GROUP BY year_id
+        ) md ON md.year_id = f.year_id
+        LEFT JOIN (
+            SELECT
+                ud.application_form_id,
+                sum(
+                    COALESCE(d.score, 0.0)
+                    * CASE ud.attendance::text
+                        WHEN 'YES' THEN 1.0
+                        WHEN 'LATE' THEN 0.5
+                        ELSE 0.0
+                    END
+                    * COALESCE(NULLIF(p.score, 0.0), 1.0)
+                ) AS attendance_sum
+            FROM user_days ud
+            JOIN days d ON ud.day_id = d.id
+            JOIN positions p ON ud.position_id = p.id
+            WHERE d.mandatory IS true
+            GROUP BY ud.application_form_id
+        ) att ON att.application_form_id = f.id
+        LEFT JOIN (
+            SELECT ud.application_form_id, sum(a.value) AS assessments_sum
+            FROM user_days ud
+            JOIN assessments a ON a.user_day_id = ud.id
+            GROUP BY ud.application_form_id
+        ) asm ON asm.application_form_id = f.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_year_experience")
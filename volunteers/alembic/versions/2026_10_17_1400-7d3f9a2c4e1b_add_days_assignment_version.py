@@ -0,0 +1,31 @@
+"""add days.assignment_version
+
+Revision ID: 7d3f9a2c4e1b
+Revises: 5c2e8f1a9b7d
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7d3f9a2c4e1b"
+down_revision: str | None = "5c2e8f1a9b7d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "days",
+        sa.Column("assignment_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("days", "assignment_version")
@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from volunteers.api.deps import READ_PRIMARY_COOKIE, with_request_session
+from volunteers.core.db import create_session_factory, current_unit_of_work
+from volunteers.core.di import Container
+from volunteers.models import Year
+
+pytestmark = pytest.mark.postgres
+
+
+@pytest.fixture
+def app(pg_engine: AsyncEngine) -> FastAPI:
+    container = Container()
+    container.db.override(pg_engine)
+    container.session_factory.override(create_session_factory(pg_engine))
+    config = MagicMock()
+    config.database.replica_url = "postgresql+asyncpg://replica/volunteers"
+    config.database.replica_stickiness = 5
+    container.config.override(config)
+    container.wire(modules=["volunteers.api.deps"])
+
+    router = APIRouter(dependencies=[Depends(with_request_session)])
+
+    @router.get("/read")
+    async def read() -> bool:
+        unit_of_work = current_unit_of_work()
+        assert unit_of_work is not None
+        session = await unit_of_work.session()
+        await session.execute(select(Year.id))
+        return unit_of_work.reads_from_primary
+
+    @router.post("/write")
+    async def write() -> bool:
+        unit_of_work = current_unit_of_work()
+        assert unit_of_work is not None
+        session = await unit_of_work.session()
+        session.add(Year(year_name="2025", open_for_registration=False))
+        await session.commit()
+        return unit_of_work.reads_from_primary
+
+    @router.post("/fail")
+    async def fail() -> None:
+        unit_of_work = current_unit_of_work()
+        assert unit_of_work is not None
+        session = await unit_of_work.session()
+        session.add(Year(year_name="2025", open_for_registration=False))
+        await session.flush()
+        raise HTTPException(status_code=409)
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def test_writes_keep_client_on_primary(app: FastAPI) -> None:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get("/read")
+        assert resp.json() is False
+        assert READ_PRIMARY_COOKIE not in resp.cookies
+
+        resp = await ac.post("/write")
+        assert resp.json() is True
+        assert "Max-Age=5" in resp.headers["set-cookie"]
+
+        # The client sends the cookie back until it expires
+        resp = await ac.get("/read")
+        assert resp.json() is True
+
+
+async def test_http_errors_roll_back_the_request(app: FastAPI, pg_engine: AsyncEngine) -> None:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/fail")
+    assert resp.status_code == 409
+
+    async with async_sessionmaker(pg_engine)() as session:
+        assert (await session.execute(select(Year.id))).all() == []
@@ -0,0 +1,52 @@
+from collections.abc import AsyncGenerator
+from typing import Annotated
+
+from dependency_injector.wiring import Provide, inject
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from volunteers.core.config import Config
+from volunteers.core.db import request_unit_of_work
+from volunteers.core.di import Container
+
+# Set after a write; while it lives, read-only queries of the client use the primary
+READ_PRIMARY_COOKIE = "volunteers_read_primary"
+
+
+@inject
+async def with_request_session(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncEngine, Depends(Provide[Container.db])],
+    session_factory: Annotated[
+        async_sessionmaker[AsyncSession], Depends(Provide[Container.session_factory])
+    ],
+    config: Annotated[Config, Depends(Provide[Container.config])],
+) -> AsyncGenerator[None]:
+    """Run all service calls of the request on one lazily checked out connection.
+
+    A handler that raises ``HTTPException``, e.g. for a domain error, rolls back what
+    the services of the request flushed but did not commit.
+    """
+
+    def on_write() -> None:
+        if config.database.replica_url is not None:
+            response.set_cookie(
+                READ_PRIMARY_COOKIE,
+                "1",
+                max_age=config.database.replica_stickiness,
+                httponly=True,
+                samesite="lax",
+            )
+
+    async with request_unit_of_work(
+        db,
+        session_factory,
+        reads_from_primary=READ_PRIMARY_COOKIE in request.cookies,
+        on_write=on_write,
+    ) as unit_of_work:
+        try:
+            yield
+        except HTTPException:
+            await unit_of_work.rollback()
+            raise
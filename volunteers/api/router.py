@@ -1,11 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from .deps import with_request_session
 from .v1.admin import router as admin_router
 from .v1.attendance import router as attendance_router
 from .v1.auth import router as auth_router
 from .v1.year import router as year_router
 
-router = APIRouter(prefix="/api/v1")
+router = APIRouter(prefix="/api/v1", dependencies=[Depends(with_request_session)])
 
 router.include_router(admin_router.router, prefix="/admin")
 router.include_router(attendance_router.router, prefix="/attendance")
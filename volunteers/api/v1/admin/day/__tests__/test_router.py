@@ -10,6 +10,7 @@ from volunteers.api.v1.admin.day.router import router
 from volunteers.auth.deps import with_admin
 from volunteers.core.di import Container
 from volunteers.models import User
+from volunteers.services.year import DayNotFound
 
 
 class AppWithContainer(FastAPI):
@@ -128,3 +129,34 @@ async def test_edit_day_success(app: AppWithContainer, edit_day_request: dict[st
     day_edit_in = kwargs.get("day_edit_in")
     assert day_edit_in.name == "Updated Day"
     assert day_edit_in.information == "Updated info"
+
+
+@pytest.mark.asyncio
+async def test_copy_assignments_to_several_days(app: AppWithContainer) -> None:
+    copy_mock = AsyncMock(return_value=6)
+    app.test_year_service.copy_assignments_from_day = copy_mock
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post(
+            "/api/v1/admin/day/copy-assignments",
+            json={"source_day_id": 1, "target_day_ids": [2, 3], "overwrite_existing": True},
+        )
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json()["copied_count"] == 6
+    copy_mock.assert_awaited_once_with(
+        source_day_id=1, target_day_ids=[2, 3], overwrite_existing=True, replace_all=False
+    )
+
+
+@pytest.mark.asyncio
+async def test_copy_assignments_to_missing_day(app: AppWithContainer) -> None:
+    app.test_year_service.copy_assignments_from_day = AsyncMock(side_effect=DayNotFound())
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post(
+            "/api/v1/admin/day/copy-assignments",
+            json={"source_day_id": 1, "target_day_ids": [2]},
+        )
+
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
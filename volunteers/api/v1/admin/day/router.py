@@ -1,14 +1,14 @@
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, Path, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Response, status
 from loguru import logger
 
 from volunteers.auth.deps import with_admin
 from volunteers.core.di import Container
 from volunteers.models import User
 from volunteers.schemas.day import DayEditIn, DayIn, DayOutAdmin
-from volunteers.services.year import YearService
+from volunteers.services.year import DayNotFound, YearService
 
 from .schemas import (
     AddDayRequest,
@@ -101,7 +101,7 @@ async def edit_day(
 @router.post(
     "/copy-assignments",
     response_model=CopyAssignmentsResponse,
-    description="Copy all assignments from one day to another",
+    description="Copy all assignments from one day to several others in one transaction",
 )
 @inject
 async def copy_assignments(
@@ -109,13 +109,16 @@ async def copy_assignments(
     _: Annotated[User, Depends(with_admin)],
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
 ) -> CopyAssignmentsResponse:
-    copied_count = await year_service.copy_assignments_from_day(
-        source_day_id=request.source_day_id,
-        target_day_id=request.target_day_id,
-        overwrite_existing=request.overwrite_existing,
-        replace_all=request.replace_all,
-    )
+    try:
+        copied_count = await year_service.copy_assignments_from_day(
+            source_day_id=request.source_day_id,
+            target_day_ids=request.target_day_ids,
+            overwrite_existing=request.overwrite_existing,
+            replace_all=request.replace_all,
+        )
+    except DayNotFound as exc:
+        raise HTTPException(status_code=404, detail="Day not found") from exc
     logger.info(
-        f"Copied {copied_count} assignments from day {request.source_day_id} to day {request.target_day_id}"
+        f"Copied {copied_count} assignments from day {request.source_day_id} to days {request.target_day_ids}"
     )
     return CopyAssignmentsResponse(copied_count=copied_count)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from volunteers.schemas.base import BaseSuccessResponse
 
@@ -26,7 +26,7 @@ class EditDayRequest(BaseModel):
 
 class CopyAssignmentsRequest(BaseModel):
     source_day_id: int
-    target_day_id: int
+    target_day_ids: list[int] = Field(min_length=1, max_length=100)
     overwrite_existing: bool = False
     replace_all: bool = False
 
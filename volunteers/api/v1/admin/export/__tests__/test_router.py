@@ -0,0 +1,151 @@
+from collections.abc import Generator
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI, status
+from httpx import ASGITransport, AsyncClient
+
+from volunteers.api.v1.admin.export.router import router
+from volunteers.auth.deps import with_admin
+from volunteers.core.di import Container
+from volunteers.models import User, Year
+from volunteers.services.export import ExportEngine
+from volunteers.services.export_jobs import (
+    ExportJob,
+    ExportJobKind,
+    ExportJobNotFound,
+    ExportJobStatus,
+)
+
+JOB_ID = "0123456789abcdef0123456789abcdef"
+
+
+class AppWithContainer(FastAPI):
+    container: Container
+    test_export_job_service: MagicMock
+    test_year_service: MagicMock
+
+
+@pytest.fixture
+def app() -> AppWithContainer:
+    container = Container()
+    export_job_service = MagicMock()
+    year_service = MagicMock()
+    container.export_job_service.override(export_job_service)
+    container.year_service.override(year_service)
+    container.wire(modules=["volunteers.api.v1.admin.export.router"])
+    app = AppWithContainer()
+    app.container = container
+    app.test_export_job_service = export_job_service
+    app.test_year_service = year_service
+    app.include_router(router, prefix="/api/v1/admin/export")
+    return app
+
+
+@pytest.fixture(autouse=True)
+def override_admin(app: AppWithContainer) -> Generator[None]:
+    app.dependency_overrides[with_admin] = lambda: User(id=1, is_admin=True)
+    yield
+    app.dependency_overrides.clear()
+
+
+def make_job(status: ExportJobStatus = ExportJobStatus.QUEUED, **kwargs: object) -> ExportJob:
+    return ExportJob.model_validate(
+        {
+            "job_id": JOB_ID,
+            "kind": ExportJobKind.YEAR,
+            "year_id": 1,
+            "engine": ExportEngine.ORM,
+            "filename": "year_2025.zip",
+            "status": status,
+            "created_at": datetime(2025, 1, 1, tzinfo=UTC),
+            **kwargs,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_year_export_job(app: AppWithContainer) -> None:
+    app.test_year_service.get_year_by_year_id = AsyncMock(
+        return_value=Year(id=1, year_name="2025 fall")
+    )
+    app.test_export_job_service.submit = AsyncMock(return_value=make_job())
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post(
+            "/api/v1/admin/export/jobs", json={"kind": "year", "year_id": 1, "engine": "copy"}
+        )
+
+    assert resp.status_code == status.HTTP_202_ACCEPTED, resp.json()
+    assert resp.json()["job_id"] == JOB_ID
+    kwargs = app.test_export_job_service.submit.await_args.kwargs
+    assert kwargs["kind"] is ExportJobKind.YEAR
+    assert kwargs["engine"] is ExportEngine.COPY
+    assert kwargs["filename"].startswith("year_2025_fall_")
+
+
+@pytest.mark.asyncio
+async def test_create_year_export_job_requires_year(app: AppWithContainer) -> None:
+    app.test_year_service.get_year_by_year_id = AsyncMock(return_value=None)
+    app.test_export_job_service.submit = AsyncMock()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        missing = await ac.post("/api/v1/admin/export/jobs", json={"kind": "year"})
+        unknown = await ac.post("/api/v1/admin/export/jobs", json={"kind": "year", "year_id": 7})
+
+    assert missing.status_code == status.HTTP_400_BAD_REQUEST
+    assert unknown.status_code == status.HTTP_404_NOT_FOUND
+    app.test_export_job_service.submit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_export_job(app: AppWithContainer) -> None:
+    app.test_export_job_service.get_job = AsyncMock(
+        return_value=make_job(ExportJobStatus.RUNNING, rows_processed=42)
+    )
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get(f"/api/v1/admin/export/jobs/{JOB_ID}")
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json()["status"] == "running"
+    assert resp.json()["rows_processed"] == 42
+
+
+@pytest.mark.asyncio
+async def test_get_unknown_export_job(app: AppWithContainer) -> None:
+    app.test_export_job_service.get_job = AsyncMock(side_effect=ExportJobNotFound())
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get(f"/api/v1/admin/export/jobs/{JOB_ID}")
+        bad_id = await ac.get("/api/v1/admin/export/jobs/..%2Fsecret")
+
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
+    assert bad_id.status_code in {status.HTTP_404_NOT_FOUND, status.HTTP_422_UNPROCESSABLE_ENTITY}
+
+
+@pytest.mark.asyncio
+async def test_download_export_job(app: AppWithContainer, tmp_path: Path) -> None:
+    artifact = tmp_path / f"{JOB_ID}.zip"
+    artifact.write_bytes(b"PK")
+    app.test_export_job_service.get_job = AsyncMock(return_value=make_job(ExportJobStatus.DONE))
+    app.test_export_job_service.artifact_path = MagicMock(return_value=artifact)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get(f"/api/v1/admin/export/jobs/{JOB_ID}/download")
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.content == b"PK"
+    assert "year_2025.zip" in resp.headers["content-disposition"]
+
+
+@pytest.mark.asyncio
+async def test_download_unfinished_export_job(app: AppWithContainer) -> None:
+    app.test_export_job_service.get_job = AsyncMock(return_value=make_job(ExportJobStatus.RUNNING))
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get(f"/api/v1/admin/export/jobs/{JOB_ID}/download")
+
+    assert resp.status_code == status.HTTP_409_CONFLICT
@@ -0,0 +1,119 @@
+from datetime import UTC, datetime
+from typing import Annotated
+
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends, HTTPException, Path, Response, status
+from fastapi.responses import FileResponse
+from loguru import logger
+
+from volunteers.auth.deps import with_admin
+from volunteers.core.di import Container
+from volunteers.models import User
+from volunteers.services.export_jobs import (
+    ExportJob,
+    ExportJobKind,
+    ExportJobNotFound,
+    ExportJobService,
+    ExportJobStatus,
+)
+from volunteers.services.year import YearService
+
+from .schemas import CreateExportJobRequest, ExportJobResponse
+
+router = APIRouter(tags=["export"])
+
+JobId = Annotated[str, Path(title="The ID of the export job", pattern="^[0-9a-f]{32}$")]
+
+
+def to_response(job: ExportJob) -> ExportJobResponse:
+    return ExportJobResponse(
+        job_id=job.job_id,
+        kind=job.kind,
+        year_id=job.year_id,
+        engine=job.engine,
+        status=job.status,
+        rows_processed=job.rows_processed,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.post(
+    "/jobs",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=ExportJobResponse,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "year_id is missing for a year export"},
+        status.HTTP_404_NOT_FOUND: {"description": "Year not found"},
+    },
+    description="Start a background export of a year or of all users (admin only)",
+)
+@inject
+async def create_export_job(
+    request: CreateExportJobRequest,
+    _: Annotated[User, Depends(with_admin)],
+    export_job_service: Annotated[ExportJobService, Depends(Provide[Container.export_job_service])],
+    year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
+) -> ExportJobResponse:
+    timestamp = datetime.now(tz=UTC).strftime("%Y%m%d_%H%M%S")
+    if request.kind is ExportJobKind.YEAR:
+        if request.year_id is None:
+            raise HTTPException(status_code=400, detail="year_id is required for year exports")
+        year = await year_service.get_year_by_year_id(request.year_id)
+        if not year:
+            raise HTTPException(status_code=404, detail="Year not found")
+        filename = f"year_{year.year_name.replace(' ', '_')}_{timestamp}.zip"
+    else:
+        filename = f"all_users_{timestamp}.csv"
+
+    job = await export_job_service.submit(
+        kind=request.kind, year_id=request.year_id, engine=request.engine, filename=filename
+    )
+    logger.info(f"Queued export job {job.job_id} ({job.kind.value}, {job.engine.value})")
+    return to_response(job)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=ExportJobResponse,
+    description="Get the status and progress of an export job (admin only)",
+)
+@inject
+async def get_export_job(
+    job_id: JobId,
+    _: Annotated[User, Depends(with_admin)],
+    export_job_service: Annotated[ExportJobService, Depends(Provide[Container.export_job_service])],
+) -> ExportJobResponse:
+    try:
+        job = await export_job_service.get_job(job_id)
+    except ExportJobNotFound as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return to_response(job)
+
+
+@router.get(
+    "/jobs/{job_id}/download",
+    responses={
+        status.HTTP_404_NOT_FOUND: {"description": "Export job not found"},
+        status.HTTP_409_CONFLICT: {"description": "Export job has not finished successfully"},
+    },
+    description="Download the result of a finished export job (admin only)",
+)
+@inject
+async def download_export_job(
+    job_id: JobId,
+    _: Annotated[User, Depends(with_admin)],
+    export_job_service: Annotated[ExportJobService, Depends(Provide[Container.export_job_service])],
+) -> Response:
+    try:
+        job = await export_job_service.get_job(job_id)
+    except ExportJobNotFound as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    if job.status is not ExportJobStatus.DONE:
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status.value}")
+
+    media_type = "application/zip" if job.kind is ExportJobKind.YEAR else "text/csv"
+    return FileResponse(
+        export_job_service.artifact_path(job), media_type=media_type, filename=job.filename
+    )
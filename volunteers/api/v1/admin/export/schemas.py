@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from volunteers.services.export import ExportEngine
+from volunteers.services.export_jobs import ExportJobKind, ExportJobStatus
+
+
+class CreateExportJobRequest(BaseModel):
+    kind: ExportJobKind
+    year_id: int | None = None
+    engine: ExportEngine = ExportEngine.ORM
+
+
+class ExportJobResponse(BaseModel):
+    job_id: str
+    kind: ExportJobKind
+    year_id: int | None
+    engine: ExportEngine
+    status: ExportJobStatus
+    rows_processed: int
+    error: str | None
+    created_at: datetime
+    finished_at: datetime | None
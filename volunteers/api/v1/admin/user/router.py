@@ -1,8 +1,9 @@
+from collections.abc import AsyncIterator, Iterator
 from datetime import UTC, datetime
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from fastapi.responses import StreamingResponse
 from loguru import logger
 
@@ -10,7 +11,7 @@ from volunteers.auth.deps import with_admin
 from volunteers.core.di import Container
 from volunteers.models import User
 from volunteers.schemas.user import UserUpdate
-from volunteers.services.export import ExportService
+from volunteers.services.export import ExportEngine, ExportService
 from volunteers.services.user import UserService
 
 from .schemas import AllUsersResponse, EditUserRequest, UserResponse
@@ -26,18 +27,25 @@ router = APIRouter(tags=["user"])
 async def export_users_csv(
     _: Annotated[User, Depends(with_admin)],
     export_service: Annotated[ExportService, Depends(Provide[Container.export_service])],
+    engine: Annotated[
+        ExportEngine, Query(description="How CSV rows are produced")
+    ] = ExportEngine.ORM,
 ) -> StreamingResponse:
     """Export all users data to CSV format including participation in years."""
-    csv_content = await export_service.export_all_users()
+    content: AsyncIterator[bytes] | Iterator[str]
+    if engine is ExportEngine.COPY:
+        content = export_service.stream_all_users_copy()
+    else:
+        content = iter([await export_service.export_all_users()])
 
     # Create filename with timestamp
     timestamp = datetime.now(tz=UTC).strftime("%Y%m%d_%H%M%S")
     filename = f"all_users_{timestamp}.csv"
 
-    logger.info("Exporting all users data to CSV")
+    logger.info(f"Exporting all users data to CSV ({engine.value})")
 
     return StreamingResponse(
-        iter([csv_content]),
+        content,
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
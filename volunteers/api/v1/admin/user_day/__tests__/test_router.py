@@ -10,6 +10,7 @@ from volunteers.api.v1.admin.user_day.router import router
 from volunteers.auth.deps import with_admin
 from volunteers.core.di import Container
 from volunteers.models import User
+from volunteers.services.year import AssignmentImport, AssignmentImportInvalid
 
 
 class AppWithContainer(FastAPI):
@@ -135,3 +136,46 @@ async def test_edit_user_day_success(
     assert user_day_edit_in.information == "User did not attend."
     # Attendance is always set to None in the router, as it's managed via attendance API
     assert user_day_edit_in.attendance is None
+
+
+@pytest.mark.asyncio
+async def test_import_assignments_success(app: AppWithContainer, admin_user: User) -> None:
+    import_mock = AsyncMock(return_value=AssignmentImport(created=2, updated=1, unchanged=3))
+    app.test_year_service.import_assignments = import_mock
+    data = b"user_id,day_id,position_id,hall_id\n1,2,3,\n"
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post(
+            "/api/v1/admin/user_day/year/5/import",
+            content=data,
+            headers={"Content-Type": "text/csv"},
+        )
+
+    assert resp.status_code == status.HTTP_200_OK
+    body = resp.json()
+    assert (body["created_count"], body["updated_count"], body["unchanged_count"]) == (2, 1, 3)
+    import_mock.assert_awaited_once_with(year_id=5, data=data, author=admin_user)
+
+
+@pytest.mark.asyncio
+async def test_import_assignments_invalid(app: AppWithContainer) -> None:
+    app.test_year_service.import_assignments = AsyncMock(
+        side_effect=AssignmentImportInvalid(["Line 2: day 2 is not a day of the year"])
+    )
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/admin/user_day/year/5/import", content=b"")
+
+    assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert resp.json()["detail"] == ["Line 2: day 2 is not a day of the year"]
+
+
+@pytest.mark.asyncio
+async def test_import_assignments_too_large(app: AppWithContainer) -> None:
+    app.test_year_service.import_assignments = AsyncMock()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/admin/user_day/year/5/import", content=b"1,2,3,\n" * 200_000)
+
+    assert resp.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    app.test_year_service.import_assignments.assert_not_awaited()
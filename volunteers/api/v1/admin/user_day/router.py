@@ -1,7 +1,7 @@
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, Path, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status
 from loguru import logger
 
 from volunteers.auth.deps import with_admin
@@ -9,7 +9,7 @@ from volunteers.core.di import Container
 from volunteers.models import User
 from volunteers.models.attendance import Attendance
 from volunteers.schemas.user_day import UserDayEditIn, UserDayIn
-from volunteers.services.year import YearService
+from volunteers.services.year import AssignmentImportInvalid, YearNotFound, YearService
 
 from .schemas import (
     AddUserDayRequest,
@@ -17,10 +17,14 @@ from .schemas import (
     AssignmentItem,
     AssignmentsResponse,
     EditUserDayRequest,
+    ImportAssignmentsResponse,
 )
 
 router = APIRouter(tags=["user-day"])
 
+# Largest CSV accepted by the import, roughly thirty thousand assignments
+MAX_IMPORT_SIZE = 1024 * 1024
+
 
 @router.post(
     "/add",
@@ -54,6 +58,54 @@ async def add_user_day(
     return AddUserDayResponse(user_day_id=user_day.id)
 
 
+@router.post(
+    "/year/{year_id}/import",
+    response_model=ImportAssignmentsResponse,
+    description=(
+        "Assign volunteers to days from a CSV file with a header line and "
+        "user_id,day_id,position_id,hall_id lines; users already assigned to a day "
+        "get the new position and hall"
+    ),
+    openapi_extra={
+        "requestBody": {"required": True, "content": {"text/csv": {"schema": {"type": "string"}}}}
+    },
+)
+@inject
+async def import_assignments(
+    year_id: Annotated[int, Path(title="The ID of the year")],
+    request: Request,
+    user: Annotated[User, Depends(with_admin)],
+    year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
+) -> ImportAssignmentsResponse:
+    # The file is the raw request body, read up to the limit
+    data = bytearray()
+    async for chunk in request.stream():
+        data += chunk
+        if len(data) > MAX_IMPORT_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Import is larger than {MAX_IMPORT_SIZE} bytes",
+            )
+    try:
+        imported = await year_service.import_assignments(
+            year_id=year_id, data=bytes(data), author=user
+        )
+    except YearNotFound as exc:
+        raise HTTPException(status_code=404, detail="Year not found") from exc
+    except AssignmentImportInvalid as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=exc.errors
+        ) from exc
+    logger.info(
+        f"Imported {imported.created} new and {imported.updated} changed assignments for year {year_id}"
+    )
+    return ImportAssignmentsResponse(
+        created_count=imported.created,
+        updated_count=imported.updated,
+        unchanged_count=imported.unchanged,
+    )
+
+
 @router.post("/{user_day_id}/edit")
 @inject
 async def edit_position(
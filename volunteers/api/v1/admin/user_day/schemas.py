@@ -15,6 +15,12 @@ class AddUserDayResponse(BaseSuccessResponse):
     user_day_id: int
 
 
+class ImportAssignmentsResponse(BaseSuccessResponse):
+    created_count: int
+    updated_count: int
+    unchanged_count: int
+
+
 class EditUserDayRequest(BaseModel):
     information: str | None = None
     position_id: int
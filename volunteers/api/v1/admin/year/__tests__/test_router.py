@@ -144,7 +144,14 @@ async def test_get_registration_forms_with_experience(app: AppWithContainer) ->
         gender=Gender.MALE,
     )
     mock_position = Position(
-        id=1, year_id=1, name="Volunteer", can_desire=True, has_halls=False, is_manager=False
+        id=1,
+        year_id=1,
+        name="Volunteer",
+        can_desire=True,
+        has_halls=False,
+        is_manager=False,
+        save_for_next_year=False,
+        score=1.0,
     )
 
     mock_form = ApplicationForm(
@@ -162,15 +169,17 @@ async def test_get_registration_forms_with_experience(app: AppWithContainer) ->
 
     # Mock the service methods
     app.test_year_service.get_all_forms_by_year_id = AsyncMock(return_value=[mock_form])
-    app.test_year_service.get_user_experience = AsyncMock(
-        return_value=[
-            {
-                "year_name": "2023",
-                "positions": ["Helper", "Coordinator"],
-                "attendance_stats": {"yes": 5, "late": 1, "no": 0, "sick": 0, "unknown": 0},
-                "assessments": ["Great work!", "Very helpful"],
-            }
-        ]
+    app.test_year_service.get_users_experience = AsyncMock(
+        return_value={
+            1: [
+                {
+                    "year_name": "2023",
+                    "positions": ["Helper", "Coordinator"],
+                    "attendance_stats": {"yes": 5, "late": 1, "no": 0, "sick": 0, "unknown": 0},
+                    "assessments": ["Great work!", "Very helpful"],
+                }
+            ]
+        }
     )
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
@@ -216,4 +225,4 @@ async def test_get_registration_forms_with_experience(app: AppWithContainer) ->
 
     # Verify service methods were called
     app.test_year_service.get_all_forms_by_year_id.assert_awaited_once_with(year_id=1)
-    app.test_year_service.get_user_experience.assert_awaited_once_with(1)
+    app.test_year_service.get_users_experience.assert_awaited_once_with([1])
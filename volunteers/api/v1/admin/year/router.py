@@ -2,7 +2,7 @@ from datetime import UTC, datetime
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, HTTPException, Path, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
 from fastapi.responses import HTMLResponse, StreamingResponse
 from loguru import logger
 
@@ -12,7 +12,7 @@ from volunteers.core.experience import get_rank
 from volunteers.models import User
 from volunteers.schemas.position import PositionOut
 from volunteers.schemas.year import YearEditIn, YearIn
-from volunteers.services.export import ExportService
+from volunteers.services.export import ExportEngine, ExportService
 from volunteers.services.user import UserService
 from volunteers.services.year import YearService
 
@@ -148,11 +148,11 @@ async def get_registration_forms(
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
 ) -> RegistrationFormsResponse:
     forms = await year_service.get_all_forms_by_year_id(year_id=year_id)
+    experience_by_user = await year_service.get_users_experience([form.user.id for form in forms])
 
     form_items: list[RegistrationFormItem] = []
     for form in forms:
-        # Get user experience data
-        experience_data = await year_service.get_user_experience(form.user.id)
+        experience_data = experience_by_user.get(form.user.id, [])
 
         form_items.append(
             RegistrationFormItem(
@@ -235,6 +235,9 @@ async def export_year_csv(
     _: Annotated[User, Depends(with_admin)],
     export_service: Annotated[ExportService, Depends(Provide[Container.export_service])],
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
+    engine: Annotated[
+        ExportEngine, Query(description="How CSV rows are produced")
+    ] = ExportEngine.ORM,
 ) -> StreamingResponse:
     """Export all year data to ZIP archive with multiple CSV files."""
     # Get year name for filename
@@ -242,16 +245,14 @@ async def export_year_csv(
     if not year:
         raise HTTPException(status_code=404, detail="Year not found")
 
-    zip_content = await export_service.export_year_data(year_id)
-
     # Create filename with year name and timestamp
     timestamp = datetime.now(tz=UTC).strftime("%Y%m%d_%H%M%S")
     filename = f"year_{year.year_name.replace(' ', '_')}_{timestamp}.zip"
 
-    logger.info(f"Exporting year {year_id} data to ZIP")
+    logger.info(f"Exporting year {year_id} data to ZIP ({engine.value})")
 
     return StreamingResponse(
-        iter([zip_content]),
+        await export_service.cached_year_data(year_id, engine),
         media_type="application/zip",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
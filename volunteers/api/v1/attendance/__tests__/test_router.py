@@ -0,0 +1,106 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI, status
+from httpx import ASGITransport, AsyncClient
+
+from volunteers.api.v1.attendance.router import router
+from volunteers.auth.deps import with_user
+from volunteers.core.di import Container
+from volunteers.models import User
+from volunteers.models.attendance import Attendance
+from volunteers.services.year import UserDayNotFound, UserDayNotManaged
+
+
+class AppWithContainer(FastAPI):
+    container: Container
+    test_year_service: MagicMock  # For direct access in tests
+    test_user: User
+
+
+@pytest.fixture
+def app() -> AppWithContainer:
+    container = Container()
+    year_service = MagicMock()
+    year_service.update_user_days_attendance = AsyncMock()
+    container.year_service.override(year_service)
+    container.wire(modules=["volunteers.api.v1.attendance.router"])
+    app = AppWithContainer()
+    app.container = container
+    app.test_year_service = year_service
+    app.test_user = User(
+        id=7, first_name_ru="И", last_name_ru="Ф", first_name_en="N", last_name_en="L"
+    )
+    app.dependency_overrides[with_user] = lambda: app.test_user
+    app.include_router(router, prefix="/api/v1/attendance")
+    return app
+
+
+async def save_batch(app: AppWithContainer, items: list[dict[str, object]]) -> int:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/attendance/save/batch", json={"items": items})
+    return resp.status_code
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("is_admin", "manager_id"), [(True, None), (False, 7)])
+async def test_save_batch_is_scoped_to_managed_user_days(
+    app: AppWithContainer, is_admin: bool, manager_id: int | None
+) -> None:
+    app.test_user.is_admin = is_admin
+    items = [
+        {"user_day_id": 1, "attendance": "yes"},
+        {"user_day_id": 2, "attendance": "late"},
+    ]
+
+    assert await save_batch(app, items) == status.HTTP_200_OK
+    app.test_year_service.update_user_days_attendance.assert_awaited_once_with(
+        {1: Attendance.YES, 2: Attendance.LATE}, manager_id=manager_id
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("error", "code"),
+    [
+        (UserDayNotFound(), status.HTTP_404_NOT_FOUND),
+        (UserDayNotManaged(), status.HTTP_403_FORBIDDEN),
+    ],
+)
+async def test_save_batch_errors(app: AppWithContainer, error: Exception, code: int) -> None:
+    app.test_year_service.update_user_days_attendance.side_effect = error
+    assert await save_batch(app, [{"user_day_id": 1, "attendance": "yes"}]) == code
+
+
+@pytest.mark.asyncio
+async def test_save_batch_rejects_empty_batch(app: AppWithContainer) -> None:
+    assert await save_batch(app, []) == status.HTTP_422_UNPROCESSABLE_ENTITY
+    app.test_year_service.update_user_days_attendance.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("is_admin", "manager_id"), [(True, None), (False, 7)])
+async def test_get_all_attendance_is_scoped_to_managed_user_days(
+    app: AppWithContainer, is_admin: bool, manager_id: int | None
+) -> None:
+    app.test_user.is_admin = is_admin
+    app.test_year_service.get_year_by_year_id = AsyncMock(return_value=MagicMock())
+    app.test_year_service.manager_for_year = AsyncMock(return_value={MagicMock()})
+    app.test_year_service.get_all_assignments_by_year_id = AsyncMock(return_value=[])
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get("/api/v1/attendance/1/all")
+    assert resp.status_code == status.HTTP_200_OK
+    app.test_year_service.get_all_assignments_by_year_id.assert_awaited_once_with(
+        1, manager_id=manager_id
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_all_attendance_requires_manager(app: AppWithContainer) -> None:
+    app.test_year_service.get_year_by_year_id = AsyncMock(return_value=MagicMock())
+    app.test_year_service.manager_for_year = AsyncMock(return_value=set())
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get("/api/v1/attendance/1/all")
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
@@ -7,12 +7,18 @@ from volunteers.api.v1.attendance.schemas import (
     AllAttendanceResponse,
     AssessmentInAttendance,
     AttendanceItem,
+    SaveAttendanceBatchRequest,
     SaveDayAttendanceRequest,
 )
 from volunteers.auth.deps import with_user
 from volunteers.core.di import Container
 from volunteers.models.models import User
-from volunteers.services.year import ManagerForYear, YearService
+from volunteers.services.year import (
+    ManagerForYear,
+    UserDayNotFound,
+    UserDayNotManaged,
+    YearService,
+)
 
 router = APIRouter(tags=["attendance"])
 
@@ -50,6 +56,32 @@ async def save_day_attendance(
     )
 
 
+@router.post("/save/batch")
+@inject
+async def save_attendance_batch(
+    request: SaveAttendanceBatchRequest,
+    user: Annotated[User, Depends(with_user)],
+    year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
+) -> None:
+    """Save attendance for several user days at once, e.g. at the start of a shift.
+
+    Only admins or managers for the hall/day of every user day can set attendance;
+    otherwise nothing is saved.
+    """
+    try:
+        await year_service.update_user_days_attendance(
+            {item.user_day_id: item.attendance for item in request.items},
+            manager_id=None if user.is_admin else user.id,
+        )
+    except UserDayNotFound as exc:
+        raise HTTPException(status_code=404, detail="User day not found") from exc
+    except UserDayNotManaged as exc:
+        raise HTTPException(
+            status_code=403,
+            detail="You are not allowed to set that attendance",
+        ) from exc
+
+
 @router.get("/{year_id}/all", response_model=AllAttendanceResponse)
 @inject
 async def get_all_attendance(
@@ -64,15 +96,16 @@ async def get_all_attendance(
         raise HTTPException(status_code=404, detail="Year not found")
 
     # Check permissions: admin can always view, managers can view their year
-    manager_for_year_data = await year_service.manager_for_year(user.id, year_id)
-    if not (user.is_admin or len(manager_for_year_data) != 0):
+    if not (user.is_admin or await year_service.manager_for_year(user.id, year_id)):
         raise HTTPException(
             status_code=403,
             detail="Only admins or managers can view attendance",
         )
 
-    # Get all assignments for the year
-    assignments = await year_service.get_all_assignments_by_year_id(year_id)
+    # Managers only get the assignments of the days and halls they manage
+    assignments = await year_service.get_all_assignments_by_year_id(
+        year_id, manager_id=None if user.is_admin else user.id
+    )
 
     # Build attendance items
     attendance_items = [
@@ -101,9 +134,6 @@ async def get_all_attendance(
             ],
         )
         for assignment in assignments
-        if user.is_admin
-        or ManagerForYear(hall_id=assignment.hall_id, day_id=assignment.day_id)
-        in manager_for_year_data
     ]
 
     return AllAttendanceResponse(attendance=attendance_items)
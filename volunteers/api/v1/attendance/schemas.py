@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from volunteers.models.attendance import Attendance
 
@@ -8,6 +8,10 @@ class SaveDayAttendanceRequest(BaseModel):
     attendance: Attendance
 
 
+class SaveAttendanceBatchRequest(BaseModel):
+    items: list[SaveDayAttendanceRequest] = Field(min_length=1, max_length=500)
+
+
 class AssessmentInAttendance(BaseModel):
     assessment_id: int
     comment: str
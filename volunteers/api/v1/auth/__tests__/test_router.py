@@ -7,9 +7,12 @@ from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
 
 from volunteers.api.v1.auth import router as auth_router
+from volunteers.auth import deps as auth_deps
 from volunteers.auth.jwt_tokens import JWTTokenPayload
+from volunteers.auth.providers.legacy import PasswordHasher, PasswordHasherBusy
+from volunteers.core.config import RateLimitConfig
 from volunteers.core.di import Container
-from volunteers.models import User
+from volunteers.models import LegacyUser, User
 
 if TYPE_CHECKING:
     from dependency_injector.containers import DeclarativeContainer
@@ -55,6 +58,7 @@ def config() -> MagicMock:
     cfg: MagicMock = MagicMock()
     cfg.jwt = Jwt()
     cfg.telegram = Telegram()
+    cfg.rate_limit = RateLimitConfig()
     return cfg
 
 
@@ -104,7 +108,7 @@ def app(config: MagicMock, test_user: User) -> FastAPIWithContainer:
     user_service.update_user = AsyncMock(return_value=None)
     container.user_service.override(user_service)
     container.config.override(config)
-    container.wire(modules=[auth_router])
+    container.wire(modules=[auth_router, auth_deps])
     app: FastAPIWithContainer = FastAPIWithContainer()
     app.container = container
     app.include_router(auth_router.router, prefix="/api/v1/auth")
@@ -242,3 +246,112 @@ async def test_me_success(app: FastAPIWithContainer, test_user: User) -> None:
     assert data["is_admin"] == test_user.is_admin
     assert data["isu_id"] == test_user.isu_id
     assert data["patronymic_ru"] == test_user.patronymic_ru
+
+
+@pytest.fixture
+def migrate_request(telegram_login_request: dict[str, Any]) -> dict[str, Any]:
+    return {**telegram_login_request, "email": "denis@example.com", "password": "secret"}
+
+
+@pytest.fixture
+def hasher(app: FastAPIWithContainer, test_user: User) -> MagicMock:
+    legacy_user_service: MagicMock = MagicMock()
+    legacy_user_service.get_user_by_email = AsyncMock(
+        return_value=LegacyUser(id=7, new_user=test_user, password="$2b$10$hash")  # noqa: S106
+    )
+    legacy_user_service.update_password = AsyncMock()
+    app.container.legacy_user_service.override(legacy_user_service)
+    hasher: MagicMock = MagicMock(spec=PasswordHasher)
+    hasher.check = AsyncMock(return_value=True)
+    hasher.hash = AsyncMock(return_value="$2b$12$rehashed")
+    hasher.needs_rehash.return_value = True
+    app.container.password_hasher.override(hasher)
+    return hasher
+
+
+@pytest.mark.asyncio
+async def test_migrate_rehashes_password(
+    app: FastAPIWithContainer, hasher: MagicMock, migrate_request: dict[str, Any]
+) -> None:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/auth/telegram/migrate", json=migrate_request)
+    assert resp.status_code == 200
+    hasher.check.assert_awaited_once_with("secret", "$2b$10$hash")
+    hasher.hash.assert_awaited_once_with("secret")
+    app.container.legacy_user_service().update_password.assert_awaited_once_with(
+        7, "$2b$12$rehashed"
+    )
+
+
+@pytest.mark.asyncio
+async def test_migrate_wrong_password(
+    app: FastAPIWithContainer, hasher: MagicMock, migrate_request: dict[str, Any]
+) -> None:
+    hasher.check = AsyncMock(return_value=False)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/auth/telegram/migrate", json=migrate_request)
+    assert resp.status_code == 403
+    hasher.hash.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_migrate_busy(
+    app: FastAPIWithContainer, hasher: MagicMock, migrate_request: dict[str, Any]
+) -> None:
+    hasher.check = AsyncMock(side_effect=PasswordHasherBusy())
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/auth/telegram/migrate", json=migrate_request)
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_login_rate_limited_per_telegram_id(
+    app: FastAPIWithContainer, telegram_login_request: dict[str, Any], config: MagicMock
+) -> None:
+    config.rate_limit = RateLimitConfig(auth_telegram_burst=1, auth_telegram_rate=0.01)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        first = await ac.post("/api/v1/auth/telegram/login", json=telegram_login_request)
+        second = await ac.post("/api/v1/auth/telegram/login", json=telegram_login_request)
+        other = await ac.post(
+            "/api/v1/auth/telegram/login", json={**telegram_login_request, "telegram_id": 1}
+        )
+    assert first.status_code == 403
+    assert second.status_code == 429
+    assert second.headers["retry-after"] == "100"
+    assert other.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_auth_rate_limited_per_ip(
+    app: FastAPIWithContainer, refresh_token_request: dict[str, Any], config: MagicMock
+) -> None:
+    config.rate_limit = RateLimitConfig(auth_ip_burst=2, auth_ip_rate=1)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        statuses = [
+            (await ac.post("/api/v1/auth/refresh", json=refresh_token_request)).status_code
+            for _ in range(3)
+        ]
+    assert statuses == [200, 200, 429]
+
+
+@pytest.mark.asyncio
+async def test_auth_concurrency_cap(
+    app: FastAPIWithContainer, refresh_token_request: dict[str, Any]
+) -> None:
+    limiter = app.container.auth_concurrency_limiter()
+    for _ in range(limiter.limit):
+        limiter.acquire()
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            resp = await ac.post("/api/v1/auth/refresh", json=refresh_token_request)
+        assert resp.status_code == 429
+        assert resp.headers["retry-after"] == "1"
+    finally:
+        for _ in range(limiter.limit):
+            limiter.release()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/auth/refresh", json=refresh_token_request)
+    assert resp.status_code == 200
+    assert limiter._in_use == 0
@@ -1,7 +1,7 @@
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from loguru import logger
 
 from volunteers.api.v1.auth.schemas import (
@@ -14,14 +14,18 @@ from volunteers.api.v1.auth.schemas import (
     UserResponse,
     UserUpdateRequest,
 )
-from volunteers.auth.deps import with_user
+from volunteers.auth.deps import limit_auth_requests, limit_telegram_id, with_user
 from volunteers.auth.jwt_tokens import (
     JWTTokenPayload,
     create_access_token,
     create_refresh_token,
     verify_refresh_token,
 )
-from volunteers.auth.providers.legacy import verify_legacy_user
+from volunteers.auth.providers.legacy import (
+    PasswordHasher,
+    PasswordHasherBusy,
+    verify_legacy_user,
+)
 from volunteers.auth.providers.telegram import (
     TelegramLoginConfig,
     TelegramLoginData,
@@ -29,6 +33,7 @@ from volunteers.auth.providers.telegram import (
 )
 from volunteers.core.config import Config
 from volunteers.core.di import Container
+from volunteers.core.rate_limit import RateLimiter
 from volunteers.models import User
 from volunteers.schemas.user import UserIn, UserUpdate
 from volunteers.services.i18n import I18nService
@@ -38,13 +43,14 @@ from volunteers.services.user import UserService
 router = APIRouter(tags=["auth"])
 
 
-@router.post("/telegram/register")
+@router.post("/telegram/register", dependencies=[Depends(limit_auth_requests)])
 @inject
 async def register(
     request: RegistrationRequest,
     user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
     config: Annotated[Config, Depends(Provide[Container.config])],
     i18n: Annotated[I18nService, Depends(Provide[Container.i18n_service])],
+    telegram_limiter: Annotated[RateLimiter, Depends(Provide[Container.auth_telegram_limiter])],
 ) -> SuccessfulLoginResponse:
     if not verify_telegram_login(
         data=TelegramLoginData(
@@ -62,6 +68,7 @@ async def register(
     ):
         logger.info("Invalid Telegram login")
         raise HTTPException(status_code=401, detail=i18n.translate("Invalid Telegram login"))
+    await limit_telegram_id(telegram_limiter, request.telegram_id)
 
     if _ := await user_service.get_user_by_telegram_id(telegram_id=request.telegram_id):
         logger.warning("Detected an attempt to register an existing user again")
@@ -96,15 +103,33 @@ async def register(
     )
 
 
-@router.post("/telegram/migrate")
+async def rehash_legacy_password(
+    hasher: PasswordHasher,
+    legacy_user_service: LegacyUserService,
+    legacy_user_id: int,
+    password: str,
+) -> None:
+    """Store the password again with the configured bcrypt cost, if a thread is free."""
+    try:
+        password_hash = await hasher.hash(password)
+    except PasswordHasherBusy:
+        logger.debug(f"Skipped rehashing the password of legacy user {legacy_user_id}")
+        return
+    await legacy_user_service.update_password(legacy_user_id, password_hash)
+
+
+@router.post("/telegram/migrate", dependencies=[Depends(limit_auth_requests)])
 @inject
 async def migrate(
     request: TelegramMigrateRequest,
+    background_tasks: BackgroundTasks,
     legacy_user_service: Annotated[
         LegacyUserService, Depends(Provide[Container.legacy_user_service])
     ],
     config: Annotated[Config, Depends(Provide[Container.config])],
     user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
+    hasher: Annotated[PasswordHasher, Depends(Provide[Container.password_hasher])],
+    telegram_limiter: Annotated[RateLimiter, Depends(Provide[Container.auth_telegram_limiter])],
 ) -> SuccessfulLoginResponse:
     if not verify_telegram_login(
         data=TelegramLoginData(
@@ -122,15 +147,27 @@ async def migrate(
     ):
         logger.info("Invalid Telegram login")
         raise HTTPException(status_code=401, detail="Invalid Telegram login")
+    await limit_telegram_id(telegram_limiter, request.telegram_id)
 
     legacy_user = await legacy_user_service.get_user_by_email(email=request.email)
     if not legacy_user:
         logger.warning("Detected an attempt to migrate a non-existent user")
         raise HTTPException(status_code=403, detail="User is not found")
 
-    if not verify_legacy_user(password=request.password, legacy_user=legacy_user):
+    try:
+        password_ok = await verify_legacy_user(
+            password=request.password, legacy_user=legacy_user, hasher=hasher
+        )
+    except PasswordHasherBusy as e:
+        logger.warning("Rejected a migration attempt: too many password checks in progress")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"}) from e
+    if not password_ok:
         logger.warning("Detected an attempt to migrate with an incorrect password")
         raise HTTPException(status_code=403, detail="Incorrect password")
+    if hasher.needs_rehash(legacy_user.password):
+        background_tasks.add_task(
+            rehash_legacy_password, hasher, legacy_user_service, legacy_user.id, request.password
+        )
 
     user = legacy_user.new_user
 
@@ -154,12 +191,13 @@ async def migrate(
     )
 
 
-@router.post("/telegram/login")
+@router.post("/telegram/login", dependencies=[Depends(limit_auth_requests)])
 @inject
 async def login(
     request: TelegramLoginRequest,
     user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
     config: Annotated[Config, Depends(Provide[Container.config])],
+    telegram_limiter: Annotated[RateLimiter, Depends(Provide[Container.auth_telegram_limiter])],
 ) -> SuccessfulLoginResponse | ErrorLoginResponse:
     if not verify_telegram_login(
         data=TelegramLoginData(
@@ -177,6 +215,7 @@ async def login(
     ):
         logger.info("Invalid Telegram login")
         raise HTTPException(status_code=401, detail="Invalid Telegram login")
+    await limit_telegram_id(telegram_limiter, request.telegram_id)
 
     user = await user_service.get_user_by_telegram_id(telegram_id=request.telegram_id)
     if not user:
@@ -203,7 +242,7 @@ async def login(
     )
 
 
-@router.post("/refresh")
+@router.post("/refresh", dependencies=[Depends(limit_auth_requests)])
 @inject
 async def refresh(
     request: RefreshTokenRequest, config: Annotated[Config, Depends(Provide[Container.config])]
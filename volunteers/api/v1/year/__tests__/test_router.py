@@ -52,7 +52,14 @@ def test_year() -> Year:
 
 @pytest.fixture
 def test_day() -> Day:
-    return Day(id=1, year_id=1, name="Day 1", information="Test day", assignment_published=True)
+    return Day(
+        id=1,
+        year_id=1,
+        name="Day 1",
+        information="Test day",
+        assignment_published=True,
+        assignment_version=3,
+    )
 
 
 @pytest.fixture
@@ -153,8 +160,10 @@ async def test_get_day_assignments_success(
     data: dict[str, Any] = resp.json()
     assert "assignments" in data
     assert len(data["assignments"]) == 1
+    assert data["version"] == 3
 
     assignment = data["assignments"][0]
+    assert assignment["user_day_id"] == test_user_day.id
     assert assignment["name"] == "Denis Potekhin"
     assert assignment["telegram"] == "denispotexin"
     assert assignment["position"] == "Test Position"
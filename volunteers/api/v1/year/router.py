@@ -9,7 +9,7 @@ from volunteers.core.di import Container
 from volunteers.models import User
 from volunteers.schemas.application_form import ApplicationFormIn
 from volunteers.schemas.day import DayOutUser
-from volunteers.schemas.day_assignment import DayAssignmentItem
+from volunteers.schemas.day_assignment import day_assignment_item
 from volunteers.schemas.position import PositionOut
 from volunteers.services.i18n import I18nService
 from volunteers.services.year import YearService
@@ -168,6 +168,7 @@ async def get_day_assignments(
     if not year:
         raise HTTPException(status_code=404, detail="Year not found")
 
+    # Read before the assignments: a stale version only makes clients reapply changes
     day = await year_service.get_day_by_id(day_id=day_id)
     if not day or day.year_id != year_id:
         raise HTTPException(status_code=404, detail="Day not found")
@@ -175,22 +176,17 @@ async def get_day_assignments(
     # Check if assignments are published
     if not (day.assignment_published or user.is_admin):
         logger.debug(f"{DB_PREFIX} Assignments not published for day {day_id}")
-        return DayAssignmentsResponse(assignments=[], is_published=False)
+        return DayAssignmentsResponse(
+            assignments=[], is_published=False, version=day.assignment_version
+        )
 
     assignments = await year_service.get_all_assignments_by_day_id(day_id=day_id)
 
-    assignment_items = [
-        DayAssignmentItem(
-            name=f"{assignment.application_form.user.first_name_en} {assignment.application_form.user.last_name_en}",
-            telegram=assignment.application_form.user.telegram_username,
-            position=assignment.position.name,
-            hall=assignment.hall.name if assignment.hall else None,
-            # attendance=assignment.attendance,
-        )
-        for assignment in assignments
-    ]
+    assignment_items = [day_assignment_item(assignment) for assignment in assignments]
 
     logger.debug(f"{DB_PREFIX} Got day assignments for user-facing API")
     return DayAssignmentsResponse(
-        assignments=assignment_items, is_published=day.assignment_published
+        assignments=assignment_items,
+        is_published=day.assignment_published,
+        version=day.assignment_version,
     )
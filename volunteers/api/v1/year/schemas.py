@@ -38,3 +38,5 @@ class DayAssignmentsResponse(BaseModel):
 
     assignments: list[DayAssignmentItem]
     is_published: bool
+    # assignment_version of the day, to apply later assignment_updated events on top
+    version: int
@@ -10,8 +10,9 @@ from prometheus_client import Counter, make_asgi_app
 
 from volunteers.api.router import router as api_router
 from volunteers.core.di import container
-from volunteers.core.socketio import sio, socket_app
-from volunteers.sockets.assignments import register_assignment_handlers
+from volunteers.core.outbox import ASSIGNMENT_EVENTS, NOTIFICATIONS
+from volunteers.core.socketio import sio, socket_app, socketio_manager
+from volunteers.sockets.assignments import refetch_event, register_assignment_handlers
 
 logger.remove()
 logger.add(sys.stdout, level="DEBUG")
@@ -42,11 +43,37 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     logger.debug(f"Config: {c}")
 
     # Register WebSocket handlers
-    await register_assignment_handlers(sio)
+    assignment_history = container.assignment_history()
+    socketio_manager.on_emit("assignment_updated", assignment_history.record)
+    socketio_manager.on_oversized_emit("assignment_updated", refetch_event)
+    await register_assignment_handlers(sio, container.user_service(), assignment_history)
     logger.info("WebSocket handlers registered")
 
+    # Deliver cache invalidations and socket emits published by other workers and the bot
+    pubsub = container.pubsub()
+    socketio_manager.bind(pubsub, container.session_factory())
+
+    # Deliver notifications and socket events of committed changes
+    outbox_dispatcher = container.outbox_dispatcher()
+    outbox_dispatcher.register(
+        NOTIFICATIONS,
+        container.notifier().send,
+        delay=c.notification.batch_window,
+        interval=c.notification.chat_interval,
+    )
+    outbox_dispatcher.register(
+        ASSIGNMENT_EVENTS,
+        container.assignment_broadcaster().deliver,
+        delay=c.socketio.broadcast_window,
+    )
+    await pubsub.start()
+    await outbox_dispatcher.start()
+
     yield
     # Shutdown
+    await outbox_dispatcher.stop()
+    await pubsub.stop()
+    container.password_hasher().shutdown()
     shutdown_resources = container.shutdown_resources()
     if shutdown_resources:
         await shutdown_resources
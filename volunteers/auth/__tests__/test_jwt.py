@@ -1,6 +1,9 @@
 import datetime
 import os
+import time
+from collections.abc import Generator
 from typing import Any
+from unittest.mock import patch
 
 import pytest
 from dotenv import load_dotenv
@@ -41,6 +44,13 @@ def dummy_config(monkeypatch: pytest.MonkeyPatch) -> Config:
     return config
 
 
+@pytest.fixture(autouse=True)
+def clear_access_token_cache() -> Generator[None]:
+    jwt_tokens._access_token_cache.clear()
+    yield
+    jwt_tokens._access_token_cache.clear()
+
+
 @pytest.fixture
 def token_payload() -> JWTTokenPayload:
     return JWTTokenPayload(user_id=42, role="volunteer")
@@ -144,3 +154,60 @@ async def test_verify_refresh_token_wrong_type(
         await jwt_tokens.verify_refresh_token(token, config=dummy_config)
     assert exc.value.status_code == 401
     assert exc.value.detail == "Invalid token type"
+
+
+@pytest.mark.asyncio
+async def test_verify_access_token_caches_until_expiry(
+    dummy_config: Config, token_payload: JWTTokenPayload
+) -> None:
+    token = await jwt_tokens.create_access_token(token_payload, config=dummy_config)
+    verified = await jwt_tokens.verify_access_token(token, config=dummy_config)
+
+    with patch.object(jwt_tokens, "decode_token", side_effect=AssertionError):
+        assert await jwt_tokens.verify_access_token(token, config=dummy_config) is verified
+
+    # Once the token expires it is verified again, and rejected
+    expired = time.monotonic() + dummy_config.jwt.expiration + 1
+    with (
+        patch("volunteers.core.cache.time.monotonic", return_value=expired),
+        patch.object(jwt_tokens, "decode_token", side_effect=HTTPException(401)) as decode,
+        pytest.raises(HTTPException),
+    ):
+        await jwt_tokens.verify_access_token(token, config=dummy_config)
+    decode.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_verify_access_token_does_not_cache_rejected_tokens(
+    dummy_config: Config, token_payload: JWTTokenPayload
+) -> None:
+    token = await jwt_tokens.create_refresh_token(token_payload, config=dummy_config)
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await jwt_tokens.verify_access_token(token, config=dummy_config)
+    with pytest.raises(HTTPException):
+        await jwt_tokens.verify_access_token(token + "tampered", config=dummy_config)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_verify_access_token_benchmark(
+    dummy_config: Config, token_payload: JWTTokenPayload
+) -> None:
+    """Per-request cost of authenticating the same access token, uncached vs cached."""
+    token = await jwt_tokens.create_access_token(token_payload, config=dummy_config)
+    rounds = 2000
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        jwt_tokens._access_token_cache.clear()
+        await jwt_tokens.verify_access_token(token, config=dummy_config)
+    uncached = (time.perf_counter() - start) / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await jwt_tokens.verify_access_token(token, config=dummy_config)
+    cached = (time.perf_counter() - start) / rounds
+
+    print(f"verify_access_token: {uncached * 1e6:.1f} us uncached, {cached * 1e6:.1f} us cached")
+    assert cached < uncached
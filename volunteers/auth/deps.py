@@ -1,12 +1,14 @@
+from collections.abc import AsyncGenerator
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from loguru import logger
 
 from volunteers.auth.jwt_tokens import verify_access_token
 from volunteers.core.di import Container
+from volunteers.core.rate_limit import ConcurrencyLimiter, RateLimiter, RateLimitExceeded
 from volunteers.models import User
 from volunteers.services.user import UserService
 
@@ -19,7 +21,7 @@ async def with_user(
     user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
 ) -> User:
     payload = await verify_access_token(token.credentials)
-    user = await user_service.get_user_by_id(payload.user_id)
+    user = await user_service.get_user_by_id_cached(payload.user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     logger.info(f"User {user.id} has been authenticated, is_admin: {user.is_admin}")
@@ -30,3 +32,48 @@ async def with_admin(user: Annotated[User, Depends(with_user)]) -> User:
     if not user.is_admin:
         raise HTTPException(status_code=403, detail="Forbidden")
     return user
+
+
+def too_many_requests(e: RateLimitExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header}
+    )
+
+
+@inject
+async def limit_auth_requests(
+    request: Request,
+    ip_limiter: Annotated[RateLimiter, Depends(Provide[Container.auth_ip_limiter])],
+    concurrency_limiter: Annotated[
+        ConcurrencyLimiter, Depends(Provide[Container.auth_concurrency_limiter])
+    ],
+) -> AsyncGenerator[None]:
+    """Admission control for the login endpoints, applied before any work is done.
+
+    Limits requests per client IP and the number of auth requests handled at once.
+    Behind the proxy the IP comes from X-Forwarded-For, which the proxy sets to the
+    client IP alone and gunicorn trusts (``--forwarded-allow-ips`` in the Dockerfile).
+    """
+    client = request.client.host if request.client else "unknown"
+    try:
+        await ip_limiter.hit(client)
+        concurrency_limiter.acquire()
+    except RateLimitExceeded as e:
+        logger.warning(f"Refused an auth request from {client}: {e}")
+        raise too_many_requests(e) from e
+    try:
+        yield
+    finally:
+        concurrency_limiter.release()
+
+
+async def limit_telegram_id(limiter: RateLimiter, telegram_id: int) -> None:
+    """Count a login attempt with a verified Telegram signature.
+
+    Called after verification, so forged requests cannot lock another user out.
+    """
+    try:
+        await limiter.hit(str(telegram_id))
+    except RateLimitExceeded as e:
+        logger.warning(f"Refused an auth request for telegram id {telegram_id}: {e}")
+        raise too_many_requests(e) from e
@@ -1,4 +1,6 @@
 import datetime
+import hashlib
+import time
 from typing import Any
 
 import jwt
@@ -7,15 +9,25 @@ from fastapi import HTTPException
 from loguru import logger
 from pydantic import BaseModel
 
+from volunteers.core.cache import TTLCache
 from volunteers.core.config import Config
 from volunteers.core.di import Container
 
+# Upper bound on verified access tokens kept in memory
+ACCESS_TOKEN_CACHE_SIZE = 10_000
+
 
 class JWTTokenPayload(BaseModel):
     user_id: int
     role: str
 
 
+# Verified access tokens keyed by their SHA-256, each kept until the token expires
+_access_token_cache: TTLCache[bytes, JWTTokenPayload] = TTLCache(
+    "access_token", max_size=ACCESS_TOKEN_CACHE_SIZE, ttl=0
+)
+
+
 @inject
 def create_token(payload: dict[str, Any], config: Config = Provide[Container.config]) -> str:
     return jwt.encode(payload, config.jwt.secret, algorithm=config.jwt.algorithm)
@@ -72,14 +84,24 @@ def decode_token(token: str, config: Config = Provide[Container.config]) -> dict
     return token_data
 
 
-@inject
-async def verify_access_token(
-    token: str, config: Config = Provide[Container.config]
-) -> JWTTokenPayload:
-    payload = decode_token(token)
+async def verify_access_token(token: str, config: Config | None = None) -> JWTTokenPayload:
+    """Verify an access token, or return the payload of an earlier verification of it.
+
+    Runs on every authenticated request, so a cache hit skips the signature and claim
+    checks as well as configuration injection.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    cached = _access_token_cache.get(key)
+    if cached is not None:
+        return cached
+
+    payload = decode_token(token) if config is None else decode_token(token, config=config)
     if payload["type"] != "access":
         raise HTTPException(status_code=401, detail="Invalid token type")
-    return JWTTokenPayload(**payload)
+    verified = JWTTokenPayload(**payload)
+    if "exp" in payload:
+        _access_token_cache.set(key, verified, ttl=payload["exp"] - time.time())
+    return verified
 
 
 @inject
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import bcrypt
+import pytest
+from prometheus_client import REGISTRY
+
+from volunteers.auth.providers.legacy import PasswordHasher, PasswordHasherBusy, verify_legacy_user
+from volunteers.models import LegacyUser
+
+
+async def test_verify_legacy_user() -> None:
+    hasher = PasswordHasher(max_workers=1, max_pending=1, rounds=4)
+    legacy_user = LegacyUser(password=bcrypt.hashpw(b"secret", bcrypt.gensalt(4)).decode())
+
+    assert await verify_legacy_user("secret", legacy_user, hasher)
+    assert not await verify_legacy_user("wrong", legacy_user, hasher)
+    hasher.shutdown()
+
+
+async def test_hash_and_needs_rehash() -> None:
+    hasher = PasswordHasher(max_workers=1, max_pending=1, rounds=5)
+
+    password_hash = await hasher.hash("secret")
+    assert password_hash.startswith("$2b$05$")
+    assert await hasher.check("secret", password_hash)
+    assert not hasher.needs_rehash(password_hash)
+    assert hasher.needs_rehash(bcrypt.hashpw(b"secret", bcrypt.gensalt(4)).decode())
+    assert hasher.needs_rehash("not a bcrypt hash")
+    hasher.shutdown()
+
+
+async def test_checks_do_not_block_event_loop() -> None:
+    hasher = PasswordHasher(max_workers=2, max_pending=8, rounds=4)
+    slow_hash = bcrypt.hashpw(b"secret", bcrypt.gensalt(12)).decode()
+    ticks = 0
+
+    async def tick() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    start = time.monotonic()
+    assert all(await asyncio.gather(*[hasher.check("secret", slow_hash) for _ in range(4)]))
+    elapsed = time.monotonic() - start
+    ticker.cancel()
+
+    # The loop kept ticking at roughly its normal rate while bcrypt ran
+    assert ticks >= elapsed / 0.01 / 2
+    hasher.shutdown()
+
+
+async def test_rejects_checks_beyond_queue_limit() -> None:
+    hasher = PasswordHasher(max_workers=1, max_pending=1, rounds=4)
+    slow_hash = bcrypt.hashpw(b"secret", bcrypt.gensalt(10)).decode()
+    rejected = REGISTRY.get_sample_value("password_hash_rejected_total") or 0.0
+
+    running = asyncio.create_task(hasher.check("secret", slow_hash))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(hasher.check("secret", slow_hash))
+    await asyncio.sleep(0)
+    assert REGISTRY.get_sample_value("password_hash_queue_depth") == 1
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.check("secret", slow_hash)
+    assert await running
+    assert await waiting
+    assert REGISTRY.get_sample_value("password_hash_queue_depth") == 0
+    assert REGISTRY.get_sample_value("password_hash_rejected_total") == rejected + 1
+    hasher.shutdown()
@@ -1,7 +1,76 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
+from prometheus_client import Counter, Gauge
 
 from volunteers.models import LegacyUser
 
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth", "Password hashing calls waiting for a free thread"
+)
+PASSWORD_HASH_REJECTED_TOTAL = Counter(
+    "password_hash_rejected_total", "Password hashing calls rejected because the queue was full"
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password checks are already waiting."""
+
+    def __init__(self) -> None:
+        super().__init__("Too many password checks in progress")
+
+
+class PasswordHasher:
+    """Runs bcrypt on a few dedicated threads so that it never blocks the event loop.
+
+    At most ``max_workers`` hashes run at once and at most ``max_pending`` more wait
+    for a thread; anything beyond that is rejected with ``PasswordHasherBusy``.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, rounds: int) -> None:
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="bcrypt")
+        self._slots = asyncio.Semaphore(max_workers)
+        self._waiting = 0
+
+    async def _run[T](self, fn: Callable[[], T]) -> T:
+        if self._waiting >= self.max_pending and self._slots.locked():
+            PASSWORD_HASH_REJECTED_TOTAL.inc()
+            raise PasswordHasherBusy()
+
+        self._waiting += 1
+        PASSWORD_HASH_QUEUE_DEPTH.set(self._waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+            PASSWORD_HASH_QUEUE_DEPTH.set(self._waiting)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn)
+        finally:
+            self._slots.release()
+
+    async def check(self, password: str, hashed: str) -> bool:
+        return await self._run(lambda: bcrypt.checkpw(password.encode(), hashed.encode()))
+
+    async def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(self.rounds)
+        return (await self._run(lambda: bcrypt.hashpw(password.encode(), salt))).decode()
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Whether ``hashed`` was made with a cost factor other than ``rounds``."""
+        # bcrypt hashes look like $2b$<cost>$<salt and checksum>
+        parts = hashed.split("$")
+        return len(parts) < 4 or not parts[2].isdigit() or int(parts[2]) != self.rounds
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
 
-def verify_legacy_user(password: str, legacy_user: LegacyUser) -> bool:
-    return bcrypt.checkpw(password.encode(), legacy_user.password.encode())
+async def verify_legacy_user(
+    password: str, legacy_user: LegacyUser, hasher: PasswordHasher
+) -> bool:
+    return await hasher.check(password, legacy_user.password)
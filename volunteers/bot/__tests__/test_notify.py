@@ -0,0 +1,50 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import aiogram.exceptions
+import pytest
+
+from volunteers.bot.notify import MAX_MESSAGE_LENGTH, Notifier, count_joinable
+from volunteers.core.config import Config
+from volunteers.core.outbox import DeliveryPostponed
+
+
+def make_notifier() -> tuple[Notifier, AsyncMock]:
+    bot = MagicMock()
+    bot.send_message = AsyncMock()
+    return Notifier(AsyncMock(return_value=bot), Config()), bot.send_message
+
+
+def test_count_joinable_respects_length_limit() -> None:
+    long = "x" * (MAX_MESSAGE_LENGTH - 2)
+    assert count_joinable(["a", "b", long, "c"]) == 2
+    assert count_joinable([long, "c"]) == 1
+    assert count_joinable(["a", "x" * (MAX_MESSAGE_LENGTH - 3)]) == 2
+
+
+async def test_notifications_are_sent_as_one_message() -> None:
+    notifier, send_message = make_notifier()
+
+    assert await notifier.send(["first", "second", "x" * MAX_MESSAGE_LENGTH]) == 2
+    send_message.assert_awaited_once_with(chat_id=1, text="first\n\nsecond")
+
+    # A notification too long for Telegram is cut rather than blocking the outbox
+    assert await notifier.send(["x" * (MAX_MESSAGE_LENGTH + 1)]) == 1
+    assert len(send_message.await_args.kwargs["text"]) == MAX_MESSAGE_LENGTH
+
+
+async def test_failed_sends_raise() -> None:
+    notifier, send_message = make_notifier()
+    method = MagicMock()
+    send_message.side_effect = [
+        aiogram.exceptions.TelegramRetryAfter(method, "Too Many Requests", retry_after=7),
+        aiogram.exceptions.TelegramNetworkError(method, "Timeout"),
+        aiogram.exceptions.TelegramBadRequest(method, "Bad Request"),
+    ]
+
+    with pytest.raises(DeliveryPostponed) as exc_info:
+        await notifier.send(["first"])
+    assert exc_info.value.delay == 7
+    with pytest.raises(aiogram.exceptions.TelegramNetworkError):
+        await notifier.send(["first"])
+    with pytest.raises(aiogram.exceptions.TelegramBadRequest):
+        await notifier.send(["first"])
@@ -1,17 +1,47 @@
+from collections.abc import Awaitable, Callable
+
 import aiogram
 import aiogram.exceptions
-from loguru import logger
 
 from volunteers.core.config import Config
+from volunteers.core.outbox import DeliveryPostponed
+
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit of one message
+
+
+def count_joinable(messages: list[str]) -> int:
+    """Number of messages, from the first, that fit one Telegram message when joined."""
+    length = len(messages[0])
+    for count, message in enumerate(messages[1:], start=1):
+        length += 2 + len(message)
+        if length > MAX_MESSAGE_LENGTH:
+            return count
+    return len(messages)
 
 
 class Notifier:
-    def __init__(self, bot: aiogram.Bot, config: Config) -> None:
+    """Sends notifications from the outbox to the notification chat.
+
+    Failed sends raise, so that the outbox keeps the notifications and retries them.
+    The bot is resolved on the first send, so creating the notifier does not need a
+    valid token.
+    """
+
+    def __init__(self, bot: Callable[[], Awaitable[aiogram.Bot]], config: Config) -> None:
         self.bot = bot
         self.config = config
 
-    async def notify(self, message: str) -> None:
+    async def send(self, messages: list[str]) -> int:
+        """Send the first ``messages`` that fit one Telegram message, joined into one.
+
+        Returns:
+            The number of sent messages; the outbox delivers the rest in the next batch
+        """
+        count = count_joinable(messages)
+        text = "\n\n".join(messages[:count])[:MAX_MESSAGE_LENGTH]
+        bot = await self.bot()
         try:
-            await self.bot.send_message(chat_id=self.config.notification.tg_chat_id, text=message)
-        except aiogram.exceptions.TelegramAPIError as e:
-            logger.error(f"Failed to send notification: {e}")
+            await bot.send_message(chat_id=self.config.notification.tg_chat_id, text=text)
+        except aiogram.exceptions.TelegramRetryAfter as e:
+            raise DeliveryPostponed(e.retry_after) from e
+        return count
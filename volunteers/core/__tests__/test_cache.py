@@ -0,0 +1,62 @@
+import asyncio
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY
+
+from volunteers.core.cache import TTLCache
+
+
+def counter(cache: str, result: str) -> float:
+    return (
+        REGISTRY.get_sample_value("cache_requests_total", {"cache": cache, "result": result}) or 0.0
+    )
+
+
+def test_hits_misses_and_expiry() -> None:
+    cache: TTLCache[int, str] = TTLCache("test_expiry", max_size=10, ttl=30)
+    with patch("volunteers.core.cache.time.monotonic", return_value=100.0):
+        assert cache.get(1) is None
+        cache.set(1, "one")
+        assert cache.get(1) == "one"
+    with patch("volunteers.core.cache.time.monotonic", return_value=130.0):
+        assert cache.get(1) is None
+
+    assert counter("test_expiry", "hit") == 1
+    assert counter("test_expiry", "miss") == 2
+
+
+def test_evicts_least_recently_used() -> None:
+    cache: TTLCache[int, str] = TTLCache("test_lru", max_size=2, ttl=30)
+    cache.set(1, "one")
+    cache.set(2, "two")
+    assert cache.get(1) == "one"
+    cache.set(3, "three")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "one"
+    assert cache.get(3) == "three"
+    assert REGISTRY.get_sample_value("cache_entries", {"cache": "test_lru"}) == 2
+
+
+async def test_get_or_load_drops_loads_racing_with_invalidation() -> None:
+    cache: TTLCache[int, str] = TTLCache("test_race", max_size=10, ttl=30)
+    loading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_load() -> str:
+        loading.set()
+        await release.wait()
+        return "stale"
+
+    task = asyncio.create_task(cache.get_or_load(1, slow_load))
+    await loading.wait()
+    cache.invalidate(1)
+    release.set()
+    assert await task == "stale"
+    assert cache.get(1) is None
+
+    async def load() -> str:
+        return "fresh"
+
+    assert await cache.get_or_load(1, load) == "fresh"
+    assert cache.get(1) == "fresh"
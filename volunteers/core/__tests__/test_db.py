@@ -0,0 +1,227 @@
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import event, exc, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from volunteers.conftest import seed_year
+from volunteers.core.config import DatabaseConfig
+from volunteers.core.db import (
+    create_engine,
+    create_replica_engine,
+    create_replica_session_factory,
+    create_session_factory,
+    current_unit_of_work,
+    request_unit_of_work,
+)
+from volunteers.models import ApplicationForm, Year
+from volunteers.schemas.application_form import ApplicationFormIn
+from volunteers.services.year import YearService
+
+pytestmark = pytest.mark.postgres
+
+
+@contextmanager
+def count_checkouts(engine: AsyncEngine) -> Iterator[list[None]]:
+    checkouts: list[None] = []
+
+    def on_checkout(*_: Any) -> None:
+        checkouts.append(None)
+
+    event.listen(engine.sync_engine.pool, "checkout", on_checkout)
+    try:
+        yield checkouts
+    finally:
+        event.remove(engine.sync_engine.pool, "checkout", on_checkout)
+
+
+async def create_year_and_user(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> tuple[int, int]:
+    async with session_factory() as session:
+        seeded = await seed_year(session, users=1, registered=0)
+        await session.commit()
+        return seeded.year.id, seeded.users[0].id
+
+
+async def save_form(year_service: YearService, year_id: int, user_id: int) -> None:
+    """The service calls of ``POST /year/{year_id}/form`` for a new form."""
+    assert await year_service.get_year_by_year_id(year_id) is not None
+    assert await year_service.get_form_by_year_id_and_user_id(year_id, user_id) is None
+    await year_service.create_form(
+        ApplicationFormIn(
+            year_id=year_id, user_id=user_id, desired_positions_ids=set(), itmo_group=None
+        )
+    )
+
+
+async def test_request_unit_of_work_checks_out_one_connection(
+    pg_engine: AsyncEngine,
+    pg_session_factory: async_sessionmaker[AsyncSession],
+    year_service: YearService,
+) -> None:
+    year_id, user_id = await create_year_and_user(pg_session_factory)
+    _, other_user_id = await create_year_and_user(pg_session_factory)
+
+    with count_checkouts(pg_engine) as without_unit_of_work:
+        await save_form(year_service, year_id, user_id)
+    with count_checkouts(pg_engine) as with_unit_of_work:
+        async with request_unit_of_work(pg_engine, pg_session_factory):
+            await save_form(year_service, year_id, other_user_id)
+
+    assert len(without_unit_of_work) == 3
+    assert len(with_unit_of_work) == 1
+
+    # The unit of work commits for real
+    async with pg_session_factory() as session:
+        forms = (await session.execute(select(ApplicationForm.user_id))).scalars().all()
+    assert sorted(forms) == [user_id, other_user_id]
+
+
+async def test_request_unit_of_work_is_scoped_to_its_task(
+    pg_engine: AsyncEngine,
+    pg_session_factory: async_sessionmaker[AsyncSession],
+    year_service: YearService,
+) -> None:
+    year_id, _ = await create_year_and_user(pg_session_factory)
+
+    async with request_unit_of_work(pg_engine, pg_session_factory) as unit_of_work:
+        assert current_unit_of_work() is unit_of_work
+
+        async def in_background() -> None:
+            assert current_unit_of_work() is None
+            assert await year_service.get_year_by_year_id(year_id) is not None
+
+        with count_checkouts(pg_engine) as checkouts:
+            await year_service.get_year_by_year_id(year_id)
+            await asyncio.create_task(in_background())
+        assert len(checkouts) == 2
+
+    assert unit_of_work.closed
+    assert current_unit_of_work() is None
+
+
+async def test_request_unit_of_work_rolls_back_failed_operation(
+    pg_engine: AsyncEngine,
+    pg_session_factory: async_sessionmaker[AsyncSession],
+    year_service: YearService,
+) -> None:
+    year_id, _ = await create_year_and_user(pg_session_factory)
+
+    async with request_unit_of_work(pg_engine, pg_session_factory):
+        with pytest.raises(RuntimeError):
+            async with year_service.session_scope() as session:
+                session.add(Year(year_name="never", open_for_registration=False))
+                await session.flush()
+                raise RuntimeError
+        # The shared session is still usable after the failure
+        assert await year_service.get_year_by_year_id(year_id) is not None
+        async with year_service.session_scope() as session:
+            session.add(Year(year_name="uncommitted", open_for_registration=False))
+            await session.flush()
+
+    async with pg_session_factory() as session:
+        names = (await session.execute(select(Year.year_name))).scalars().all()
+    assert names == ["2025"]
+
+
+def pool_metric(name: str, pool: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, {"pool": pool, **labels}) or 0.0
+
+
+async def test_create_engine_applies_pool_config_and_reports_metrics(pg_url: str) -> None:
+    engine = create_engine(
+        DatabaseConfig(
+            url=pg_url, pool_size=1, max_overflow=0, pool_timeout=0.1, statement_timeout=100
+        ),
+        name="test",
+    )
+    checkouts = pool_metric("db_pool_checkout_seconds_count", "test")
+    timeouts = pool_metric("db_pool_connection_errors_total", "test", reason="timeout")
+    invalidated = pool_metric("db_pool_connection_errors_total", "test", reason="invalidated")
+    try:
+        async with engine.connect() as connection:
+            assert await connection.scalar(text("SHOW statement_timeout")) == "100ms"
+            assert pool_metric("db_pool_checked_out_connections", "test") == 1
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+            with pytest.raises(exc.DBAPIError, match="statement timeout"):
+                await connection.execute(text("SELECT pg_sleep(1)"))
+            await connection.invalidate()
+    finally:
+        await engine.dispose()
+
+    assert pool_metric("db_pool_checked_out_connections", "test") == 0
+    assert pool_metric("db_pool_checkout_seconds_count", "test") == checkouts + 2
+    assert pool_metric("db_pool_connection_errors_total", "test", reason="timeout") == timeouts + 1
+    assert (
+        pool_metric("db_pool_connection_errors_total", "test", reason="invalidated")
+        == invalidated + 1
+    )
+
+
+async def count_years(service: YearService, read_only: bool) -> int:
+    async with service.session_scope(read_only=read_only) as session:
+        return len((await session.execute(select(Year.id))).all())
+
+
+async def test_read_only_scopes_use_replica_until_request_writes(
+    pg_engine: AsyncEngine,
+    pg_replica_engine: AsyncEngine,
+    pg_session_factory: async_sessionmaker[AsyncSession],
+    year_service: YearService,
+) -> None:
+    year_service.replica_session_factory = create_session_factory(pg_replica_engine)
+    await create_year_and_user(pg_session_factory)
+
+    assert await count_years(year_service, read_only=False) == 1
+    assert await count_years(year_service, read_only=True) == 0
+
+    writes: list[None] = []
+    async with request_unit_of_work(
+        pg_engine, pg_session_factory, on_write=lambda: writes.append(None)
+    ):
+        assert await count_years(year_service, read_only=True) == 0
+        assert await count_years(year_service, read_only=False) == 1
+        assert writes == []
+
+        async with year_service.session_scope() as session:
+            session.add(Year(year_name="2026", open_for_registration=False))
+            await session.commit()
+        async with year_service.session_scope() as session:
+            session.add(Year(year_name="2027", open_for_registration=False))
+            await session.commit()
+        assert len(writes) == 1
+        assert await count_years(year_service, read_only=True) == 3
+
+    # Clients that wrote recently read from the primary from the start
+    async with request_unit_of_work(pg_engine, pg_session_factory, reads_from_primary=True):
+        assert await count_years(year_service, read_only=True) == 3
+
+
+async def test_read_only_scopes_share_the_request_session_without_replica(
+    pg_url: str,
+    pg_engine: AsyncEngine,
+    pg_session_factory: async_sessionmaker[AsyncSession],
+    year_service: YearService,
+) -> None:
+    # As wired by the container when no replica_url is configured
+    year_service.replica_session_factory = create_replica_session_factory(
+        create_replica_engine(DatabaseConfig(url=pg_url), pg_engine),
+        pg_engine,
+        pg_session_factory,
+    )
+    await create_year_and_user(pg_session_factory)
+
+    with count_checkouts(pg_engine) as checkouts:
+        async with request_unit_of_work(pg_engine, pg_session_factory):
+            assert await count_years(year_service, read_only=True) == 1
+            assert await count_years(year_service, read_only=False) == 1
+            assert await count_years(year_service, read_only=True) == 1
+
+    assert len(checkouts) == 1
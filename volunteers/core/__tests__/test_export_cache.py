@@ -0,0 +1,79 @@
+import os
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from prometheus_client import REGISTRY
+
+from volunteers.core.export_cache import ExportCache
+
+
+def counter(result: str) -> float:
+    return REGISTRY.get_sample_value("export_cache_requests_total", {"result": result}) or 0.0
+
+
+class Builder:
+    def __init__(self, *chunks: bytes) -> None:
+        self.chunks = chunks
+        self.calls = 0
+
+    async def build(self) -> AsyncIterator[bytes]:
+        self.calls += 1
+        for chunk in self.chunks:
+            yield chunk
+
+
+async def collect(chunks: AsyncIterator[bytes]) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+async def test_miss_then_hit(tmp_path: Path) -> None:
+    cache = ExportCache(str(tmp_path), max_bytes=1024)
+    builder = Builder(b"abc", b"def")
+    hits, misses = counter("hit"), counter("miss")
+
+    assert await collect(cache.get_or_build("key", builder.build)) == b"abcdef"
+    assert await collect(cache.get_or_build("key", builder.build)) == b"abcdef"
+
+    assert builder.calls == 1
+    assert counter("miss") == misses + 1
+    assert counter("hit") == hits + 1
+    assert [path.name for path in tmp_path.iterdir()] == ["key.zip"]
+
+
+async def test_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ExportCache(str(tmp_path), max_bytes=10)
+    await collect(cache.get_or_build("old", Builder(b"x" * 4).build))
+    await collect(cache.get_or_build("used", Builder(b"y" * 4).build))
+    os.utime(tmp_path / "old.zip", (1, 1))
+    os.utime(tmp_path / "used.zip", (2, 2))
+    # A hit makes "used" the most recently used entry
+    await collect(cache.get_or_build("used", Builder().build))
+
+    await collect(cache.get_or_build("new", Builder(b"z" * 4).build))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["new.zip", "used.zip"]
+
+
+async def test_incomplete_export_is_not_cached(tmp_path: Path) -> None:
+    cache = ExportCache(str(tmp_path), max_bytes=1024)
+
+    async def failing() -> AsyncIterator[bytes]:
+        yield b"partial"
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        await collect(cache.get_or_build("key", failing))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_disabled_cache_always_builds(tmp_path: Path) -> None:
+    cache = ExportCache(str(tmp_path / "cache"), max_bytes=0)
+    builder = Builder(b"abc")
+
+    await collect(cache.get_or_build("key", builder.build))
+    await collect(cache.get_or_build("key", builder.build))
+
+    assert builder.calls == 2
+    assert not (tmp_path / "cache").exists()
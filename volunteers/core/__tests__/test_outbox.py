@@ -0,0 +1,154 @@
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from volunteers.core.outbox import DeliveryPostponed, Outbox, OutboxDispatcher
+from volunteers.core.pubsub import PgPubSub
+from volunteers.models import OutboxMessage
+
+pytestmark = pytest.mark.postgres
+
+
+def make_dispatcher(
+    pg_engine: AsyncEngine, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> OutboxDispatcher:
+    return OutboxDispatcher(pg_session_factory, PgPubSub(pg_engine), batch_size=2, poll_interval=60)
+
+
+async def add(
+    pg_session_factory: async_sessionmaker[AsyncSession], *payloads: Any, commit: bool = True
+) -> None:
+    async with pg_session_factory() as session:
+        for payload in payloads:
+            await Outbox().add(session, "test", payload)
+        if commit:
+            await session.commit()
+
+
+async def count(pg_session_factory: async_sessionmaker[AsyncSession]) -> int:
+    async with pg_session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(OutboxMessage)) or 0
+
+
+async def test_messages_are_kept_with_their_transaction(
+    pg_engine: AsyncEngine, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    dispatcher = make_dispatcher(pg_engine, pg_session_factory)
+    handler = AsyncMock(return_value=None)
+    dispatcher.register("test", handler)
+
+    await add(pg_session_factory, "rolled back", commit=False)
+    await add(pg_session_factory, "a", {"b": [1]}, "c")
+
+    assert await dispatcher.dispatch("test") == 2
+    assert await dispatcher.dispatch("test") == 1
+    assert await dispatcher.dispatch("test") == 0
+    assert [c.args[0] for c in handler.await_args_list] == [["a", {"b": [1]}], ["c"]]
+    assert await count(pg_session_factory) == 0
+
+
+async def test_failed_deliveries_are_retried(
+    pg_engine: AsyncEngine, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    dispatcher = make_dispatcher(pg_engine, pg_session_factory)
+    handler = AsyncMock(side_effect=[RuntimeError("Telegram is down"), None])
+    dispatcher.register("test", handler)
+    await add(pg_session_factory, "a")
+
+    with pytest.raises(RuntimeError):
+        await dispatcher.dispatch("test")
+    assert await count(pg_session_factory) == 1
+    assert await dispatcher.dispatch("test") == 1
+    assert await count(pg_session_factory) == 0
+
+
+async def test_partly_delivered_batches_keep_the_rest(
+    pg_engine: AsyncEngine, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    dispatcher = make_dispatcher(pg_engine, pg_session_factory)
+    handler = AsyncMock(return_value=1)
+    dispatcher.register("test", handler)
+    await add(pg_session_factory, "a", "b")
+
+    assert await dispatcher.dispatch("test") == 1
+    assert await dispatcher.dispatch("test") == 1
+    assert [c.args[0] for c in handler.await_args_list] == [["a", "b"], ["b"]]
+    assert await count(pg_session_factory) == 0
+
+
+async def test_dispatcher_retries_failed_batches(
+    pg_engine: AsyncEngine, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    dispatcher = OutboxDispatcher(
+        pg_session_factory, PgPubSub(pg_engine), batch_size=2, poll_interval=0.05, retry_backoff=0
+    )
+    failures: list[Exception] = [RuntimeError("Telegram is down"), DeliveryPostponed(0.05)]
+    delivered: asyncio.Queue[list[str]] = asyncio.Queue()
+
+    async def handle(payloads: list[str]) -> None:
+        if failures:
+            raise failures.pop(0)
+        delivered.put_nowait(payloads)
+
+    dispatcher.register("test", handle)
+    await add(pg_session_factory, "a")
+    await dispatcher.start()
+    try:
+        assert await asyncio.wait_for(delivered.get(), 5) == ["a"]
+        # Deleted after the handler returns
+        async with asyncio.timeout(5):
+            while await count(pg_session_factory):
+                await asyncio.sleep(0.01)
+    finally:
+        await dispatcher.stop()
+    assert failures == []
+
+
+async def test_dispatchers_share_messages(
+    pg_engine: AsyncEngine, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    # Dispatchers of two workers
+    first, second = (make_dispatcher(pg_engine, pg_session_factory) for _ in range(2))
+    release = asyncio.Event()
+    delivered: list[list[str]] = []
+
+    async def slow(payloads: list[str]) -> None:
+        await release.wait()
+        delivered.append(payloads)
+
+    first.register("test", slow)
+    second.register("test", AsyncMock(side_effect=delivered.append))
+    await add(pg_session_factory, "a", "b", "c")
+
+    # The second dispatcher skips the batch locked by the first one
+    dispatching = asyncio.create_task(first.dispatch("test"))
+    await asyncio.sleep(0.1)
+    assert await second.dispatch("test") == 1
+    release.set()
+    assert await dispatching == 2
+    assert delivered == [["c"], ["a", "b"]]
+
+
+@pytest.mark.slow
+async def test_new_messages_wake_up_the_dispatcher(
+    pg_engine: AsyncEngine, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    pubsub = PgPubSub(pg_engine)
+    dispatcher = OutboxDispatcher(pg_session_factory, pubsub, batch_size=2, poll_interval=60)
+    delivered: asyncio.Queue[list[str]] = asyncio.Queue()
+    dispatcher.register("test", AsyncMock(side_effect=delivered.put_nowait))
+    await pubsub.start()
+    await dispatcher.start()
+    try:
+        await asyncio.wait_for(pubsub.connected.wait(), 5)
+        async with pg_session_factory() as session:
+            await Outbox(pubsub).add(session, "test", "a")
+            await session.commit()
+        assert await asyncio.wait_for(delivered.get(), 5) == ["a"]
+    finally:
+        await dispatcher.stop()
+        await pubsub.stop()
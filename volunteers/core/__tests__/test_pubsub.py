@@ -0,0 +1,112 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from volunteers.conftest import use_test_database
+from volunteers.core.cache import TTLCache
+from volunteers.core.pubsub import PgPubSub
+from volunteers.schemas.user import UserIn, UserUpdate
+from volunteers.services.user import UserService
+
+pytestmark = pytest.mark.postgres
+
+
+@pytest.fixture
+async def pubsub(pg_engine: AsyncEngine) -> AsyncGenerator[PgPubSub]:
+    pubsub = PgPubSub(pg_engine, reconnect_delay=0.05)
+    await pubsub.start()
+    await asyncio.wait_for(pubsub.connected.wait(), 5)
+    yield pubsub
+    await pubsub.stop()
+
+
+async def test_messages_are_delivered_on_commit(
+    pubsub: PgPubSub, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    received: asyncio.Queue[str] = asyncio.Queue()
+    pubsub.subscribe("test", received.put_nowait)
+    pubsub.subscribe("other", MagicMock(side_effect=AssertionError))
+
+    async with pg_session_factory() as session:
+        await pubsub.publish(session, "test", "rolled back")
+        await session.rollback()
+        await pubsub.publish(session, "test", "committed")
+        await asyncio.sleep(0.1)
+        assert received.empty()
+        await session.commit()
+
+    assert await asyncio.wait_for(received.get(), 5) == "committed"
+    await asyncio.sleep(0.1)
+    assert received.empty()
+
+
+async def test_listener_reconnects(
+    pubsub: PgPubSub, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    reconnected = asyncio.Event()
+    received: asyncio.Queue[str] = asyncio.Queue()
+    pubsub.subscribe("test", received.put_nowait, on_reconnect=reconnected.set)
+
+    async with pg_session_factory() as session:
+        await session.execute(
+            text(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE query LIKE 'LISTEN %'"
+            )
+        )
+    await asyncio.wait_for(reconnected.wait(), 5)
+
+    async with pg_session_factory() as session:
+        await pubsub.publish(session, "test", "after reconnect")
+        await session.commit()
+    assert await asyncio.wait_for(received.get(), 5) == "after reconnect"
+
+
+async def test_user_updates_invalidate_other_processes(
+    pg_engine: AsyncEngine,
+    pg_session_factory: async_sessionmaker[AsyncSession],
+    pubsub: PgPubSub,
+) -> None:
+    def make_service(pubsub: PgPubSub) -> UserService:
+        service = UserService(cache=TTLCache("user_test", max_size=10, ttl=60), pubsub=pubsub)
+        return use_test_database(service, pg_engine, pg_session_factory)
+
+    other_pubsub = PgPubSub(pg_engine, reconnect_delay=0.05)
+    await other_pubsub.start()
+    try:
+        await asyncio.wait_for(other_pubsub.connected.wait(), 5)
+        writer, reader = make_service(pubsub), make_service(other_pubsub)
+
+        user = await writer.create_user(
+            UserIn(
+                telegram_id=1,
+                first_name_ru="Имя",
+                last_name_ru="Фамилия",
+                first_name_en="A",
+                last_name_en="B",
+                is_admin=False,
+                isu_id=None,
+                patronymic_ru=None,
+                phone=None,
+                email=None,
+                telegram_username=None,
+                gender=None,
+            )
+        )
+        cached = await reader.get_user_by_id_cached(user.id)
+        assert cached is not None
+        assert await reader.get_user_by_id_cached(user.id) is cached
+
+        await writer.update_user(user.id, UserUpdate(is_admin=True))
+        for _ in range(50):
+            if reader.cache is not None and reader.cache.get(user.id) is None:
+                break
+            await asyncio.sleep(0.05)
+        refreshed = await reader.get_user_by_id_cached(user.id)
+        assert refreshed is not None
+        assert refreshed.is_admin
+    finally:
+        await other_pubsub.stop()
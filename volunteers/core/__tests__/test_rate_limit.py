@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from volunteers.core.rate_limit import (
+    MemoryRateLimitBackend,
+    PostgresRateLimitBackend,
+    RateLimiter,
+    RateLimitExceeded,
+)
+
+
+async def test_memory_bucket_refills_over_time() -> None:
+    limiter = RateLimiter(MemoryRateLimitBackend(), "test", rate=0.5, burst=2)
+    with patch("volunteers.core.rate_limit.time.monotonic", return_value=100.0):
+        await limiter.hit("a")
+        await limiter.hit("a")
+        with pytest.raises(RateLimitExceeded) as e:
+            await limiter.hit("a")
+        assert e.value.retry_after == pytest.approx(2)
+        assert e.value.retry_after_header == "2"
+        # Other keys have their own buckets
+        await limiter.hit("b")
+
+    with patch("volunteers.core.rate_limit.time.monotonic", return_value=102.0):
+        await limiter.hit("a")
+        with pytest.raises(RateLimitExceeded):
+            await limiter.hit("a")
+
+
+async def test_memory_backend_forgets_least_recently_used_keys() -> None:
+    backend = MemoryRateLimitBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        assert await backend.take(key, rate=1, burst=1) == 0
+    # "a" was forgotten, so its bucket is full again
+    assert await backend.take("a", rate=1, burst=1) == 0
+    assert await backend.take("c", rate=1, burst=1) > 0
+
+
+@pytest.mark.postgres
+async def test_postgres_backend_shares_buckets(
+    pg_session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    # Two workers with their own limiter objects
+    first = RateLimiter(PostgresRateLimitBackend(pg_session_factory), "test", rate=0.1, burst=2)
+    second = RateLimiter(PostgresRateLimitBackend(pg_session_factory), "test", rate=0.1, burst=2)
+
+    await first.hit("a")
+    await second.hit("a")
+    with pytest.raises(RateLimitExceeded) as e:
+        await first.hit("a")
+    assert 9 < e.value.retry_after <= 10
+    await second.hit("b")
+
+    # Time passes for the stored bucket
+    async with pg_session_factory() as session:
+        await session.execute(
+            text("UPDATE rate_limit_buckets SET updated_at = updated_at - interval '10 seconds'")
+        )
+        await session.commit()
+    await second.hit("a")
+    with pytest.raises(RateLimitExceeded):
+        await first.hit("a")
+
+
+@pytest.mark.postgres
+async def test_postgres_backend_prunes_full_buckets(
+    pg_session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    backend = PostgresRateLimitBackend(pg_session_factory, prune_every=4)
+    limiter = RateLimiter(backend, "test", rate=0.1, burst=2)
+    other = RateLimiter(backend, "other", rate=0.1, burst=2)
+    for key in ("a", "b"):
+        await limiter.hit(key)
+    await other.hit("a")
+
+    # "a" refilled, "b" is one token short
+    async with pg_session_factory() as session:
+        await session.execute(
+            text(
+                "UPDATE rate_limit_buckets SET updated_at = updated_at - interval '10 seconds'"
+                " WHERE key IN ('test:a', 'other:a')"
+            )
+        )
+        await session.execute(text("UPDATE rate_limit_buckets SET tokens = 0 WHERE key = 'test:b'"))
+        await session.commit()
+    await limiter.hit("c")
+
+    async with pg_session_factory() as session:
+        keys = (await session.execute(text("SELECT key FROM rate_limit_buckets"))).scalars()
+        # Buckets of other limiters are left to their own prunes
+        assert sorted(keys) == ["other:a", "test:b", "test:c"]
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+import pytest
+import socketio  # type: ignore[import-untyped]
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from volunteers.auth.jwt_tokens import create_token
+from volunteers.core.config import Config
+from volunteers.core.pubsub import PgPubSub
+from volunteers.core.socketio import PgPubSubManager
+from volunteers.models import User
+from volunteers.schemas.day_assignment import AssignmentEvent, DayAssignmentItem
+from volunteers.sockets.assignments import AssignmentBroadcaster
+
+pytestmark = [pytest.mark.postgres, pytest.mark.slow]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port: int = s.getsockname()[1]
+        return port
+
+
+@asynccontextmanager
+async def app_process(database_url: str) -> AsyncGenerator[str]:
+    """Run the app in its own process, like one gunicorn worker."""
+    port = free_port()
+    process = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-m", "uvicorn", "volunteers.app:app", "--port", str(port)],
+        env={**os.environ, "VOLUNTEERS_DATABASE__URL": database_url},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient() as client:
+            for _ in range(100):
+                try:
+                    if (await client.get(f"{url}/hc")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                assert process.poll() is None, "the app process exited"
+                await asyncio.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+async def access_token(session_factory: async_sessionmaker[AsyncSession], is_admin: bool) -> str:
+    async with session_factory() as session:
+        user = User(
+            first_name_ru="Имя",
+            last_name_ru="Фамилия",
+            first_name_en="N",
+            last_name_en="L",
+            is_admin=is_admin,
+        )
+        session.add(user)
+        await session.commit()
+    payload = {"user_id": user.id, "role": "user", "type": "access", "exp": time.time() + 60}
+    return create_token(payload, config=Config())
+
+
+@asynccontextmanager
+async def subscribed_client(
+    url: str, token: str, day_id: int, on_update: Callable[[dict[str, Any]], None]
+) -> AsyncGenerator[None]:
+    client = socketio.AsyncClient()
+    client.on("assignment_updated", on_update)
+    await client.connect(url, auth={"token": token})
+    try:
+        # Waits for the acknowledgement, so the client is in the room afterwards
+        await client.call("subscribe_day_assignments", {"day_id": day_id})
+        yield
+    finally:
+        await client.disconnect()
+
+
+async def test_broadcasts_reach_clients_of_every_process(
+    pg_url: str, pg_engine: AsyncEngine, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    # Stands in for a worker that handled a write
+    emitter = PgPubSubManager(write_only=True)
+    emitter.bind(PgPubSub(pg_engine), pg_session_factory)
+    broadcaster = AssignmentBroadcaster(socketio.AsyncServer(client_manager=emitter))
+    admin_token = await access_token(pg_session_factory, is_admin=True)
+    user_token = await access_token(pg_session_factory, is_admin=False)
+
+    admin_updates: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    user_updates: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    async with (
+        app_process(pg_url) as first,
+        app_process(pg_url) as second,
+        subscribed_client(first, admin_token, 1, admin_updates.put_nowait),
+        subscribed_client(second, user_token, 1, user_updates.put_nowait),
+    ):
+        item = DayAssignmentItem(
+            user_day_id=10, name="N L", telegram=None, position="Cloakroom", hall=None
+        )
+        await broadcaster.deliver([AssignmentEvent(2, "created", 1, True, [item]).dump()])
+        # Only admins may see the assignments of unpublished days
+        await broadcaster.deliver([AssignmentEvent(1, "created", 1, False, [item]).dump()])
+        await broadcaster.deliver([AssignmentEvent(1, "published", 1, True).dump()])
+
+        unpublished = await asyncio.wait_for(admin_updates.get(), 5)
+        assert unpublished["type"] == "created"
+        assert unpublished["assignments"] == [item.model_dump()]
+        for updates in (admin_updates, user_updates):
+            published = await asyncio.wait_for(updates.get(), 5)
+            assert published["type"] == "published"
+            assert published["version"] == 1
+        await asyncio.sleep(0.1)
+        assert admin_updates.empty()
+        assert user_updates.empty()
+
+
+async def test_connections_without_valid_token_are_refused(pg_url: str) -> None:
+    async with app_process(pg_url) as url:
+        for auth in (None, {"token": "invalid"}):
+            client = socketio.AsyncClient()
+            with pytest.raises(socketio.exceptions.ConnectionError):
+                await client.connect(url, auth=auth)
@@ -0,0 +1,71 @@
+"""Small in-process caches with a size cap and a time-to-live."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+
+from prometheus_client import Counter, Gauge
+
+CACHE_REQUESTS_TOTAL = Counter(
+    "cache_requests_total", "In-process cache lookups", ["cache", "result"]
+)
+CACHE_ENTRIES = Gauge("cache_entries", "Entries held by in-process caches", ["cache"])
+
+
+class TTLCache[K: Hashable, V]:
+    """LRU cache whose entries also expire ``ttl`` seconds after they were stored.
+
+    The hit ratio is ``cache_requests_total{result="hit"}`` over all lookups of the
+    cache, labelled with its ``name``.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        # Bumped by every invalidation, so loads that raced with one are not stored
+        self._generation = 0
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            CACHE_REQUESTS_TOTAL.labels(cache=self.name, result="miss").inc()
+            return None
+        self._entries.move_to_end(key)
+        CACHE_REQUESTS_TOTAL.labels(cache=self.name, result="hit").inc()
+        return entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Store ``value``; ``ttl`` overrides the cache-wide time-to-live for this entry."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        CACHE_ENTRIES.labels(cache=self.name).set(len(self._entries))
+
+    async def get_or_load(self, key: K, load: Callable[[], Awaitable[V | None]]) -> V | None:
+        """Return the cached value, or load and cache it. ``None`` results are not cached."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        generation = self._generation
+        value = await load()
+        if value is not None and generation == self._generation:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: K) -> None:
+        self._generation += 1
+        self._entries.pop(key, None)
+        CACHE_ENTRIES.labels(cache=self.name).set(len(self._entries))
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        CACHE_ENTRIES.labels(cache=self.name).set(0)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -16,6 +18,15 @@ class TelegramConfig(BaseModel):
 
 class DatabaseConfig(BaseModel):
     url: str
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30  # in seconds
+    pool_recycle: int = -1  # in seconds, -1 keeps connections forever
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100  # prepared statements per connection, 0 for pgbouncer
+    statement_timeout: int | None = None  # in milliseconds, None keeps the server default
+    replica_url: str | None = None  # read-only queries go to the primary when unset
+    replica_stickiness: int = 5  # in seconds, reads stay on the primary after a write
 
 
 class ServerConfig(BaseModel):
@@ -29,6 +40,50 @@ class LoggingConfig(BaseModel):
 
 class NotificationConfig(BaseModel):
     tg_chat_id: int
+    batch_window: float = 2  # in seconds, notifications added meanwhile are sent as one message
+    chat_interval: float = 3  # in seconds between messages, Telegram allows 20 per minute in groups
+
+
+class ExportConfig(BaseModel):
+    cache_dir: str = ".cache/exports"
+    cache_max_bytes: int = 512 * 1024 * 1024  # 0 disables the cache
+    jobs_dir: str = ".cache/export-jobs"
+    jobs_max_concurrency: int = 2
+    jobs_retention: int = 24 * 60 * 60  # in seconds
+
+
+class CacheConfig(BaseModel):
+    user_max_size: int = 10_000  # 0 disables the cache
+    user_ttl: float = 60  # in seconds
+    manager_max_size: int = 10_000  # 0 disables the cache
+    manager_ttl: float = 60  # in seconds
+
+
+class PasswordConfig(BaseModel):
+    hash_workers: int = 2  # bcrypt calls running at once
+    hash_max_pending: int = 16  # calls waiting for a worker before new ones are rejected
+    bcrypt_rounds: int = 12  # legacy hashes with another cost are rehashed on login
+
+
+class RateLimitConfig(BaseModel):
+    backend: Literal["memory", "postgres"] = "memory"  # postgres shares buckets between workers
+    auth_ip_rate: float = 5  # auth requests per second per client IP
+    auth_ip_burst: int = 50
+    auth_telegram_rate: float = 0.2  # auth requests per second per telegram_id
+    auth_telegram_burst: int = 5
+    auth_max_concurrency: int = 16  # auth requests handled at once per worker
+
+
+class SocketIOConfig(BaseModel):
+    broadcast_window: float = 0.25  # in seconds, assignment updates meanwhile are merged
+    history_size: int = 100  # assignment updates kept per day to resume subscriptions
+    history_days: int = 100  # days whose recent assignment updates are kept
+
+
+class OutboxConfig(BaseModel):
+    batch_size: int = 100  # messages delivered at once
+    poll_interval: float = 5  # in seconds, for messages whose delivery failed or was missed
+    retry_backoff: float = 1  # in seconds after a failed delivery, doubled up to poll_interval
 
 
 class Config(BaseSettings):
@@ -41,3 +96,9 @@ class Config(BaseSettings):
     server: ServerConfig
     logging: LoggingConfig
     notification: NotificationConfig
+    export: ExportConfig = ExportConfig()
+    cache: CacheConfig = CacheConfig()
+    password: PasswordConfig = PasswordConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    socketio: SocketIOConfig = SocketIOConfig()
+    outbox: OutboxConfig = OutboxConfig()
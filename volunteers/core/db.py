@@ -1,13 +1,231 @@
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+import asyncio
+import time
+from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any
 
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event, exc
+from sqlalchemy.engine.default import DefaultExecutionContext
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 
-def create_engine(url: str) -> AsyncEngine:
-    return create_async_engine(
-        url,
-        pool_pre_ping=True,
+from volunteers.core.config import DatabaseConfig
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections", "Connections currently checked out", ["pool"]
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections", "Connections open beyond pool_size", ["pool"]
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a pooled connection", ["pool"]
+)
+DB_POOL_CONNECTION_ERRORS_TOTAL = Counter(
+    "db_pool_connection_errors_total", "Failed or invalidated connections", ["pool", "reason"]
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that reports its usage, checkout wait time and connection errors.
+
+    Metrics are labelled with the pool ``logging_name``, which survives ``recreate()``.
+    Usage is read after checkouts and returns: the pool events fire before the pool
+    updates its own counters.
+    """
+
+    @property
+    def metrics_name(self) -> str:
+        return self.logging_name or "primary"
+
+    def _update_gauges(self) -> None:
+        DB_POOL_CHECKED_OUT.labels(pool=self.metrics_name).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(pool=self.metrics_name).set(max(self.overflow(), 0))
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_CONNECTION_ERRORS_TOTAL.labels(pool=self.metrics_name, reason="timeout").inc()
+            raise
+        except Exception:
+            DB_POOL_CONNECTION_ERRORS_TOTAL.labels(pool=self.metrics_name, reason="connect").inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(pool=self.metrics_name).observe(
+                time.perf_counter() - start
+            )
+        self._update_gauges()
+        return record
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        super()._do_return_conn(record)
+        self._update_gauges()
+
+
+def _count_invalidations(engine: AsyncEngine, name: str) -> None:
+    """Count connections dropped after a failed pre-ping or a disconnect error."""
+
+    def on_invalidate(*_: Any) -> None:
+        DB_POOL_CONNECTION_ERRORS_TOTAL.labels(pool=name, reason="invalidated").inc()
+
+    # Listeners of the pool are carried over when dispose() recreates it
+    event.listen(engine.sync_engine.pool, "invalidate", on_invalidate)
+
+
+def create_engine(config: DatabaseConfig, name: str = "primary") -> AsyncEngine:
+    server_settings = {"search_path": "public"}
+    if config.statement_timeout is not None:
+        server_settings["statement_timeout"] = str(config.statement_timeout)
+
+    engine = create_async_engine(
+        config.url,
+        poolclass=InstrumentedPool,
+        pool_logging_name=name,
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_timeout=config.pool_timeout,
+        pool_recycle=config.pool_recycle,
+        pool_pre_ping=config.pool_pre_ping,
         connect_args={
-            "server_settings": {
-                "search_path": "public",
-            },
+            "server_settings": server_settings,
+            # asyncpg's own cache and the SQLAlchemy dialect cache both prepare statements
+            "statement_cache_size": config.statement_cache_size,
+            "prepared_statement_cache_size": config.statement_cache_size,
         },
     )
+    _count_invalidations(engine, name)
+    return engine
+
+
+def create_replica_engine(config: DatabaseConfig, primary: AsyncEngine) -> AsyncEngine:
+    """Engine for read-only queries: the replica if one is configured, else the primary."""
+    if config.replica_url is None:
+        return primary
+    return create_engine(config.model_copy(update={"url": config.replica_url}), name="replica")
+
+
+def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+def create_replica_session_factory(
+    replica: AsyncEngine, primary: AsyncEngine, session_factory: async_sessionmaker[AsyncSession]
+) -> async_sessionmaker[AsyncSession]:
+    """Sessions for read-only queries.
+
+    Without a replica this is ``session_factory`` itself, which tells
+    ``BaseService.session_scope`` to keep read-only queries in the request's session.
+    """
+    if replica is primary:
+        return session_factory
+    return create_session_factory(replica)
+
+
+class RequestUnitOfWork:
+    """One connection and session shared by every service call of an HTTP request.
+
+    The connection is checked out on first use and returned when the request ends.
+    Commits made by services are real commits of that connection; anything left
+    uncommitted at the end of the request is rolled back.
+
+    Only the task that handles the request uses it: background tasks and streamed
+    response bodies inherit the context but keep opening their own sessions.
+
+    Read-only queries go to the replica unless ``reads_from_primary`` is set, either
+    because the client wrote recently or because this request already wrote.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        reads_from_primary: bool = False,
+        on_write: Callable[[], None] | None = None,
+    ) -> None:
+        self._engine = engine
+        self._session_factory = session_factory
+        self._owner = asyncio.current_task()
+        self._connection: AsyncConnection | None = None
+        self._session: AsyncSession | None = None
+        self._on_write = on_write
+        self._wrote = False
+        self.reads_from_primary = reads_from_primary
+        self.closed = False
+
+    def is_usable(self) -> bool:
+        return not self.closed and asyncio.current_task() is self._owner
+
+    def _record_write(self, context: DefaultExecutionContext | None, **_: Any) -> None:
+        """Keep the rest of the request, and the client's next requests, on the primary."""
+        if self._wrote or context is None:
+            return
+        if context.isinsert or context.isupdate or context.isdelete:
+            self._wrote = True
+            self.reads_from_primary = True
+            if self._on_write is not None:
+                self._on_write()
+
+    async def session(self) -> AsyncSession:
+        if self._session is None:
+            self._connection = await self._engine.connect()
+            event.listen(
+                self._connection.sync_connection,
+                "before_cursor_execute",
+                self._record_write,
+                named=True,
+            )
+            self._session = self._session_factory(bind=self._connection)
+        return self._session
+
+    async def rollback(self) -> None:
+        """Drop the work of the request that no service committed."""
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        self.closed = True
+        if self._session is not None:
+            await self._session.close()
+        if self._connection is not None:
+            await self._connection.close()
+
+
+_unit_of_work: ContextVar[RequestUnitOfWork | None] = ContextVar("unit_of_work", default=None)
+
+
+def current_unit_of_work() -> RequestUnitOfWork | None:
+    """The unit of work of the current request, if the calling task may use it."""
+    unit_of_work = _unit_of_work.get()
+    if unit_of_work is None or not unit_of_work.is_usable():
+        return None
+    return unit_of_work
+
+
+@asynccontextmanager
+async def request_unit_of_work(
+    engine: AsyncEngine,
+    session_factory: async_sessionmaker[AsyncSession],
+    *,
+    reads_from_primary: bool = False,
+    on_write: Callable[[], None] | None = None,
+) -> AsyncGenerator[RequestUnitOfWork]:
+    """Share one connection between all ``session_scope`` calls inside the block."""
+    unit_of_work = RequestUnitOfWork(
+        engine, session_factory, reads_from_primary=reads_from_primary, on_write=on_write
+    )
+    token = _unit_of_work.set(unit_of_work)
+    try:
+        yield unit_of_work
+    finally:
+        await unit_of_work.close()
+        _unit_of_work.reset(token)
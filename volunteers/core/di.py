@@ -2,16 +2,35 @@ import dependency_injector.containers as containers
 import dependency_injector.providers as providers
 import socketio  # type: ignore[import-untyped]
 
+from volunteers.auth.providers.legacy import PasswordHasher
 from volunteers.bot.notify import Notifier
+from volunteers.core.cache import TTLCache
 from volunteers.core.config import Config
-from volunteers.core.db import create_engine
+from volunteers.core.db import (
+    create_engine,
+    create_replica_engine,
+    create_replica_session_factory,
+    create_session_factory,
+)
+from volunteers.core.export_cache import ExportCache
+from volunteers.core.outbox import Outbox, OutboxDispatcher
+from volunteers.core.pubsub import PgPubSub
+from volunteers.core.rate_limit import (
+    ConcurrencyLimiter,
+    MemoryRateLimitBackend,
+    PostgresRateLimitBackend,
+    RateLimiter,
+)
 from volunteers.core.tg import get_bot
+from volunteers.models import User
 from volunteers.services.assessment import AssessmentService
 from volunteers.services.export import ExportService
+from volunteers.services.export_jobs import ExportJobService
 from volunteers.services.i18n import I18nService
 from volunteers.services.legacy_user import LegacyUserService
 from volunteers.services.user import UserService
-from volunteers.services.year import YearService
+from volunteers.services.year import ManagerScope, YearService
+from volunteers.sockets.assignments import AssignmentBroadcaster, AssignmentHistory
 
 
 def get_socketio_server() -> socketio.AsyncServer:
@@ -24,7 +43,12 @@ def get_socketio_server() -> socketio.AsyncServer:
 class Container(containers.DeclarativeContainer):
     # Remove automatic wiring - will be done manually in app.py
     config = providers.Factory(Config)
-    db = providers.Singleton(create_engine, config.provided.database.url)
+    db = providers.Singleton(create_engine, config.provided.database)
+    session_factory = providers.Singleton(create_session_factory, db)
+    replica_db = providers.Singleton(create_replica_engine, config.provided.database, db)
+    replica_session_factory = providers.Singleton(
+        create_replica_session_factory, replica_db, db, session_factory
+    )
     # logger = providers.Singleton(Logger)
     telegram = providers.Singleton(get_bot, config.provided.telegram.token)
 
@@ -32,15 +56,84 @@ class Container(containers.DeclarativeContainer):
         get_socketio_server
     )
 
-    notifier = providers.Singleton(Notifier, bot=telegram, config=config)
+    notifier = providers.Singleton(Notifier, bot=telegram.provider, config=config)
+    rate_limit_backend = providers.Selector(
+        config.provided.rate_limit.backend,
+        memory=providers.Singleton(MemoryRateLimitBackend),
+        postgres=providers.Singleton(PostgresRateLimitBackend, session_factory),
+    )
+    auth_ip_limiter = providers.Singleton(
+        RateLimiter,
+        backend=rate_limit_backend,
+        name="auth_ip",
+        rate=config.provided.rate_limit.auth_ip_rate,
+        burst=config.provided.rate_limit.auth_ip_burst,
+    )
+    auth_telegram_limiter = providers.Singleton(
+        RateLimiter,
+        backend=rate_limit_backend,
+        name="auth_telegram",
+        rate=config.provided.rate_limit.auth_telegram_rate,
+        burst=config.provided.rate_limit.auth_telegram_burst,
+    )
+    auth_concurrency_limiter = providers.Singleton(
+        ConcurrencyLimiter, name="auth", limit=config.provided.rate_limit.auth_max_concurrency
+    )
     i18n_service = providers.Singleton(I18nService, locale="en")
-    user_service = providers.Singleton(UserService)
+    pubsub = providers.Singleton(PgPubSub, db)
+    user_cache: providers.Provider[TTLCache[int, User]] = providers.Singleton(
+        TTLCache,
+        name="user",
+        max_size=config.provided.cache.user_max_size,
+        ttl=config.provided.cache.user_ttl,
+    )
+    user_service = providers.Singleton(UserService, cache=user_cache, pubsub=pubsub)
+    assignment_broadcaster = providers.Singleton(AssignmentBroadcaster, sio=socketio_server)
+    outbox = providers.Singleton(Outbox, pubsub=pubsub)
+    outbox_dispatcher = providers.Singleton(
+        OutboxDispatcher,
+        session_factory=session_factory,
+        pubsub=pubsub,
+        batch_size=config.provided.outbox.batch_size,
+        poll_interval=config.provided.outbox.poll_interval,
+        retry_backoff=config.provided.outbox.retry_backoff,
+    )
+    manager_cache: providers.Provider[TTLCache[int, frozenset[ManagerScope]]] = providers.Singleton(
+        TTLCache,
+        name="manager_scopes",
+        max_size=config.provided.cache.manager_max_size,
+        ttl=config.provided.cache.manager_ttl,
+    )
     year_service = providers.Singleton(
-        YearService, notifier=notifier, socketio_server=socketio_server
+        YearService, outbox=outbox, manager_cache=manager_cache, pubsub=pubsub
+    )
+    assignment_history = providers.Singleton(
+        AssignmentHistory,
+        year_service=year_service,
+        max_events=config.provided.socketio.history_size,
+        max_days=config.provided.socketio.history_days,
     )
     legacy_user_service = providers.Singleton(LegacyUserService)
+    password_hasher = providers.Singleton(
+        PasswordHasher,
+        max_workers=config.provided.password.hash_workers,
+        max_pending=config.provided.password.hash_max_pending,
+        rounds=config.provided.password.bcrypt_rounds,
+    )
     assessment_service = providers.Singleton(AssessmentService)
-    export_service = providers.Singleton(ExportService)
+    export_cache = providers.Singleton(
+        ExportCache,
+        directory=config.provided.export.cache_dir,
+        max_bytes=config.provided.export.cache_max_bytes,
+    )
+    export_service = providers.Singleton(ExportService, cache=export_cache)
+    export_job_service = providers.Singleton(
+        ExportJobService,
+        export_service=export_service,
+        directory=config.provided.export.jobs_dir,
+        max_concurrency=config.provided.export.jobs_max_concurrency,
+        retention=config.provided.export.jobs_retention,
+    )
 
 
 # Create a global container instance (not wired yet)
@@ -1,5 +1,17 @@
 """Experience calculation constants and functions."""
 
+from sqlalchemy import ColumnElement, Double, Select, case, delete, func, select, type_coerce
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from volunteers.models import (
+    ApplicationForm,
+    Assessment,
+    Day,
+    Position,
+    UserDay,
+    UserYearExperience,
+)
 from volunteers.models.attendance import Attendance
 
 # Attendance weights for experience calculation
@@ -56,3 +68,142 @@ def get_rank(experience: float) -> str:
             return rank_name
 
     return "Volunteer"  # Default rank
+
+
+def user_year_experience_query() -> Select[tuple[int, int, float]]:
+    """Build a query with the experience of every (user, year) pair that has a form.
+
+    This is the set-based version of ``YearService.calculate_year_experience``:
+
+    experience = (
+        sum(day.score * attendance_map[attendance] * position.score
+            for day in mandatory_days) / number of mandatory_days
+    ) + sum(assessment.value for all assessments in year)
+
+    A missing day score counts as 0 and a missing (or zero) position score as 1,
+    exactly like the per-user calculation.
+
+    Returns:
+        Select yielding ``(user_id, year_id, experience)`` rows
+    """
+    attendance_weight = case(
+        *[
+            (UserDay.attendance == attendance, weight)
+            for attendance, weight in ATTENDANCE_MAP.items()
+        ],
+        else_=0.0,
+    )
+
+    mandatory_days = (
+        select(Day.year_id, func.count(Day.id).label("mandatory_days"))
+        .where(Day.mandatory.is_(True))
+        .group_by(Day.year_id)
+        .subquery("mandatory_days")
+    )
+    attendance = (
+        select(
+            UserDay.application_form_id,
+            func.sum(
+                func.coalesce(Day.score, 0.0)
+                * attendance_weight
+                * func.coalesce(func.nullif(Position.score, 0.0), 1.0)
+            ).label("attendance_sum"),
+        )
+        .join(Day, UserDay.day_id == Day.id)
+        .join(Position, UserDay.position_id == Position.id)
+        .where(Day.mandatory.is_(True))
+        .group_by(UserDay.application_form_id)
+        .subquery("attendance")
+    )
+    assessments = (
+        select(
+            UserDay.application_form_id,
+            func.sum(Assessment.value).label("assessments_sum"),
+        )
+        .join(Assessment, Assessment.user_day_id == UserDay.id)
+        .group_by(UserDay.application_form_id)
+        .subquery("assessments")
+    )
+
+    experience: ColumnElement[float] = type_coerce(
+        func.coalesce(attendance.c.attendance_sum / mandatory_days.c.mandatory_days, 0.0)
+        + func.coalesce(assessments.c.assessments_sum, 0.0),
+        Double,
+    )
+
+    return (
+        select(
+            ApplicationForm.user_id,
+            ApplicationForm.year_id,
+            experience.label("experience"),
+        )
+        .outerjoin(mandatory_days, mandatory_days.c.year_id == ApplicationForm.year_id)
+        .outerjoin(attendance, attendance.c.application_form_id == ApplicationForm.id)
+        .outerjoin(assessments, assessments.c.application_form_id == ApplicationForm.id)
+    )
+
+
+async def refresh_user_year_experience(session: AsyncSession, *where: ColumnElement[bool]) -> None:
+    """Recompute stored experience for the application forms matching ``where``.
+
+    Runs in the caller's transaction, so the stored rows change together with the
+    data they are derived from.
+
+    Args:
+        session: Session holding the pending change
+        where: Filters on ``ApplicationForm`` selecting the affected (user, year) pairs
+    """
+    live = user_year_experience_query().where(*where)
+    stmt = insert(UserYearExperience).from_select(["user_id", "year_id", "experience"], live)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserYearExperience.user_id, UserYearExperience.year_id],
+        set_={"experience": stmt.excluded.experience, "updated_at": func.now()},
+    )
+    await session.execute(stmt)
+
+
+def forms_of_user_day(user_day_id: int) -> ColumnElement[bool]:
+    """Filter for ``refresh_user_year_experience`` matching the form of a user day."""
+    return ApplicationForm.id == (
+        select(UserDay.application_form_id).where(UserDay.id == user_day_id).scalar_subquery()
+    )
+
+
+async def rebuild_user_year_experience(session: AsyncSession) -> None:
+    """Drop every stored experience row and recompute the whole table."""
+    await session.execute(delete(UserYearExperience))
+    await refresh_user_year_experience(session)
+
+
+async def find_experience_mismatches(
+    session: AsyncSession, tolerance: float = 1e-9
+) -> list[tuple[int, int, float | None, float | None]]:
+    """Compare the stored experience with the live formula.
+
+    Returns:
+        ``(user_id, year_id, stored, live)`` for every pair that is missing on either
+        side or differs by more than ``tolerance``
+    """
+    live = user_year_experience_query().subquery("live")
+    stored = UserYearExperience.__table__
+    result = await session.execute(
+        select(
+            func.coalesce(live.c.user_id, stored.c.user_id),
+            func.coalesce(live.c.year_id, stored.c.year_id),
+            stored.c.experience,
+            live.c.experience,
+        )
+        .select_from(
+            live.join(
+                stored,
+                (live.c.user_id == stored.c.user_id) & (live.c.year_id == stored.c.year_id),
+                full=True,
+            )
+        )
+        .where(
+            stored.c.experience.is_(None)
+            | live.c.experience.is_(None)
+            | (func.abs(stored.c.experience - live.c.experience) > tolerance)
+        )
+    )
+    return list(result.tuples().all())
@@ -0,0 +1,102 @@
+"""Local on-disk cache for export archives, keyed by a fingerprint of their data."""
+
+import asyncio
+import os
+import tempfile
+from collections.abc import AsyncIterator, Callable
+from contextlib import suppress
+from pathlib import Path
+
+from loguru import logger
+from prometheus_client import Counter, Gauge
+
+EXPORT_CACHE_REQUESTS_TOTAL = Counter(
+    "export_cache_requests_total", "Export cache lookups", ["result"]
+)
+EXPORT_CACHE_SIZE_BYTES = Gauge("export_cache_size_bytes", "Total size of cached exports")
+
+# Bytes read from a cached file at a time
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class ExportCache:
+    """Size-bounded LRU cache of export files.
+
+    Entries are content-addressed: the key must change whenever the exported data
+    does, so entries never need to be invalidated, only evicted. Recency is tracked
+    with the file modification time, which is bumped on every hit.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.zip"
+
+    def get_or_build(
+        self, key: str, build: Callable[[], AsyncIterator[bytes]]
+    ) -> AsyncIterator[bytes]:
+        """Stream the cached entry for ``key``, or stream ``build()`` while caching it.
+
+        Args:
+            key: Fingerprint of the exported data
+            build: Produces the export when it is not cached
+
+        Returns:
+            Chunks of the export
+        """
+        if self.max_bytes <= 0:
+            return build()
+
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            EXPORT_CACHE_REQUESTS_TOTAL.labels(result="miss").inc()
+            return self._store(path, build())
+        EXPORT_CACHE_REQUESTS_TOTAL.labels(result="hit").inc()
+        return self._read(path)
+
+    async def _read(self, path: Path) -> AsyncIterator[bytes]:
+        with path.open("rb") as file:
+            while chunk := await asyncio.to_thread(file.read, READ_CHUNK_SIZE):
+                yield chunk
+
+    async def _store(self, path: Path, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        await asyncio.to_thread(self.directory.mkdir, parents=True, exist_ok=True)
+        fd, tmp_name = await asyncio.to_thread(tempfile.mkstemp, dir=self.directory, suffix=".tmp")
+        stored = False
+        try:
+            with os.fdopen(fd, "wb") as file:
+                async for chunk in chunks:
+                    await asyncio.to_thread(file.write, chunk)
+                    yield chunk
+            # Only complete exports become visible; concurrent builds of the same key
+            # produce the same content, so the last rename simply wins
+            await asyncio.to_thread(Path(tmp_name).replace, path)
+            stored = True
+            await asyncio.to_thread(self._evict)
+        finally:
+            if not stored:
+                with suppress(FileNotFoundError):
+                    Path(tmp_name).unlink()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits into ``max_bytes``."""
+        entries = []
+        for path in self.directory.glob("*.zip"):
+            with suppress(FileNotFoundError):
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            with suppress(FileNotFoundError):
+                path.unlink()
+                logger.debug(f"Evicted export cache entry {path.name}")
+            total -= size
+        EXPORT_CACHE_SIZE_BYTES.set(total)
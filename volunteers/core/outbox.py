@@ -0,0 +1,182 @@
+"""Transactional outbox for side effects of database changes.
+
+Telegram notifications and socket events are written to ``outbox_messages`` in the
+transaction of the change they report, so they are kept exactly when the change is.
+``OutboxDispatcher`` delivers them afterwards, in batches, from whichever worker
+locks them first; a message is deleted once delivered, so delivery is at least once.
+Handlers raise when they cannot deliver, and the messages stay in the outbox.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from volunteers.core.pubsub import PgPubSub
+from volunteers.models import OutboxMessage
+
+# Kinds of messages, each delivered by its own handler
+NOTIFICATIONS = "notifications"
+ASSIGNMENT_EVENTS = "assignment_events"
+
+# Pub/sub topic that wakes up the dispatchers, carrying the kind of the new message
+OUTBOX_TOPIC = "outbox"
+
+# Returns how many of the payloads, from the first, it delivered; None means all of them
+type OutboxHandler = Callable[[list[Any]], Awaitable[int | None]]
+
+
+class DeliveryPostponed(Exception):
+    """Raised by a handler that must not deliver again for ``delay`` seconds."""
+
+    def __init__(self, delay: float) -> None:
+        super().__init__(f"Delivery postponed for {delay}s")
+        self.delay = delay
+
+
+class Outbox:
+    def __init__(self, pubsub: PgPubSub | None = None) -> None:
+        self.pubsub = pubsub
+
+    async def add(self, session: AsyncSession, kind: str, payload: Any) -> None:
+        """Deliver the JSON ``payload`` to the handler of ``kind`` once ``session`` commits."""
+        session.add(OutboxMessage(kind=kind, payload=payload))
+        if self.pubsub is not None:
+            await self.pubsub.publish(session, OUTBOX_TOPIC, kind)
+
+
+@dataclass(frozen=True)
+class _Handler:
+    handle: OutboxHandler
+    delay: float
+    interval: float
+
+
+class OutboxDispatcher:
+    """Delivers the outbox messages of every registered kind.
+
+    Each kind is drained by its own task, oldest messages first and at most
+    ``batch_size`` at a time. A batch is locked with ``FOR UPDATE SKIP LOCKED``, so
+    the dispatchers of all workers share the work, and deleted in the transaction
+    that delivered it; if the handler fails, the batch stays in the outbox and is
+    retried after ``retry_backoff`` seconds, doubled after every further failure up
+    to ``poll_interval``. Nothing waits while the batch is locked.
+    Dispatchers wake up on new messages and every ``poll_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        pubsub: PgPubSub,
+        batch_size: int,
+        poll_interval: float,
+        retry_backoff: float = 1,
+    ) -> None:
+        self.session_factory = session_factory
+        self.pubsub = pubsub
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self._handlers: dict[str, _Handler] = {}
+        self._wakeups: dict[str, asyncio.Event] = {}
+        self._tasks: list[asyncio.Task[None]] = []
+        pubsub.subscribe(OUTBOX_TOPIC, self._wake, on_reconnect=self._wake_all)
+
+    def register(
+        self, kind: str, handler: OutboxHandler, delay: float = 0, interval: float = 0
+    ) -> None:
+        """Deliver the payloads of ``kind`` to ``handler``.
+
+        The dispatcher waits ``delay`` seconds after waking up, so that messages of
+        a burst of changes are delivered together, and ``interval`` seconds after
+        every delivered batch.
+        """
+        self._handlers[kind] = _Handler(handler, delay, interval)
+        self._wakeups[kind] = asyncio.Event()
+
+    async def start(self) -> None:
+        for kind in self._handlers:
+            self._tasks.append(asyncio.create_task(self._run(kind)))
+
+    async def stop(self) -> None:
+        # Undelivered messages stay in the outbox for the next dispatcher
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+
+    async def dispatch(self, kind: str) -> int:
+        """Deliver one batch of ``kind``.
+
+        Returns:
+            The number of delivered messages
+        """
+        async with self.session_factory() as session:
+            messages = (
+                await session.scalars(
+                    select(OutboxMessage)
+                    .where(OutboxMessage.kind == kind)
+                    .order_by(OutboxMessage.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+            ).all()
+            if not messages:
+                return 0
+            # Raises if nothing was delivered, which rolls back and unlocks the batch
+            delivered = await self._handlers[kind].handle([message.payload for message in messages])
+            if delivered is None:
+                delivered = len(messages)
+            await session.execute(
+                delete(OutboxMessage).where(
+                    OutboxMessage.id.in_([m.id for m in messages[:delivered]])
+                )
+            )
+            await session.commit()
+        return delivered
+
+    def _wake(self, kind: str) -> None:
+        if kind in self._wakeups:
+            self._wakeups[kind].set()
+
+    def _wake_all(self) -> None:
+        # Messages published while the listener was disconnected were missed
+        for wakeup in self._wakeups.values():
+            wakeup.set()
+
+    async def _run(self, kind: str) -> None:
+        handler, wakeup = self._handlers[kind], self._wakeups[kind]
+        failures = 0
+        retry_in = 0.0
+        while True:
+            if failures:
+                await asyncio.sleep(retry_in)
+            else:
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(wakeup.wait(), self.poll_interval)
+                wakeup.clear()
+                await asyncio.sleep(handler.delay)
+            try:
+                while await self.dispatch(kind):
+                    await asyncio.sleep(handler.interval)
+            except DeliveryPostponed as e:
+                logger.warning(f"Delivery of {kind} from the outbox postponed for {e.delay}s")
+                retry_in = e.delay
+            except (SQLAlchemyError, OSError):
+                logger.exception(f"Cannot read the {kind} outbox")
+                retry_in = min(self.retry_backoff * 2**failures, self.poll_interval)
+            except Exception:
+                logger.exception(f"Failed to deliver {kind} from the outbox")
+                retry_in = min(self.retry_backoff * 2**failures, self.poll_interval)
+            else:
+                failures = 0
+                continue
+            failures += 1
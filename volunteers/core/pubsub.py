@@ -0,0 +1,124 @@
+"""Cross-process notifications over PostgreSQL LISTEN/NOTIFY.
+
+Every process listens on a single channel; messages carry a topic so that several
+features can share one connection. Notifications are transactional: they are
+delivered when the publishing transaction commits and dropped if it rolls back.
+"""
+
+import asyncio
+import json
+from collections import defaultdict
+from collections.abc import Callable
+from contextlib import suppress
+from typing import Any
+
+import asyncpg  # type: ignore[import-untyped]
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+PUBSUB_CHANNEL = "volunteers_events"
+# PostgreSQL rejects NOTIFY payloads of this many bytes or more
+MAX_PAYLOAD_SIZE = 8000
+
+type MessageHandler = Callable[[str], None]
+
+
+class MessageTooLarge(ValueError):
+    """Message that does not fit into a notification."""
+
+    def __init__(self, topic: str) -> None:
+        super().__init__(f"Message to {topic} is too large to publish")
+        self.topic = topic
+
+
+def _message(topic: str, payload: str) -> str:
+    return json.dumps({"topic": topic, "payload": payload})
+
+
+class PgPubSub:
+    def __init__(self, engine: AsyncEngine, reconnect_delay: float = 1.0) -> None:
+        self.engine = engine
+        self.reconnect_delay = reconnect_delay
+        self._handlers: defaultdict[str, list[MessageHandler]] = defaultdict(list)
+        self._reconnect_handlers: list[Callable[[], None]] = []
+        self._task: asyncio.Task[None] | None = None
+        self.connected = asyncio.Event()
+
+    def subscribe(
+        self,
+        topic: str,
+        handler: MessageHandler,
+        on_reconnect: Callable[[], None] | None = None,
+    ) -> None:
+        """Call ``handler`` with the payload of every message published to ``topic``.
+
+        Messages published while the listener is disconnected are lost, so
+        ``on_reconnect`` runs every time it (re)connects.
+        """
+        self._handlers[topic].append(handler)
+        if on_reconnect is not None:
+            self._reconnect_handlers.append(on_reconnect)
+
+    @staticmethod
+    def fits(topic: str, payload: str) -> bool:
+        """Whether a message is small enough to be published."""
+        return len(_message(topic, payload).encode()) < MAX_PAYLOAD_SIZE
+
+    async def publish(self, session: AsyncSession, topic: str, payload: str) -> None:
+        """Send a message to all processes once ``session`` commits.
+
+        Raises:
+            MessageTooLarge: If the message does not fit into a notification, which
+                would otherwise abort the transaction of ``session``
+        """
+        if not self.fits(topic, payload):
+            raise MessageTooLarge(topic)
+        await session.execute(select(func.pg_notify(PUBSUB_CHANNEL, _message(topic, payload))))
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _listen(self) -> None:
+        dsn = self.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning(f"Cannot connect the pub/sub listener: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            try:
+                await self._listen_on(connection)
+            finally:
+                self.connected.clear()
+                connection.terminate()
+            logger.warning("Pub/sub listener lost its connection, reconnecting")
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _listen_on(self, connection: Any) -> None:
+        """Deliver messages received on ``connection`` until it is lost."""
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        await connection.add_listener(PUBSUB_CHANNEL, self._dispatch)
+        for on_reconnect in self._reconnect_handlers:
+            on_reconnect()
+        self.connected.set()
+        await lost.wait()
+
+    def _dispatch(self, connection: Any, pid: int, channel: str, message: str) -> None:
+        data = json.loads(message)
+        for handler in self._handlers.get(data["topic"], []):
+            try:
+                handler(data["payload"])
+            except Exception:
+                logger.exception(f"Pub/sub handler for {data['topic']} failed")
@@ -0,0 +1,166 @@
+"""Token-bucket rate limiting and concurrency caps for expensive endpoints."""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from volunteers.models import RateLimitBucket
+
+RATE_LIMIT_REJECTIONS_TOTAL = Counter(
+    "rate_limit_rejections_total", "Requests refused by a limiter", ["limiter"]
+)
+CONCURRENCY_LIMIT_IN_USE = Gauge(
+    "concurrency_limit_in_use", "Requests currently admitted by a concurrency limiter", ["limiter"]
+)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request is refused; ``retry_after`` is in seconds."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Too many requests, try again later")
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(math.ceil(self.retry_after), 1))
+
+
+class RateLimitBackend(Protocol):
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from the bucket of ``key``.
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        ...
+
+
+class MemoryRateLimitBackend:
+    """Buckets kept by this process only, so each worker enforces the limits separately.
+
+    At most ``max_keys`` buckets are kept; the least recently used one is forgotten,
+    which refills it.
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated_at) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class PostgresRateLimitBackend:
+    """Buckets shared by all workers, stored in the unlogged ``rate_limit_buckets`` table.
+
+    Each take is a single upsert that only consumes a token when one is available.
+    A full bucket is the same as a missing one, so every ``prune_every`` takes the
+    full buckets of the limiter are deleted, and the table does not grow with every
+    client ever seen. Keys are ``<limiter>:<key>``, as ``RateLimiter`` makes them.
+    """
+
+    def __init__(
+        self, session_factory: async_sessionmaker[AsyncSession], prune_every: int = 1000
+    ) -> None:
+        self.session_factory = session_factory
+        self.prune_every = prune_every
+        self._takes = 0
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        elapsed = func.extract("epoch", func.now() - RateLimitBucket.updated_at)
+        available = func.least(burst, RateLimitBucket.tokens + elapsed * rate)
+        self._takes += 1
+        if self._takes % self.prune_every == 0:
+            await self._prune(key.partition(":")[0], rate, burst)
+        stmt = (
+            insert(RateLimitBucket)
+            .values(key=key, tokens=burst - 1, updated_at=func.now())
+            .on_conflict_do_update(
+                index_elements=[RateLimitBucket.key],
+                set_={"tokens": available - 1, "updated_at": func.now()},
+                where=available >= 1,
+            )
+            .returning(RateLimitBucket.tokens)
+        )
+        async with self.session_factory() as session:
+            taken = (await session.execute(stmt)).first()
+            await session.commit()
+            if taken is not None:
+                return 0.0
+            tokens = await session.scalar(select(available).where(RateLimitBucket.key == key))
+        return (1 - float(tokens or 0)) / rate
+
+    async def _prune(self, limiter: str, rate: float, burst: int) -> None:
+        elapsed = func.extract("epoch", func.now() - RateLimitBucket.updated_at)
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(RateLimitBucket).where(
+                    RateLimitBucket.key.startswith(f"{limiter}:", autoescape=True),
+                    RateLimitBucket.tokens + elapsed * rate >= burst,
+                )
+            )
+            await session.commit()
+
+
+class RateLimiter:
+    """Token bucket per key: ``burst`` requests at once, refilled at ``rate`` per second."""
+
+    def __init__(self, backend: RateLimitBackend, name: str, rate: float, burst: int) -> None:
+        self.backend = backend
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+
+    async def hit(self, key: str) -> None:
+        """Count a request for ``key``.
+
+        Raises:
+            RateLimitExceeded: If the bucket of ``key`` is empty
+        """
+        wait = await self.backend.take(f"{self.name}:{key}", self.rate, self.burst)
+        if wait > 0:
+            RATE_LIMIT_REJECTIONS_TOTAL.labels(limiter=self.name).inc()
+            raise RateLimitExceeded(wait)
+
+
+class ConcurrencyLimiter:
+    """Admits at most ``limit`` requests at once and refuses the rest immediately."""
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.limit = limit
+        self._in_use = 0
+
+    def acquire(self) -> None:
+        """Take a slot; every successful call must be paired with ``release``.
+
+        Raises:
+            RateLimitExceeded: If all slots are taken
+        """
+        if self._in_use >= self.limit:
+            RATE_LIMIT_REJECTIONS_TOTAL.labels(limiter=self.name).inc()
+            raise RateLimitExceeded(1)
+        self._in_use += 1
+        CONCURRENCY_LIMIT_IN_USE.labels(limiter=self.name).set(self._in_use)
+
+    def release(self) -> None:
+        self._in_use -= 1
+        CONCURRENCY_LIMIT_IN_USE.labels(limiter=self.name).set(self._in_use)
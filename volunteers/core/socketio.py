@@ -1,10 +1,102 @@
 """SocketIO configuration and initialization."""
 
+import asyncio
+import json
+from collections import defaultdict
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+
 import socketio  # type: ignore[import-untyped]
+from loguru import logger
+from socketio.async_pubsub_manager import AsyncPubSubManager  # type: ignore[import-untyped]
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from volunteers.core.pubsub import PgPubSub
+
+# Called with the data and the room(s) of an emit
+type EmitListener = Callable[[Any, str | list[str] | None], None]
+# Turns the data of an emit too large to publish into a smaller one
+type EmitCompactor = Callable[[Any], Any]
+
+
+class PgPubSubManager(AsyncPubSubManager):  # type: ignore[misc]
+    """Client manager that shares emits between workers over PostgreSQL LISTEN/NOTIFY.
+
+    Messages go through ``PgPubSub`` under the ``channel`` topic, so they reuse its
+    reconnecting listener, and are published on a pooled connection. Until ``bind``
+    is called the manager only reaches clients of this process.
+    """
+
+    name = "pgpubsub"
+
+    def __init__(self, channel: str = "socketio", write_only: bool = False) -> None:
+        super().__init__(channel=channel, write_only=write_only)
+        self.pubsub: PgPubSub | None = None
+        self.session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._messages: asyncio.Queue[str] = asyncio.Queue()
+        self._emit_listeners: defaultdict[str, list[EmitListener]] = defaultdict(list)
+        self._compactors: dict[str, EmitCompactor] = {}
+
+    def bind(self, pubsub: PgPubSub, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self.pubsub = pubsub
+        self.session_factory = session_factory
+        if not self.write_only:
+            pubsub.subscribe(self.channel, self._receive)
+
+    def _receive(self, message: str) -> None:
+        # The listening task starts with the first client; until then nobody needs it
+        if getattr(self, "thread", None) is not None:
+            self._messages.put_nowait(message)
+
+    def on_emit(self, event: str, listener: EmitListener) -> None:
+        """Call ``listener`` for every ``event`` emitted here, by this worker or another one."""
+        self._emit_listeners[event].append(listener)
+
+    def on_oversized_emit(self, event: str, compact: EmitCompactor) -> None:
+        """Publish ``event`` to other workers as ``compact(data)`` when ``data`` is too large.
+
+        Clients of this worker still get the original data.
+        """
+        self._compactors[event] = compact
+
+    async def _handle_emit(self, message: dict[str, Any]) -> None:
+        for listener in self._emit_listeners.get(message["event"], []):
+            try:
+                listener(message["data"], message.get("room"))
+            except Exception:
+                logger.exception(f"Listener of {message['event']} emits failed")
+        await super()._handle_emit(message)
+
+    async def _publish(self, data: dict[str, Any]) -> None:
+        if self.pubsub is None or self.session_factory is None:
+            return
+        message = json.dumps(data)
+        compact = self._compactors.get(data.get("event", ""))
+        if not self.pubsub.fits(self.channel, message) and compact is not None:
+            message = json.dumps({**data, "data": compact(data["data"])})
+        if not self.pubsub.fits(self.channel, message):
+            logger.error(f"Cannot publish {data.get('event')} to other workers: it is too large")
+            return
+        try:
+            async with self.session_factory() as session:
+                await self.pubsub.publish(session, self.channel, message)
+                await session.commit()
+        except SQLAlchemyError:
+            # The write has already happened and clients of this worker got the message
+            logger.exception(f"Cannot publish {data.get('method')} to other workers")
+
+    async def _listen(self) -> AsyncGenerator[str]:
+        while True:
+            yield await self._messages.get()
+
+
+socketio_manager = PgPubSubManager()
 
 # Create Socket.IO server with ASGI support
 sio = socketio.AsyncServer(
     async_mode="asgi",
+    client_manager=socketio_manager,
     cors_allowed_origins="*",  # In production, specify exact origins
     logger=True,
     engineio_logger=True,
@@ -7,9 +7,12 @@ __all__ = [
     "Gender",
     "Hall",
     "LegacyUser",
+    "OutboxMessage",
     "Position",
+    "RateLimitBucket",
     "User",
     "UserDay",
+    "UserYearExperience",
     "Year",
 ]
 
@@ -22,8 +25,11 @@ from .models import (
     FormPositionAssociation,
     Hall,
     LegacyUser,
+    OutboxMessage,
     Position,
+    RateLimitBucket,
     User,
     UserDay,
+    UserYearExperience,
     Year,
 )
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+from datetime import datetime
+from typing import Any
+
 from sqlalchemy import (
     BigInteger,
     Boolean,
+    DateTime,
     Double,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
+    func,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .attendance import Attendance
@@ -129,6 +136,9 @@ class Day(Base, TimestampMixin):
     assignment_published: Mapped[bool] = mapped_column(
         Boolean, default=False, server_default="false"
     )  # Whether the day's assignments are published and visible to users.
+    assignment_version: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0"
+    )  # Bumped by every change to the day's assignments, see sockets.assignments.
 
     user_days: Mapped[set[UserDay]] = relationship(
         back_populates="day", cascade="all, delete-orphan"
@@ -191,6 +201,45 @@ class Assessment(Base, TimestampMixin):
     value: Mapped[float] = mapped_column(Double)
 
 
+class UserYearExperience(Base, TimestampMixin):
+    """Experience earned by a user in a year.
+
+    Derived data: kept in sync with user days, assessments, days and positions by the
+    refresh helpers in ``volunteers.core.experience``.
+    """
+
+    __tablename__ = "user_year_experience"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    year_id: Mapped[int] = mapped_column(ForeignKey("years.id"), primary_key=True)
+    experience: Mapped[float] = mapped_column(Double, nullable=False, default=0.0)
+
+
+class RateLimitBucket(Base):
+    """Token bucket shared between workers by ``PostgresRateLimitBackend``.
+
+    Unlogged: a crash only refills the buckets.
+    """
+
+    __tablename__ = "rate_limit_buckets"
+    __table_args__ = ({"prefixes": ["UNLOGGED"]},)
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    tokens: Mapped[float] = mapped_column(Double, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class OutboxMessage(Base):
+    """Side effect of a committed change, waiting for ``OutboxDispatcher`` to deliver it."""
+
+    __tablename__ = "outbox_messages"
+    __table_args__ = (Index("ix_outbox_messages_kind_id", "kind", "id"),)
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    payload: Mapped[Any] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 class LegacyUser(Base):
     __tablename__ = "legacy_users"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
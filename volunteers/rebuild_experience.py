@@ -0,0 +1,56 @@
+"""Rebuild or verify the ``user_year_experience`` table.
+
+Usage::
+
+    python -m volunteers.rebuild_experience               # recompute everything
+    python -m volunteers.rebuild_experience --check-only  # only report mismatches
+
+Exits with a non-zero status when ``--check-only`` finds stale rows.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from loguru import logger
+
+from volunteers.core.di import Container
+from volunteers.core.experience import find_experience_mismatches, rebuild_user_year_experience
+
+
+async def main(check_only: bool) -> int:
+    container = Container()
+    container.wire()
+    init_resources = container.init_resources()
+    if init_resources:
+        await init_resources
+
+    engine = container.db()
+    try:
+        async with container.session_factory()() as session:
+            if not check_only:
+                await rebuild_user_year_experience(session)
+                await session.commit()
+                logger.info("Rebuilt user_year_experience")
+            mismatches = await find_experience_mismatches(session)
+    finally:
+        await engine.dispose()
+
+    for user_id, year_id, stored, live in mismatches:
+        logger.warning(f"user {user_id}, year {year_id}: stored {stored}, expected {live}")
+    if mismatches:
+        logger.error(f"{len(mismatches)} stale experience rows")
+        return 1
+    logger.info("user_year_experience is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the user_year_experience table")
+    parser.add_argument(
+        "--check-only",
+        action="store_true",
+        help="compare stored experience with the live formula without changing anything",
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.check_only)))
@@ -1,11 +1,75 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
 from pydantic import BaseModel
 
+from volunteers.models import UserDay
+
 
 class DayAssignmentItem(BaseModel):
     """Simplified day assignment item for user-facing API"""
 
+    user_day_id: int
     name: str
     telegram: str | None
     position: str
     hall: str | None
     # attendance: Attendance
+
+
+def day_assignment_item(user_day: UserDay) -> DayAssignmentItem:
+    """Serialize a user day whose form, user, position and hall are loaded."""
+    user = user_day.application_form.user
+    return DayAssignmentItem(
+        user_day_id=user_day.id,
+        name=f"{user.first_name_en} {user.last_name_en}",
+        telegram=user.telegram_username,
+        position=user_day.position.name,
+        hall=user_day.hall.name if user_day.hall else None,
+        # attendance=user_day.attendance,
+    )
+
+
+@dataclass(frozen=True)
+class AssignmentEvent:
+    """A change to the assignments of a day, or to their visibility."""
+
+    day_id: int
+    type: str  # created, updated, deleted, bulk_created, published or unpublished
+    version: int  # assignment_version of the day after the change
+    published: bool  # assignment_published of the day after the change
+    assignments: Sequence[DayAssignmentItem] = ()  # created or updated user days
+    deleted: Sequence[int] = ()  # ids of deleted user days
+
+    @property
+    def base_version(self) -> int:
+        # Publishing does not change the assignments, so it keeps the version
+        return self.version if self.type in ("published", "unpublished") else self.version - 1
+
+    @property
+    def public(self) -> bool:
+        """Whether users other than admins may see the event."""
+        return self.published or self.type == "unpublished"
+
+    def dump(self) -> dict[str, Any]:
+        """JSON form of the event, e.g. to store it in the outbox."""
+        return {
+            "day_id": self.day_id,
+            "type": self.type,
+            "version": self.version,
+            "published": self.published,
+            "assignments": [item.model_dump() for item in self.assignments],
+            "deleted": list(self.deleted),
+        }
+
+    @classmethod
+    def load(cls, data: dict[str, Any]) -> "AssignmentEvent":
+        return cls(
+            day_id=data["day_id"],
+            type=data["type"],
+            version=data["version"],
+            published=data["published"],
+            assignments=[DayAssignmentItem.model_validate(item) for item in data["assignments"]],
+            deleted=data["deleted"],
+        )
@@ -0,0 +1,190 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from volunteers.conftest import seed_year
+from volunteers.core.cache import TTLCache
+from volunteers.models import ApplicationForm, Day, Hall, Position, UserDay, Year
+from volunteers.models.attendance import Attendance
+from volunteers.schemas.position import PositionEditIn
+from volunteers.schemas.user_day import UserDayEditIn
+from volunteers.services.year import (
+    ManagerForYear,
+    UserDayNotFound,
+    UserDayNotManaged,
+    YearService,
+)
+
+pytestmark = pytest.mark.postgres
+
+
+async def populate(session_factory: async_sessionmaker[AsyncSession]) -> dict[str, int]:
+    """A manager of the main hall of a day, and volunteers in both halls of the day."""
+    async with session_factory() as session:
+        day, other_day = (Day(name=n, information="") for n in "ab")
+        main, side = (Hall(name=n) for n in ("Main", "Side"))
+        manager_position = Position(name="Manager", is_manager=True, has_halls=True)
+        position = Position(name="Cloakroom", has_halls=True)
+        seeded = await seed_year(
+            session,
+            days=[day, other_day],
+            positions=[manager_position, position],
+            halls=[main, side],
+            users=4,
+        )
+
+        def assign(form: ApplicationForm, day: Day, position: Position, hall: Hall) -> UserDay:
+            return UserDay(
+                application_form_id=form.id,
+                day_id=day.id,
+                position_id=position.id,
+                hall_id=hall.id,
+                information="",
+            )
+
+        user_days = {
+            "manager": assign(seeded.forms[0], day, manager_position, main),
+            "main": assign(seeded.forms[1], day, position, main),
+            "main_other_day": assign(seeded.forms[2], other_day, position, main),
+            "side": assign(seeded.forms[3], day, position, side),
+        }
+        session.add_all(user_days.values())
+        await session.commit()
+        return {
+            "manager_id": seeded.users[0].id,
+            "manager_position": manager_position.id,
+            "side_hall": side.id,
+        } | {k: v.id for k, v in user_days.items()}
+
+
+async def attendance(
+    session_factory: async_sessionmaker[AsyncSession], *user_day_ids: int
+) -> list[Attendance]:
+    async with session_factory() as session:
+        result = await session.scalars(
+            select(UserDay.attendance).where(UserDay.id.in_(user_day_ids)).order_by(UserDay.id)
+        )
+        return list(result)
+
+
+async def test_managers_set_attendance_of_their_hall_only(
+    year_service: YearService, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    ids = await populate(pg_session_factory)
+    for other in ("main_other_day", "side"):
+        with pytest.raises(UserDayNotManaged):
+            await year_service.update_user_days_attendance(
+                {ids["main"]: Attendance.YES, ids[other]: Attendance.YES},
+                manager_id=ids["manager_id"],
+            )
+    # Nothing changes when the batch is refused
+    assert await attendance(pg_session_factory, ids["main"]) == [Attendance.UNKNOWN]
+
+    await year_service.update_user_days_attendance(
+        {ids["main"]: Attendance.LATE, ids["manager"]: Attendance.YES},
+        manager_id=ids["manager_id"],
+    )
+    assert await attendance(pg_session_factory, ids["manager"], ids["main"]) == [
+        Attendance.YES,
+        Attendance.LATE,
+    ]
+
+
+async def test_admins_set_attendance_of_any_user_day(
+    year_service: YearService, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    ids = await populate(pg_session_factory)
+    async with pg_session_factory() as session:
+        updated_before = await session.scalar(
+            select(UserDay.updated_at).where(UserDay.id == ids["side"])
+        )
+
+    with pytest.raises(UserDayNotFound):
+        await year_service.update_user_days_attendance(
+            {ids["side"]: Attendance.NO, -1: Attendance.NO}
+        )
+    await year_service.update_user_days_attendance(
+        {ids["side"]: Attendance.NO, ids["main_other_day"]: Attendance.SICK}
+    )
+
+    assert await attendance(pg_session_factory, ids["main_other_day"], ids["side"]) == [
+        Attendance.SICK,
+        Attendance.NO,
+    ]
+    async with pg_session_factory() as session:
+        updated_after = await session.scalar(
+            select(UserDay.updated_at).where(UserDay.id == ids["side"])
+        )
+    assert updated_before is not None and updated_after is not None
+    assert updated_after > updated_before
+
+
+async def test_attendance_listing_is_scoped_to_managed_user_days(
+    year_service: YearService, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    ids = await populate(pg_session_factory)
+    async with pg_session_factory() as session:
+        year_id = await session.scalar(select(Year.id))
+    assert year_id is not None
+
+    managed = await year_service.get_all_assignments_by_year_id(year_id, ids["manager_id"])
+    assert {user_day.id for user_day in managed} == {ids["manager"], ids["main"]}
+    everything = await year_service.get_all_assignments_by_year_id(year_id)
+    assert len(everything) == 4
+    # Volunteers without a manager assignment see nothing
+    (side,) = (user_day for user_day in everything if user_day.id == ids["side"])
+    volunteer = side.application_form.user_id
+    assert await year_service.get_all_assignments_by_year_id(year_id, volunteer) == []
+
+
+async def test_manager_scopes_are_cached_until_manager_assignments_change(
+    year_service: YearService, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    year_service.manager_cache = TTLCache(name="test_manager_scopes", max_size=10, ttl=60)
+    ids = await populate(pg_session_factory)
+    manager_id = ids["manager_id"]
+    async with pg_session_factory() as session:
+        year_id, day_id, main_hall = (
+            await session.execute(
+                select(Day.year_id, Day.id, UserDay.hall_id)
+                .join(UserDay)
+                .where(UserDay.id == ids["manager"])
+            )
+        ).one()
+
+    assert await year_service.manager_for_years(manager_id) == {year_id}
+    assert await year_service.manager_for_year(manager_id, year_id) == {
+        ManagerForYear(hall_id=main_hall, day_id=day_id)
+    }
+
+    # Changed behind the service's back, so the cached scopes stay
+    async with pg_session_factory() as session:
+        await session.execute(
+            update(UserDay).where(UserDay.id == ids["manager"]).values(hall_id=ids["side_hall"])
+        )
+        await session.commit()
+    assert await year_service.manager_for_year(manager_id, year_id) == {
+        ManagerForYear(hall_id=main_hall, day_id=day_id)
+    }
+
+    await year_service.edit_user_day_by_user_day_id(
+        ids["manager"],
+        UserDayEditIn(
+            information=None,
+            attendance=None,
+            position_id=ids["manager_position"],
+            hall_id=ids["side_hall"],
+        ),
+        author=MagicMock(),
+    )
+    assert await year_service.manager_for_year(manager_id, year_id) == {
+        ManagerForYear(hall_id=ids["side_hall"], day_id=day_id)
+    }
+
+    await year_service.edit_position_by_position_id(
+        ids["manager_position"],
+        PositionEditIn(name=None, can_desire=None, has_halls=None, is_manager=False),
+    )
+    assert await year_service.manager_for_years(manager_id) == set()
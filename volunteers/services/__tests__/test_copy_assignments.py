@@ -0,0 +1,158 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from volunteers.conftest import seed_year
+from volunteers.core.db import request_unit_of_work
+from volunteers.core.outbox import ASSIGNMENT_EVENTS
+from volunteers.models import Assessment, Day, OutboxMessage, Position, UserDay
+from volunteers.services.year import DayNotFound, YearService
+
+pytestmark = pytest.mark.postgres
+
+
+async def populate(session_factory: async_sessionmaker[AsyncSession]) -> dict[str, int]:
+    """Two volunteers on the source day; the first one is also on the first target day."""
+    async with session_factory() as session:
+        source, first, second = (Day(name=n, information="") for n in "sab")
+        cloakroom, hall = (Position(name=n) for n in ("Cloakroom", "Hall"))
+        seeded = await seed_year(
+            session, days=[source, first, second], positions=[cloakroom, hall], users=2
+        )
+        forms = seeded.forms
+        session.add_all(
+            UserDay(
+                application_form_id=form.id,
+                day_id=source.id,
+                position_id=cloakroom.id,
+                information="copied",
+            )
+            for form in forms
+        )
+        existing = UserDay(
+            application_form_id=forms[0].id,
+            day_id=first.id,
+            position_id=hall.id,
+            information="existing",
+        )
+        session.add(existing)
+        await session.flush()
+        session.add(Assessment(user_day_id=existing.id, comment="", value=1))
+        await session.commit()
+        return {
+            "source": source.id,
+            "first": first.id,
+            "second": second.id,
+            "existing": existing.id,
+            "cloakroom": cloakroom.id,
+        }
+
+
+async def assignments(
+    session_factory: async_sessionmaker[AsyncSession], day_id: int
+) -> list[tuple[int, str]]:
+    async with session_factory() as session:
+        result = await session.execute(
+            select(UserDay.application_form_id, UserDay.information)
+            .where(UserDay.day_id == day_id)
+            .order_by(UserDay.application_form_id)
+        )
+        return list(result.tuples())
+
+
+async def events(session_factory: async_sessionmaker[AsyncSession]) -> list[tuple[int, int]]:
+    """Day and version of each assignment event in the outbox."""
+    async with session_factory() as session:
+        payloads = await session.scalars(
+            select(OutboxMessage.payload)
+            .where(OutboxMessage.kind == ASSIGNMENT_EVENTS)
+            .order_by(OutboxMessage.id)
+        )
+        return [(p["day_id"], p["version"]) for p in payloads]
+
+
+async def test_copy_to_several_days_skips_assigned_users(
+    year_service: YearService, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    ids = await populate(pg_session_factory)
+
+    copied = await year_service.copy_assignments_from_day(
+        ids["source"], [ids["first"], ids["second"], ids["source"]]
+    )
+
+    assert copied == 3
+    first = await assignments(pg_session_factory, ids["first"])
+    assert [information for _, information in first] == ["existing", "copied"]
+    assert await assignments(pg_session_factory, ids["second"]) == await assignments(
+        pg_session_factory, ids["source"]
+    )
+    assert await events(pg_session_factory) == [(ids["first"], 1), (ids["second"], 1)]
+
+    # Nothing left to copy, so the days keep their versions
+    assert await year_service.copy_assignments_from_day(ids["source"], [ids["second"]]) == 0
+    assert len(await events(pg_session_factory)) == 2
+
+
+async def test_copying_nothing_releases_the_days_in_a_request(
+    year_service: YearService,
+    pg_engine: AsyncEngine,
+    pg_session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await populate(pg_session_factory)
+    await year_service.copy_assignments_from_day(ids["source"], [ids["second"]])
+
+    async with request_unit_of_work(pg_engine, pg_session_factory):
+        assert await year_service.copy_assignments_from_day(ids["source"], [ids["second"]]) == 0
+        # Another transaction can lock the target day while the request goes on
+        async with pg_session_factory() as session:
+            locked = await session.execute(
+                select(Day.id).where(Day.id == ids["second"]).with_for_update(nowait=True)
+            )
+            assert locked.scalar_one() == ids["second"]
+
+
+async def test_overwrite_updates_existing_assignments_in_place(
+    year_service: YearService, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    ids = await populate(pg_session_factory)
+
+    copied = await year_service.copy_assignments_from_day(
+        ids["source"], [ids["first"]], overwrite_existing=True
+    )
+
+    assert copied == 2
+    async with pg_session_factory() as session:
+        existing = await session.get(UserDay, ids["existing"])
+        assert existing is not None
+        assert (existing.information, existing.position_id) == ("copied", ids["cloakroom"])
+    assert len(await assignments(pg_session_factory, ids["first"])) == 2
+
+
+async def test_replace_all_deletes_existing_assignments(
+    year_service: YearService, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    ids = await populate(pg_session_factory)
+
+    copied = await year_service.copy_assignments_from_day(
+        ids["source"], [ids["first"], ids["second"]], replace_all=True
+    )
+
+    assert copied == 4
+    assert [info for _, info in await assignments(pg_session_factory, ids["first"])] == [
+        "copied",
+        "copied",
+    ]
+    async with pg_session_factory() as session:
+        assert await session.get(UserDay, ids["existing"]) is None
+        assert (await session.scalars(select(Assessment))).all() == []
+
+
+async def test_copy_to_missing_day_copies_nothing(
+    year_service: YearService, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    ids = await populate(pg_session_factory)
+
+    with pytest.raises(DayNotFound):
+        await year_service.copy_assignments_from_day(ids["source"], [ids["second"], -1])
+
+    assert await assignments(pg_session_factory, ids["second"]) == []
@@ -0,0 +1,225 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from volunteers.conftest import SeededYear, seed_year, use_test_database
+from volunteers.core.experience import (
+    find_experience_mismatches,
+    rebuild_user_year_experience,
+    user_year_experience_query,
+)
+from volunteers.models import (
+    ApplicationForm,
+    Assessment,
+    Day,
+    Position,
+    User,
+    UserDay,
+    UserYearExperience,
+)
+from volunteers.models.attendance import Attendance
+from volunteers.schemas.assessment import AssessmentIn
+from volunteers.schemas.day import DayEditIn
+from volunteers.schemas.position import PositionEditIn
+from volunteers.services.assessment import AssessmentService
+from volunteers.services.year import YearService
+
+pytestmark = pytest.mark.postgres
+
+
+async def populate(engine: AsyncEngine) -> list[int]:
+    """Two years of data covering every branch of the experience formula."""
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        years: list[SeededYear] = []
+        users: int | list[User] = 4
+        # The last user registers for the second year only
+        for name, registered in (("2023", 3), ("2024", 4)):
+            year = await seed_year(
+                session,
+                year_name=name,
+                open_for_registration=False,
+                days=[
+                    Day(name="d1", information="", score=10.0, mandatory=True),
+                    Day(name="d2", information="", score=None, mandatory=True),
+                    Day(name="d3", information="", score=5.0, mandatory=False),
+                ],
+                positions=[
+                    Position(name="plain", score=1.0),
+                    Position(name="zero", score=0.0),
+                    Position(name="double", score=2.0),
+                ],
+                users=users,
+                registered=registered,
+            )
+            years.append(year)
+            users = year.users
+        # A year without mandatory days contributes only assessments
+        years[0].days[1].mandatory = False
+        await session.flush()
+
+        attendances = list(Attendance)
+        counter = 0
+        for year in years:
+            for form in year.forms:
+                for day in year.days:
+                    counter += 1
+                    user_day = UserDay(
+                        application_form_id=form.id,
+                        day_id=day.id,
+                        information="",
+                        attendance=attendances[counter % len(attendances)],
+                        position_id=year.positions[counter % 3].id,
+                    )
+                    session.add(user_day)
+                    await session.flush()
+                    if counter % 2:
+                        session.add(
+                            Assessment(user_day_id=user_day.id, comment="", value=counter / 4)
+                        )
+        # Rows written directly, not through the services
+        await rebuild_user_year_experience(session)
+        await session.commit()
+        return [year.year.id for year in years]
+
+
+async def test_year_results_match_per_user_calculation(
+    pg_engine: AsyncEngine, year_service: YearService
+) -> None:
+    year_ids = await populate(pg_engine)
+
+    for year_id in year_ids:
+        results = await year_service.get_year_results(year_id)
+        assert results
+        for form, _total_assessments, experience in results:
+            expected = 0.0
+            for other_year_id in year_ids:
+                if other_year_id <= year_id:
+                    expected += await year_service.calculate_year_experience(
+                        other_year_id, form.user_id
+                    )
+            assert experience == pytest.approx(expected)
+
+
+async def test_experience_query_covers_every_form(
+    pg_engine: AsyncEngine, year_service: YearService
+) -> None:
+    await populate(pg_engine)
+
+    async with year_service.session_scope() as session:
+        rows = (await session.execute(user_year_experience_query())).tuples().all()
+        forms = (await session.execute(select(ApplicationForm))).scalars().all()
+
+    assert {(user_id, year_id) for user_id, year_id, _ in rows} == {
+        (form.user_id, form.year_id) for form in forms
+    }
+    for user_id, year_id, experience in rows:
+        assert experience == pytest.approx(
+            await year_service.calculate_year_experience(year_id, user_id)
+        )
+
+
+async def test_rebuild_repairs_stale_rows(
+    pg_engine: AsyncEngine, year_service: YearService
+) -> None:
+    await populate(pg_engine)
+
+    async with year_service.session_scope() as session:
+        assert await find_experience_mismatches(session) == []
+        stored = (await session.execute(select(UserYearExperience))).scalars().all()
+        stored[0].experience += 1
+        await session.delete(stored[1])
+        await session.commit()
+
+        assert len(await find_experience_mismatches(session)) == 2
+
+        await rebuild_user_year_experience(session)
+        await session.commit()
+        assert await find_experience_mismatches(session) == []
+
+
+async def test_service_writes_keep_stored_experience_in_sync(
+    pg_engine: AsyncEngine, year_service: YearService
+) -> None:
+    year_ids = await populate(pg_engine)
+    async with year_service.session_scope() as session:
+        user_day = (await session.execute(select(UserDay).limit(1))).scalar_one()
+        day = await session.get(Day, user_day.day_id)
+        assert day is not None
+        position_id = user_day.position_id
+
+    async def assert_in_sync() -> None:
+        async with year_service.session_scope() as session:
+            assert await find_experience_mismatches(session) == []
+
+    await year_service.update_user_day_attendance(user_day.id, Attendance.YES)
+    await assert_in_sync()
+
+    assessment_service = use_test_database(
+        AssessmentService(), pg_engine, year_service.session_factory
+    )
+    assessment = await assessment_service.add_assessment(
+        AssessmentIn(user_day_id=user_day.id, comment="good", value=3.5)
+    )
+    await assert_in_sync()
+    await assessment_service.delete_assessment(assessment.id)
+    await assert_in_sync()
+
+    await year_service.edit_day_by_day_id(
+        day.id,
+        DayEditIn(
+            name=None,
+            information=None,
+            score=day.score + 1 if day.score is not None else 1.0,
+            mandatory=not day.mandatory,
+            assignment_published=None,
+        ),
+    )
+    await assert_in_sync()
+
+    await year_service.edit_position_by_position_id(
+        position_id,
+        PositionEditIn(name=None, can_desire=None, has_halls=None, is_manager=None, score=7.0),
+    )
+    await assert_in_sync()
+
+    await year_service.delete_user_day_by_user_day_id(user_day.id, author=MagicMock())
+    await assert_in_sync()
+
+    # Results read the stored table
+    results = await year_service.get_year_results(year_ids[-1])
+    assert results
+
+
+async def test_users_experience_groups_history_by_user_and_year(
+    pg_engine: AsyncEngine, year_service: YearService
+) -> None:
+    await populate(pg_engine)
+    async with year_service.session_scope() as session:
+        forms = (
+            (
+                await session.execute(
+                    select(ApplicationForm).options(
+                        selectinload(ApplicationForm.year),
+                        selectinload(ApplicationForm.user_days).selectinload(UserDay.assessments),
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+    user_ids = sorted({form.user_id for form in forms})
+    experience = await year_service.get_users_experience([*user_ids, 10_000])
+
+    assert set(experience) == set(user_ids)
+    for user_id, items in experience.items():
+        user_forms = sorted(
+            (form for form in forms if form.user_id == user_id), key=lambda f: f.year_id
+        )
+        assert [item.year_name for item in items] == [form.year.year_name for form in user_forms]
+        for item, form in zip(items, user_forms, strict=True):
+            assert sum(item.attendance_stats.values()) == len(form.user_days)
+            assert len(item.assessments) == sum(len(ud.assessments) for ud in form.user_days)
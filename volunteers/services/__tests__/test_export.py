@@ -0,0 +1,195 @@
+import asyncio
+import csv
+import io
+import zipfile
+from collections.abc import Awaitable, Callable
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from volunteers.conftest import use_test_database
+from volunteers.models import Assessment, Hall, User, UserDay
+from volunteers.services.__tests__.test_experience import populate
+from volunteers.services.export import (
+    COPY_QUEUE_SIZE,
+    ExportEngine,
+    ExportService,
+    YearNotFoundError,
+)
+
+pytestmark = pytest.mark.postgres
+
+
+@pytest.fixture
+def export_service(
+    pg_engine: AsyncEngine, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> ExportService:
+    return use_test_database(ExportService(), pg_engine, pg_session_factory)
+
+
+async def test_stream_year_data_yields_valid_archive(
+    pg_engine: AsyncEngine, export_service: ExportService
+) -> None:
+    year_ids = await populate(pg_engine)
+
+    chunks = [chunk async for chunk in export_service.stream_year_data(year_ids[0])]
+    assert len([chunk for chunk in chunks if chunk]) > 1
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [
+            "01_users_and_registrations.csv",
+            "02_days.csv",
+            "03_positions.csv",
+            "04_halls.csv",
+            "05_assignments.csv",
+            "06_assessments.csv",
+        ]
+        tables = {
+            name: list(csv.reader(io.StringIO(archive.read(name).decode(), newline="")))
+            for name in archive.namelist()
+        }
+
+    async with export_service.session_scope() as session:
+        user_days = await session.scalar(
+            select(func.count(UserDay.id)).where(UserDay.day.has(year_id=year_ids[0]))
+        )
+        assessments = await session.scalar(
+            select(func.count(Assessment.id)).where(
+                Assessment.user_day.has(UserDay.day.has(year_id=year_ids[0]))
+            )
+        )
+
+    assert tables["01_users_and_registrations.csv"][0][0] == "User ID"
+    assert len(tables["01_users_and_registrations.csv"]) == 1 + 3
+    assert len(tables["05_assignments.csv"]) == 1 + user_days
+    assert len(tables["06_assessments.csv"]) == 1 + assessments
+    assert tables["04_halls.csv"] == [
+        ["Hall ID", "Hall Name", "Description", "Created At", "Updated At"]
+    ]
+
+
+async def test_stream_year_data_unknown_year(export_service: ExportService) -> None:
+    with pytest.raises(YearNotFoundError):
+        async for _ in export_service.stream_year_data(1):
+            pass
+
+
+def read_archive(data: bytes) -> dict[str, bytes]:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+async def test_copy_engine_matches_orm_engine(
+    pg_engine: AsyncEngine, export_service: ExportService
+) -> None:
+    year_ids = await populate(pg_engine)
+    async with async_sessionmaker(pg_engine)() as session:
+        session.add(Hall(year_id=year_ids[0], name='Main "A", east', description="two\nlines"))
+        assessments = (await session.execute(select(Assessment))).scalars().all()
+        assessments[0].value = 1e20
+        assessments[1].value = 0.1 + 0.2
+        user = (await session.execute(select(User))).scalars().first()
+        assert user is not None
+        user.email = ""
+        user.telegram_id = 42
+        await session.commit()
+
+    for year_id in year_ids:
+        orm = read_archive(b"".join([c async for c in export_service.stream_year_data(year_id)]))
+        copy = read_archive(
+            b"".join([c async for c in export_service.stream_year_data(year_id, ExportEngine.COPY)])
+        )
+        assert list(copy) == list(orm)
+        for name, content in orm.items():
+            assert copy[name] == content.replace(b"\r\n", b"\n"), name
+
+    users_copy = b"".join([c async for c in export_service.stream_all_users_copy()])
+    users_orm = await export_service.export_all_users()
+    assert users_copy.decode() == users_orm.replace("\r\n", "\n")
+
+
+async def test_year_fingerprint_follows_data(
+    pg_engine: AsyncEngine, export_service: ExportService
+) -> None:
+    year_ids = await populate(pg_engine)
+
+    before = await export_service.year_fingerprint(year_ids[0], ExportEngine.ORM)
+    assert before == await export_service.year_fingerprint(year_ids[0], ExportEngine.ORM)
+    assert before != await export_service.year_fingerprint(year_ids[0], ExportEngine.COPY)
+    assert before != await export_service.year_fingerprint(year_ids[1], ExportEngine.ORM)
+
+    async with async_sessionmaker(pg_engine)() as session:
+        assessment = (
+            (
+                await session.execute(
+                    select(Assessment).where(
+                        Assessment.user_day.has(UserDay.day.has(year_id=year_ids[0]))
+                    )
+                )
+            )
+            .scalars()
+            .first()
+        )
+        assert assessment is not None
+        await session.delete(assessment)
+        await session.commit()
+
+    assert before != await export_service.year_fingerprint(year_ids[0], ExportEngine.ORM)
+
+
+async def test_progress_counts_exported_rows(
+    pg_engine: AsyncEngine, export_service: ExportService
+) -> None:
+    year_ids = await populate(pg_engine)
+
+    for engine in ExportEngine:
+        counted: list[int] = []
+        archive = read_archive(
+            b"".join(
+                [
+                    c
+                    async for c in export_service.stream_year_data(
+                        year_ids[0], engine, counted.append
+                    )
+                ]
+            )
+        )
+        rows = sum(len(content.splitlines()) - 1 for content in archive.values())
+        assert sum(counted) == rows, engine
+
+
+async def test_closing_copy_stream_early_releases_the_copy(export_service: ExportService) -> None:
+    sent = 0
+    copy_done = asyncio.Event()
+
+    async def copy_from_query(
+        query: str, output: Callable[[bytes], Awaitable[None]], **kwargs: object
+    ) -> None:
+        nonlocal sent
+        try:
+            while True:
+                await output(b"1\n")
+                sent += 1
+        finally:
+            copy_done.set()
+
+    connection = MagicMock(dialect=postgresql.dialect())
+    connection.get_raw_connection = AsyncMock(
+        return_value=MagicMock(driver_connection=MagicMock(copy_from_query=copy_from_query))
+    )
+    session = MagicMock(connection=AsyncMock(return_value=connection))
+
+    stream = export_service._copy_csv(session, select(literal(1)), None)
+    await anext(stream)
+    # The client stops reading once COPY has filled the queue
+    while sent < COPY_QUEUE_SIZE + 1:
+        await asyncio.sleep(0)
+    # Not wait_for, whose cancellation on timeout would unblock a hanging close
+    closing = asyncio.create_task(stream.aclose())
+    await asyncio.wait([closing], timeout=1)
+    assert closing.done()
+    assert copy_done.is_set()
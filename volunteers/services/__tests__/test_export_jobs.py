@@ -0,0 +1,150 @@
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from volunteers.services.export import ExportEngine, ProgressCallback
+from volunteers.services.export_jobs import (
+    ExportJob,
+    ExportJobKind,
+    ExportJobNotFound,
+    ExportJobService,
+    ExportJobStatus,
+    ExportJobYearRequired,
+)
+
+
+async def wait_finished(service: ExportJobService, job_id: str) -> ExportJob:
+    async with asyncio.timeout(1):
+        while (job := await service.get_job(job_id)).status not in {
+            ExportJobStatus.DONE,
+            ExportJobStatus.FAILED,
+        }:
+            await asyncio.sleep(0.01)
+    return job
+
+
+@pytest.fixture
+def export_service() -> MagicMock:
+    async def stream_year_data(
+        year_id: int, engine: ExportEngine, progress: ProgressCallback
+    ) -> AsyncIterator[bytes]:
+        for chunk in (b"PK", b"data"):
+            progress(10)
+            yield chunk
+
+    service = MagicMock()
+    service.stream_year_data = stream_year_data
+    service.export_all_users = AsyncMock(return_value="User ID\r\n1\r\n")
+    return service
+
+
+@pytest.fixture
+async def job_service(export_service: MagicMock, tmp_path: Path) -> AsyncIterator[ExportJobService]:
+    service = ExportJobService(
+        export_service=export_service, directory=str(tmp_path), max_concurrency=1, retention=60
+    )
+    yield service
+    # The final state is written before the job task returns
+    await asyncio.gather(*service._tasks)
+
+
+async def test_year_export_job(job_service: ExportJobService) -> None:
+    job = await job_service.submit(ExportJobKind.YEAR, 1, ExportEngine.ORM, "year.zip")
+    assert job.status is ExportJobStatus.QUEUED
+
+    finished = await wait_finished(job_service, job.job_id)
+
+    assert finished.status is ExportJobStatus.DONE
+    assert finished.rows_processed == 20
+    assert finished.finished_at is not None
+    assert job_service.artifact_path(finished).read_bytes() == b"PKdata"
+
+
+async def test_users_export_job(job_service: ExportJobService, export_service: MagicMock) -> None:
+    job = await job_service.submit(ExportJobKind.USERS, 5, ExportEngine.ORM, "users.csv")
+
+    finished = await wait_finished(job_service, job.job_id)
+
+    assert finished.year_id is None
+    assert job_service.artifact_path(finished).read_bytes() == b"User ID\r\n1\r\n"
+    export_service.export_all_users.assert_awaited_once()
+
+
+async def test_failed_export_job(job_service: ExportJobService, export_service: MagicMock) -> None:
+    export_service.export_all_users = AsyncMock(side_effect=RuntimeError("boom"))
+
+    job = await job_service.submit(ExportJobKind.USERS, None, ExportEngine.ORM, "users.csv")
+    finished = await wait_finished(job_service, job.job_id)
+
+    assert finished.status is ExportJobStatus.FAILED
+    assert finished.error == "boom"
+    assert not job_service.artifact_path(finished).exists()
+
+
+async def test_year_export_requires_year(job_service: ExportJobService) -> None:
+    with pytest.raises(ExportJobYearRequired):
+        await job_service.submit(ExportJobKind.YEAR, None, ExportEngine.ORM, "year.zip")
+
+
+async def test_expired_jobs_are_removed(job_service: ExportJobService) -> None:
+    job = await job_service.submit(ExportJobKind.YEAR, 1, ExportEngine.ORM, "year.zip")
+    await wait_finished(job_service, job.job_id)
+
+    job_service.retention = -1
+    await job_service.submit(ExportJobKind.YEAR, 1, ExportEngine.ORM, "year.zip")
+
+    with pytest.raises(ExportJobNotFound):
+        await job_service.get_job(job.job_id)
+
+
+async def test_jobs_of_a_stopped_process_fail_and_expire(
+    job_service: ExportJobService, tmp_path: Path
+) -> None:
+    # Left running by a worker that was restarted an hour ago
+    stale = datetime.now(tz=UTC) - timedelta(hours=1)
+    job = ExportJob(
+        job_id="0" * 32,
+        kind=ExportJobKind.YEAR,
+        year_id=1,
+        engine=ExportEngine.ORM,
+        filename="year.zip",
+        status=ExportJobStatus.RUNNING,
+        created_at=stale,
+        updated_at=stale,
+    )
+    (tmp_path / f"{job.job_id}.json").write_text(job.model_dump_json())
+
+    interrupted = await job_service.get_job(job.job_id)
+    assert interrupted.status is ExportJobStatus.FAILED
+    assert interrupted.finished_at == stale
+
+    await job_service.submit(ExportJobKind.YEAR, 1, ExportEngine.ORM, "year.zip")
+    with pytest.raises(ExportJobNotFound):
+        await job_service.get_job(job.job_id)
+
+
+async def test_queued_jobs_stay_alive(
+    job_service: ExportJobService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("volunteers.services.export_jobs.PROGRESS_SAVE_INTERVAL", 0.01)
+    monkeypatch.setattr("volunteers.services.export_jobs.JOB_STALE_AFTER", 0.1)
+    blocked = asyncio.Event()
+
+    async def export_all_users(progress: ProgressCallback) -> str:
+        await blocked.wait()
+        return "User ID\r\n"
+
+    job_service.export_service.export_all_users = export_all_users  # type: ignore[method-assign]
+
+    running = await job_service.submit(ExportJobKind.USERS, None, ExportEngine.ORM, "a.csv")
+    queued = await job_service.submit(ExportJobKind.USERS, None, ExportEngine.ORM, "b.csv")
+    await asyncio.sleep(0.3)
+
+    assert (await job_service.get_job(running.job_id)).status is ExportJobStatus.RUNNING
+    assert (await job_service.get_job(queued.job_id)).status is ExportJobStatus.QUEUED
+    blocked.set()
+    await wait_finished(job_service, queued.job_id)
@@ -0,0 +1,167 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from volunteers.conftest import seed_year
+from volunteers.core.outbox import ASSIGNMENT_EVENTS, NOTIFICATIONS
+from volunteers.models import (
+    ApplicationForm,
+    Day,
+    Hall,
+    OutboxMessage,
+    Position,
+    User,
+    UserDay,
+)
+from volunteers.services.year import (
+    AssignmentImport,
+    AssignmentImportInvalid,
+    YearService,
+)
+
+pytestmark = pytest.mark.postgres
+
+
+@pytest.fixture
+def admin() -> User:
+    return User(id=1, first_name_ru="Админ", last_name_ru="Тестов", telegram_username="admin")
+
+
+async def populate(session_factory: async_sessionmaker[AsyncSession]) -> dict[str, int]:
+    """Two registered users, one of them already assigned to the first day."""
+    async with session_factory() as session:
+        first, second = (Day(name=n, information="") for n in ("Mon", "Tue"))
+        other_day = Day(name="Old", information="")
+        cloakroom = Position(name="Cloakroom")
+        hall_position = Position(name="Hall", has_halls=True)
+        hall = Hall(name="Main")
+        # The last user did not register for the year
+        seeded = await seed_year(
+            session,
+            year_name="25",
+            days=[first, second],
+            positions=[cloakroom, hall_position],
+            halls=[hall],
+            users=3,
+            registered=2,
+        )
+        await seed_year(session, year_name="24", days=[other_day])
+        users, forms = seeded.users, seeded.forms
+        session.add(
+            UserDay(
+                application_form_id=forms[0].id,
+                day_id=first.id,
+                position_id=cloakroom.id,
+                information="kept",
+            )
+        )
+        await session.commit()
+        return {
+            "user": users[0].id,
+            "other_user": users[1].id,
+            "unregistered": users[2].id,
+            "year": seeded.year.id,
+            "first": first.id,
+            "second": second.id,
+            "other_day": other_day.id,
+            "cloakroom": cloakroom.id,
+            "hall_position": hall_position.id,
+            "hall": hall.id,
+        }
+
+
+def csv(*lines: str) -> bytes:
+    return "\n".join(["user_id,day_id,position_id,hall_id", *lines, ""]).encode()
+
+
+async def test_import_upserts_assignments_and_reports_once(
+    year_service: YearService,
+    pg_session_factory: async_sessionmaker[AsyncSession],
+    admin: User,
+) -> None:
+    ids = await populate(pg_session_factory)
+
+    imported = await year_service.import_assignments(
+        ids["year"],
+        csv(
+            f"{ids['user']},{ids['first']},{ids['hall_position']},{ids['hall']}",
+            f"{ids['user']},{ids['second']},{ids['cloakroom']},",
+            f"{ids['other_user']},{ids['second']},{ids['cloakroom']},",
+        ),
+        author=admin,
+    )
+
+    assert imported == AssignmentImport(created=2, updated=1, unchanged=0)
+    async with pg_session_factory() as session:
+        result = await session.execute(
+            select(UserDay.day_id, UserDay.position_id, UserDay.hall_id, UserDay.information)
+            .join(ApplicationForm)
+            .where(ApplicationForm.user_id == ids["user"])
+            .order_by(UserDay.day_id)
+        )
+        assert result.tuples().all() == [
+            (ids["first"], ids["hall_position"], ids["hall"], "kept"),
+            (ids["second"], ids["cloakroom"], None, ""),
+        ]
+        messages = (await session.execute(select(OutboxMessage.kind, OutboxMessage.payload))).all()
+    notifications = [payload for kind, payload in messages if kind == NOTIFICATIONS]
+    assert notifications == ["[Mon, Tue] Imported 2 new and 1 changed assignments\n(by @admin)"]
+    events = [payload for kind, payload in messages if kind == ASSIGNMENT_EVENTS]
+    assert [(e["day_id"], len(e["assignments"])) for e in events] == [
+        (ids["first"], 1),
+        (ids["second"], 2),
+    ]
+
+    # Importing the same file again changes nothing
+    again = await year_service.import_assignments(
+        ids["year"],
+        csv(f"{ids['user']},{ids['first']},{ids['hall_position']},{ids['hall']}"),
+        author=admin,
+    )
+    assert again == AssignmentImport(created=0, updated=0, unchanged=1)
+
+
+async def test_import_rejects_lines_that_do_not_fit_the_year(
+    year_service: YearService,
+    pg_session_factory: async_sessionmaker[AsyncSession],
+    admin: User,
+) -> None:
+    ids = await populate(pg_session_factory)
+
+    with pytest.raises(AssignmentImportInvalid) as exc_info:
+        await year_service.import_assignments(
+            ids["year"],
+            csv(
+                f"{ids['user']},{ids['second']},{ids['cloakroom']},",
+                f"{ids['unregistered']},{ids['first']},{ids['cloakroom']},",
+                f"{ids['user']},{ids['other_day']},{ids['cloakroom']},",
+                f"{ids['other_user']},{ids['first']},{ids['cloakroom']},{ids['hall']}",
+                f"{ids['user']},{ids['second']},{ids['cloakroom']},",
+            ),
+            author=admin,
+        )
+
+    assert exc_info.value.errors == [
+        f"Line 2: user {ids['user']} is assigned to day {ids['second']} more than once",
+        f"Line 3: user {ids['unregistered']} has no application form for the year",
+        f"Line 4: day {ids['other_day']} is not a day of the year",
+        f"Line 5: position {ids['cloakroom']} has no halls",
+        f"Line 6: user {ids['user']} is assigned to day {ids['second']} more than once",
+    ]
+    async with pg_session_factory() as session:
+        assert len((await session.scalars(select(UserDay.id))).all()) == 1
+        assert (await session.scalars(select(OutboxMessage.id))).all() == []
+
+
+async def test_import_rejects_malformed_files(
+    year_service: YearService,
+    pg_session_factory: async_sessionmaker[AsyncSession],
+    admin: User,
+) -> None:
+    ids = await populate(pg_session_factory)
+
+    with pytest.raises(AssignmentImportInvalid) as exc_info:
+        await year_service.import_assignments(ids["year"], csv("1,Mon,2,"), author=admin)
+
+    [error] = exc_info.value.errors
+    assert "Mon" in error
@@ -90,6 +90,7 @@ async def test_create_user(user_service: UserService) -> None:
 
     mock_session: MagicMock = MagicMock()
     mock_session.add = MagicMock()
+    mock_session.flush = AsyncMock()
     mock_session.commit = AsyncMock()
 
     with patch.object(user_service, "session_scope", return_value=make_async_cm(mock_session)):
@@ -9,6 +9,7 @@ from volunteers.models.attendance import Attendance
 from volunteers.schemas.application_form import ApplicationFormIn
 from volunteers.schemas.assessment import AssessmentEditIn, AssessmentIn
 from volunteers.schemas.day import DayEditIn, DayIn
+from volunteers.schemas.day_assignment import DayAssignmentItem
 from volunteers.schemas.position import PositionEditIn, PositionIn
 from volunteers.schemas.user_day import UserDayEditIn
 from volunteers.schemas.year import YearEditIn, YearIn
@@ -30,10 +31,9 @@ def mock_db() -> MagicMock:
 
 @pytest.fixture
 def year_service(mock_db: MagicMock) -> YearService:
-    mock_notifier = MagicMock()
-    mock_socketio = MagicMock()
-    mock_socketio.emit = AsyncMock()
-    service = YearService(notifier=mock_notifier, socketio_server=mock_socketio)
+    mock_outbox = MagicMock()
+    mock_outbox.add = AsyncMock()
+    service = YearService(outbox=mock_outbox)
     service.db = mock_db
     return service
 
@@ -115,6 +115,7 @@ async def test_create_form(year_service: YearService) -> None:
     mock_session.add = MagicMock()
     mock_session.flush = AsyncMock()
     mock_session.commit = AsyncMock()
+    mock_session.execute = AsyncMock()
     with patch.object(year_service, "session_scope", return_value=make_async_cm(mock_session)):
         await year_service.create_form(form_data)
         assert mock_session.add.call_count == 1 + len(form_data.desired_positions_ids)
@@ -270,6 +271,7 @@ async def test_add_day(year_service: YearService) -> None:
     mock_session = MagicMock()
     mock_session.add = MagicMock()
     mock_session.commit = AsyncMock()
+    mock_session.execute = AsyncMock()
     with patch.object(year_service, "session_scope", return_value=make_async_cm(mock_session)):
         day = await year_service.add_day(day_in)
         assert day.year_id == day_in.year_id
@@ -396,13 +398,17 @@ async def test_add_user_day(year_service: YearService) -> None:
     mock_session = MagicMock()
     mock_session.add = MagicMock()
     mock_session.commit = AsyncMock()
+    # The new assignment_version and assignment_published of the day
+    mock_session.execute = AsyncMock(return_value=MagicMock(one=MagicMock(return_value=(3, True))))
 
-    # Mock the notifier
-    year_service.notifier.notify = AsyncMock()
+    item = DayAssignmentItem(
+        user_day_id=5, name="Test User", telegram="test_user", position="Test Position", hall=None
+    )
 
     with (
         patch.object(year_service, "session_scope", return_value=make_async_cm(mock_session)),
         patch("volunteers.services.year.UserDay", return_value=created_user_day),
+        patch("volunteers.services.year.day_assignment_item", return_value=item),
     ):
         user_day = await year_service.add_user_day(user_day_in, mock_author)
         assert user_day.application_form_id == user_day_in.application_form_id
@@ -411,7 +417,14 @@ async def test_add_user_day(year_service: YearService) -> None:
         assert user_day.attendance == user_day_in.attendance
         mock_session.add.assert_called_once_with(created_user_day)
         mock_session.commit.assert_awaited_once()
-        year_service.notifier.notify.assert_awaited_once()
+        # Recorded in the transaction of the change
+        (notification, event) = year_service.outbox.add.await_args_list
+        assert notification.args[0] is mock_session
+        assert notification.args[1] == "notifications"
+        assert event.args[1] == "assignment_events"
+        payload = event.args[2]
+        assert payload["version"] == 3
+        assert payload["assignments"] == [item.model_dump()]
 
 
 @pytest.mark.asyncio
@@ -481,15 +494,16 @@ async def test_edit_user_day_by_user_day_id_success(year_service: YearService) -
     dummy_user_day.awaitable_attrs = mock_awaitable_attrs
     mock_result = MagicMock()
     mock_result.scalar_one_or_none.return_value = dummy_user_day
+    mock_result.one.return_value = (3, True)
     mock_session = MagicMock()
     mock_session.execute = AsyncMock(return_value=mock_result)
     mock_session.get = AsyncMock(return_value=MagicMock())  # Mock session.get for Position/Hall
     mock_session.commit = AsyncMock()
 
-    # Mock the notifier
-    year_service.notifier.notify = AsyncMock()
-
-    with patch.object(year_service, "session_scope", return_value=make_async_cm(mock_session)):
+    with (
+        patch.object(year_service, "session_scope", return_value=make_async_cm(mock_session)),
+        patch("volunteers.services.year.day_assignment_item"),
+    ):
         await year_service.edit_user_day_by_user_day_id(1, user_day_edit, mock_author)
         assert dummy_user_day.information == user_day_edit.information
         assert dummy_user_day.attendance == user_day_edit.attendance
@@ -520,6 +534,7 @@ async def test_add_assessment(year_service: YearService) -> None:
     mock_session = MagicMock()
     mock_session.add = MagicMock()
     mock_session.commit = AsyncMock()
+    mock_session.execute = AsyncMock()
     mock_session.refresh = AsyncMock()
     with patch.object(year_service, "session_scope", return_value=make_async_cm(mock_session)):
         assessment = await year_service.add_assessment(assessment_in)
@@ -1,5 +1,6 @@
 from sqlalchemy import select
 
+from volunteers.core.experience import forms_of_user_day, refresh_user_year_experience
 from volunteers.models import Assessment
 from volunteers.schemas.assessment import AssessmentEditIn, AssessmentIn
 from volunteers.services.base import BaseService
@@ -10,6 +11,7 @@ class AssessmentService(BaseService):
         async with self.session_scope() as session:
             assessment = Assessment(**assessment_in.model_dump())
             session.add(assessment)
+            await refresh_user_year_experience(session, forms_of_user_day(assessment.user_day_id))
             await session.commit()
             await session.refresh(assessment)
             return assessment
@@ -27,6 +29,7 @@ class AssessmentService(BaseService):
                 exclude_unset=True,
             ).items():
                 setattr(assessment, key, value)
+            await refresh_user_year_experience(session, forms_of_user_day(assessment.user_day_id))
             await session.commit()
             await session.refresh(assessment)
             return assessment
@@ -37,6 +40,7 @@ class AssessmentService(BaseService):
             if not assessment:
                 return False
             await session.delete(assessment)
+            await refresh_user_year_experience(session, forms_of_user_day(assessment.user_day_id))
             await session.commit()
             return True
 
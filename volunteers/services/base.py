@@ -6,15 +6,53 @@ import loguru
 from dependency_injector.wiring import Provide
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
+from volunteers.core.db import current_unit_of_work
+
 
 class BaseService:
     db: Annotated[AsyncEngine, Provide["db"]]
+    session_factory: Annotated[async_sessionmaker[AsyncSession], Provide["session_factory"]]
+    replica_session_factory: Annotated[
+        async_sessionmaker[AsyncSession], Provide["replica_session_factory"]
+    ]
 
     def __init__(self) -> None:
         self.logger = loguru.logger.bind(service=self.__class__.__name__)
 
     @asynccontextmanager
-    async def session_scope(self) -> AsyncGenerator[AsyncSession]:
-        async_session = async_sessionmaker(self.db, expire_on_commit=False)
-        async with async_session() as session:
+    async def session_scope(self, read_only: bool = False) -> AsyncGenerator[AsyncSession]:
+        """Session for one service operation.
+
+        Inside an HTTP request the request-wide session is reused (see
+        ``volunteers.core.db.RequestUnitOfWork``), otherwise a new session is opened.
+        Only an exception rolls the shared session back, so an operation that returns
+        early after writing must commit or roll back itself; otherwise the next commit
+        of the request commits its writes too.
+
+        Args:
+            read_only: The operation only reads and tolerates replication lag, so it may
+                run on the read replica. Requests that wrote recently stay on the primary.
+        """
+        unit_of_work = current_unit_of_work()
+        # Without a replica both factories are the same, and reads share the request's session
+        if (
+            read_only
+            and self.replica_session_factory is not self.session_factory
+            and (unit_of_work is None or not unit_of_work.reads_from_primary)
+        ):
+            async with self.replica_session_factory() as session:
+                yield session
+            return
+
+        if unit_of_work is None:
+            async with self.session_factory() as session:
+                yield session
+            return
+
+        session = await unit_of_work.session()
+        try:
             yield session
+        except BaseException:
+            # Same outcome as closing a private session: drop the unfinished work
+            await session.rollback()
+            raise
@@ -1,15 +1,38 @@
 """Service for exporting data to CSV format."""
 
+import asyncio
 import csv
+import enum
+import hashlib
 import zipfile
-from io import BytesIO, StringIO
-
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from io import StringIO
+from typing import Any
+
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Row,
+    ScalarSelect,
+    Select,
+    Text,
+    case,
+    cast,
+    func,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import QueryableAttribute, selectinload
 
+from volunteers.core.export_cache import ExportCache
 from volunteers.models import (
     ApplicationForm,
+    Assessment,
     Day,
+    FormPositionAssociation,
     Hall,
     Position,
     User,
@@ -29,14 +52,272 @@ class YearNotFoundError(ValueError):
         self.year_id = year_id
 
 
+# Rows fetched from a server-side cursor at a time
+EXPORT_ROWS_PER_FETCH = 1000
+# Compressed bytes collected before a chunk is handed to the client
+EXPORT_CHUNK_SIZE = 64 * 1024
+# COPY data chunks buffered between the database and the client
+COPY_QUEUE_SIZE = 16
+# Bump whenever the archive layout changes so that cached archives are not reused
+EXPORT_FORMAT_VERSION = 1
+
+
+# Receives the number of rows exported since the previous call
+type ProgressCallback = Callable[[int], None]
+
+
+class ExportEngine(str, enum.Enum):
+    """How CSV rows are produced."""
+
+    # Rows are read from a server-side cursor and formatted in Python
+    ORM = "orm"
+    # Rows are formatted by PostgreSQL with COPY ... TO STDOUT; the columns are the
+    # same, but lines end with LF instead of CRLF
+    COPY = "copy"
+
+
+USERS_FORMS_HEADER = [
+    "User ID",
+    "Last Name (RU)",
+    "First Name (RU)",
+    "Patronymic (RU)",
+    "Last Name (EN)",
+    "First Name (EN)",
+    "Email",
+    "Phone",
+    "Telegram Username",
+    "Telegram ID",
+    "Gender",
+    "ISU ID",
+    "Is Admin",
+    "ITMO Group",
+    "Comments",
+    "Needs Invitation",
+    "Desired Positions",
+    "Created At",
+    "Updated At",
+]
+DAYS_HEADER = [
+    "Day ID",
+    "Day Name",
+    "Information",
+    "Score",
+    "Mandatory",
+    "Assignment Published",
+    "Created At",
+    "Updated At",
+]
+POSITIONS_HEADER = [
+    "Position ID",
+    "Position Name",
+    "Can Desire",
+    "Has Halls",
+    "Is Manager",
+    "Created At",
+    "Updated At",
+]
+HALLS_HEADER = [
+    "Hall ID",
+    "Hall Name",
+    "Description",
+    "Created At",
+    "Updated At",
+]
+ASSIGNMENTS_HEADER = [
+    "Assignment ID",
+    "User ID",
+    "User Name (RU)",
+    "User Name (EN)",
+    "Day ID",
+    "Day Name",
+    "Position ID",
+    "Position Name",
+    "Hall ID",
+    "Hall Name",
+    "Attendance",
+    "Information",
+    "Created At",
+    "Updated At",
+]
+ASSESSMENTS_HEADER = [
+    "Assessment ID",
+    "User Day ID",
+    "User ID",
+    "User Name (RU)",
+    "Day ID",
+    "Day Name",
+    "Value",
+    "Comment",
+    "Created At",
+    "Updated At",
+]
+
+ALL_USERS_HEADER = [
+    "User ID",
+    "Telegram ID",
+    "Last Name (RU)",
+    "First Name (RU)",
+    "Patronymic (RU)",
+    "Last Name (EN)",
+    "First Name (EN)",
+    "Email",
+    "Phone",
+    "Telegram Username",
+    "Gender",
+    "ISU ID",
+    "Is Admin",
+    "Participated Years",
+    "Created At",
+    "Updated At",
+]
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that collects what ``ZipFile`` writes.
+
+    ``ZipFile`` falls back to data descriptors for unseekable outputs, so entries
+    never have to be rewritten and the collected bytes can be sent right away.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes, /) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        """Return everything written since the previous call."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+@dataclass(frozen=True)
+class _CsvFile:
+    """A CSV file of the year export, producible by either ``ExportEngine``."""
+
+    name: str
+    header: list[str]
+    query: Select[Any]
+    format_row: Callable[[Row[Any]], list[Any]]
+    copy_query: Select[Any]
+
+
+type _Column[T] = ColumnElement[T] | QueryableAttribute[T]
+
+# SQL counterparts of the Python formatting used by the ORM engine. COPY writes NULL
+# as an empty field and an empty string as "", so empty values are turned into NULL.
+
+
+def _copy_select(header: list[str], *columns: _Column[Any]) -> Select[Any]:
+    """Select ``columns`` named after the CSV ``header``."""
+    return select(*(column.label(name) for name, column in zip(header, columns, strict=True)))
+
+
+def _text(column: _Column[Any]) -> ColumnElement[str]:
+    """``value or ""``"""
+    return func.nullif(cast(column, Text), "")
+
+
+def _yes_no(column: _Column[bool]) -> ColumnElement[str]:
+    """``"Yes" if value else "No"``"""
+    return case((column, "Yes"), else_="No")
+
+
+def _float(column: _Column[Any]) -> ColumnElement[str]:
+    """``str(value)`` of a float: whole numbers keep a trailing ``.0``."""
+    return case(
+        (
+            (column == func.trunc(column)) & (func.abs(column) < 1e16),
+            cast(cast(column, BigInteger), Text) + ".0",
+        ),
+        else_=cast(column, Text),
+    )
+
+
+def _isoformat(column: _Column[Any]) -> ColumnElement[str]:
+    """``value.isoformat()`` of a UTC timestamp; microseconds only when non-zero."""
+    utc = func.timezone("UTC", column)
+    return (
+        func.to_char(utc, 'YYYY-MM-DD"T"HH24:MI:SS')
+        + case((func.date_trunc("second", utc) != utc, func.to_char(utc, ".US")), else_="")
+        + "+00:00"
+    )
+
+
 class ExportService(BaseService):
     """Service for exporting data to CSV format."""
 
-    async def export_year_data(self, year_id: int) -> bytes:
+    def __init__(self, cache: ExportCache | None = None) -> None:
+        self.cache = cache
+        super().__init__()
+
+    async def cached_year_data(
+        self, year_id: int, engine: ExportEngine = ExportEngine.ORM
+    ) -> AsyncIterator[bytes]:
+        """Same as ``stream_year_data``, served from the export cache when the year is unchanged."""
+        if self.cache is None:
+            return self.stream_year_data(year_id, engine)
+        fingerprint = await self.year_fingerprint(year_id, engine)
+        return self.cache.get_or_build(fingerprint, lambda: self.stream_year_data(year_id, engine))
+
+    async def year_fingerprint(self, year_id: int, engine: ExportEngine) -> str:
+        """Hash of everything the year export depends on.
+
+        Combines the row count and the latest ``updated_at`` of every table that ends up
+        in the archive, so any insert, update or delete produces a new fingerprint.
+        """
+        form_ids = select(ApplicationForm.id).where(ApplicationForm.year_id == year_id)
+        user_day_ids = select(UserDay.id).where(UserDay.application_form_id.in_(form_ids))
+        sources: list[tuple[Any, ColumnElement[bool]]] = [
+            (ApplicationForm, ApplicationForm.year_id == year_id),
+            (
+                User,
+                User.id.in_(
+                    select(ApplicationForm.user_id).where(ApplicationForm.year_id == year_id)
+                ),
+            ),
+            (FormPositionAssociation, FormPositionAssociation.form_id.in_(form_ids)),
+            (UserDay, UserDay.id.in_(user_day_ids)),
+            (Assessment, Assessment.user_day_id.in_(user_day_ids)),
+            (Day, Day.year_id == year_id),
+            (Position, Position.year_id == year_id),
+            (Hall, Hall.year_id == year_id),
+        ]
+        columns = []
+        for model, where in sources:
+            columns.append(select(func.count()).select_from(model).where(where).scalar_subquery())
+            columns.append(select(func.max(model.updated_at)).where(where).scalar_subquery())
+
+        async with self.session_scope(read_only=True) as session:
+            result = await session.execute(select(*columns))
+            state = tuple(result.one())
+
+        key = repr((EXPORT_FORMAT_VERSION, year_id, engine.value, state))
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    async def stream_year_data(
+        self,
+        year_id: int,
+        engine: ExportEngine = ExportEngine.ORM,
+        progress: ProgressCallback | None = None,
+    ) -> AsyncIterator[bytes]:
         """
         Export all year data to ZIP archive with multiple CSV files.
 
-        Returns ZIP file content as bytes containing:
+        Rows are read with server-side cursors (or COPY, see ``ExportEngine``) and the
+        archive is yielded in chunks while it is being built, so memory use does not
+        depend on the size of the year. The archive contains:
         - users.csv - User information
         - assignments.csv - Day assignments
         - assessments.csv - All assessments
@@ -44,349 +325,502 @@ class ExportService(BaseService):
         - positions.csv - Positions info
         - halls.csv - Halls info
         """
-        async with self.session_scope() as session:
+        sink = _ChunkSink()
+        async with self.session_scope(read_only=True) as session:
             # Get year info
-            year_result = await session.execute(select(Year).where(Year.id == year_id))
-            year = year_result.scalar_one_or_none()
-
-            if not year:
+            year_result = await session.execute(select(Year.id).where(Year.id == year_id))
+            if year_result.scalar_one_or_none() is None:
                 raise YearNotFoundError(year_id)
 
-            # Get all assignments for this year with all related data
-            assignments_result = await session.execute(
-                select(UserDay)
-                .join(ApplicationForm)
-                .where(ApplicationForm.year_id == year_id)
-                .options(
-                    selectinload(UserDay.application_form).selectinload(ApplicationForm.user),
-                    selectinload(UserDay.application_form).selectinload(
-                        ApplicationForm.desired_positions
-                    ),
-                    selectinload(UserDay.day),
-                    selectinload(UserDay.position),
-                    selectinload(UserDay.hall),
-                    selectinload(UserDay.assessments),
+            with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zip_file:
+                for csv_file in self._year_csv_files(year_id):
+                    if engine is ExportEngine.COPY:
+                        csv_chunks = self._copy_csv(session, csv_file.copy_query, progress)
+                    else:
+                        csv_chunks = self._format_csv(session, csv_file, progress)
+                    with zip_file.open(csv_file.name, "w") as entry:
+                        async for data in csv_chunks:
+                            entry.write(data)
+                            if sink.size >= EXPORT_CHUNK_SIZE:
+                                yield sink.take()
+                    yield sink.take()
+        yield sink.take()
+
+    async def _format_csv(
+        self, session: AsyncSession, csv_file: _CsvFile, progress: ProgressCallback | None
+    ) -> AsyncIterator[bytes]:
+        """Build CSV lines in Python from a server-side cursor."""
+        output = StringIO()
+        writer = csv.writer(output)
+        writer.writerow(csv_file.header)
+        rows = await session.stream(
+            csv_file.query.execution_options(yield_per=EXPORT_ROWS_PER_FETCH)
+        )
+        async for partition in rows.partitions():
+            writer.writerows(csv_file.format_row(row) for row in partition)
+            if progress:
+                progress(len(partition))
+            yield output.getvalue().encode()
+            output.seek(0)
+            output.truncate()
+        yield output.getvalue().encode()
+
+    async def _copy_csv(
+        self, session: AsyncSession, query: Select[Any], progress: ProgressCallback | None
+    ) -> AsyncIterator[bytes]:
+        """Let PostgreSQL build the CSV with ``COPY (query) TO STDOUT``.
+
+        Progress is counted in lines, so values with line breaks make it approximate.
+        """
+        connection = await session.connection()
+        sql = query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+        raw_connection = await connection.get_raw_connection()
+        driver_connection: Any = raw_connection.driver_connection
+
+        # COPY pushes data through a callback; a bounded queue turns it into an iterator
+        # and stops the server from running ahead of the client.
+        queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=COPY_QUEUE_SIZE)
+
+        async def run_copy() -> None:
+            try:
+                await driver_connection.copy_from_query(
+                    str(sql), output=queue.put, format="csv", header=True
                 )
-                .order_by(UserDay.day_id, UserDay.id)
-            )
-            assignments = list(assignments_result.scalars().all())
-
-            # Get all forms for this year
-            forms_result = await session.execute(
-                select(ApplicationForm)
-                .where(ApplicationForm.year_id == year_id)
-                .options(
-                    selectinload(ApplicationForm.user),
-                    selectinload(ApplicationForm.desired_positions),
+            except BaseException:
+                # The client may be gone and the queue full: drop the unread data, which
+                # is useless after a failure, so that the end is marked without waiting
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                raise
+            await queue.put(None)
+
+        copy_task = asyncio.create_task(run_copy())
+        header_lines = 1
+        try:
+            while (data := await queue.get()) is not None:
+                if progress:
+                    lines = data.count(b"\n")
+                    progress(lines - min(lines, header_lines))
+                    header_lines -= min(lines, header_lines)
+                yield data
+            await copy_task
+        finally:
+            if not copy_task.done():
+                copy_task.cancel()
+                # Waits for the cancelled copy without swallowing a cancellation of our own
+                await asyncio.wait([copy_task])
+                if not copy_task.cancelled():
+                    copy_task.exception()  # the stream was abandoned, so nobody needs it
+
+    def _year_csv_files(self, year_id: int) -> list[_CsvFile]:
+        """Describe every CSV file of the year export."""
+        return [
+            _CsvFile(
+                name="01_users_and_registrations.csv",
+                header=USERS_FORMS_HEADER,
+                query=self._users_forms_query(year_id),
+                format_row=self._users_forms_row,
+                copy_query=self._users_forms_copy_query(year_id),
+            ),
+            _CsvFile(
+                name="02_days.csv",
+                header=DAYS_HEADER,
+                query=select(Day).where(Day.year_id == year_id).order_by(Day.id),
+                format_row=self._days_row,
+                copy_query=_copy_select(
+                    DAYS_HEADER,
+                    Day.id,
+                    _text(Day.name),
+                    _text(Day.information),
+                    _float(func.nullif(Day.score, 0.0)),
+                    _yes_no(Day.mandatory),
+                    _yes_no(Day.assignment_published),
+                    _isoformat(Day.created_at),
+                    _isoformat(Day.updated_at),
+                )
+                .where(Day.year_id == year_id)
+                .order_by(Day.id),
+            ),
+            _CsvFile(
+                name="03_positions.csv",
+                header=POSITIONS_HEADER,
+                query=select(Position).where(Position.year_id == year_id).order_by(Position.id),
+                format_row=self._positions_row,
+                copy_query=_copy_select(
+                    POSITIONS_HEADER,
+                    Position.id,
+                    _text(Position.name),
+                    _yes_no(Position.can_desire),
+                    _yes_no(Position.has_halls),
+                    _yes_no(Position.is_manager),
+                    _isoformat(Position.created_at),
+                    _isoformat(Position.updated_at),
+                )
+                .where(Position.year_id == year_id)
+                .order_by(Position.id),
+            ),
+            _CsvFile(
+                name="04_halls.csv",
+                header=HALLS_HEADER,
+                query=select(Hall).where(Hall.year_id == year_id).order_by(Hall.id),
+                format_row=self._halls_row,
+                copy_query=_copy_select(
+                    HALLS_HEADER,
+                    Hall.id,
+                    _text(Hall.name),
+                    _text(Hall.description),
+                    _isoformat(Hall.created_at),
+                    _isoformat(Hall.updated_at),
+                )
+                .where(Hall.year_id == year_id)
+                .order_by(Hall.id),
+            ),
+            _CsvFile(
+                name="05_assignments.csv",
+                header=ASSIGNMENTS_HEADER,
+                query=self._assignments_query(year_id),
+                format_row=self._assignments_row,
+                copy_query=self._assignments_copy_query(year_id),
+            ),
+            _CsvFile(
+                name="06_assessments.csv",
+                header=ASSESSMENTS_HEADER,
+                query=self._assessments_query(year_id),
+                format_row=self._assessments_row,
+                copy_query=self._assessments_copy_query(year_id),
+            ),
+        ]
+
+    @staticmethod
+    def _desired_positions() -> ScalarSelect[str]:
+        """Names of the positions desired in the form, comma separated."""
+        return (
+            select(
+                func.string_agg(
+                    Position.name, aggregate_order_by(literal_column("', '"), Position.id)
                 )
-                .order_by(ApplicationForm.user_id)
-            )
-            forms = list(forms_result.scalars().all())
-
-            # Get days
-            days_result = await session.execute(
-                select(Day).where(Day.year_id == year_id).order_by(Day.id)
-            )
-            days = list(days_result.scalars().all())
-
-            # Get positions
-            positions_result = await session.execute(
-                select(Position).where(Position.year_id == year_id).order_by(Position.id)
-            )
-            positions = list(positions_result.scalars().all())
-
-            # Get halls
-            halls_result = await session.execute(
-                select(Hall).where(Hall.year_id == year_id).order_by(Hall.id)
             )
-            halls = list(halls_result.scalars().all())
-
-            # Create ZIP archive
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-                # 1. Users and Registration Forms CSV
-                users_csv = self._create_users_forms_csv(forms)
-                zip_file.writestr("01_users_and_registrations.csv", users_csv)
-
-                # 2. Days CSV
-                days_csv = self._create_days_csv(days)
-                zip_file.writestr("02_days.csv", days_csv)
-
-                # 3. Positions CSV
-                positions_csv = self._create_positions_csv(positions)
-                zip_file.writestr("03_positions.csv", positions_csv)
-
-                # 4. Halls CSV
-                halls_csv = self._create_halls_csv(halls)
-                zip_file.writestr("04_halls.csv", halls_csv)
-
-                # 5. Assignments CSV
-                assignments_csv = self._create_assignments_csv(assignments)
-                zip_file.writestr("05_assignments.csv", assignments_csv)
-
-                # 6. Assessments CSV
-                assessments_csv = self._create_assessments_csv(assignments)
-                zip_file.writestr("06_assessments.csv", assessments_csv)
-
-            zip_buffer.seek(0)
-            return zip_buffer.getvalue()
-
-    def _create_users_forms_csv(self, forms: list[ApplicationForm]) -> str:
-        """Create CSV with users and their registration forms."""
-        output = StringIO()
-        writer = csv.writer(output)
-
-        writer.writerow(
-            [
-                "User ID",
-                "Last Name (RU)",
-                "First Name (RU)",
-                "Patronymic (RU)",
-                "Last Name (EN)",
-                "First Name (EN)",
-                "Email",
-                "Phone",
-                "Telegram Username",
-                "Telegram ID",
-                "Gender",
-                "ISU ID",
-                "Is Admin",
-                "ITMO Group",
-                "Comments",
-                "Needs Invitation",
-                "Desired Positions",
-                "Created At",
-                "Updated At",
-            ]
+            .join(FormPositionAssociation, FormPositionAssociation.position_id == Position.id)
+            .where(FormPositionAssociation.form_id == ApplicationForm.id)
+            .scalar_subquery()
         )
 
-        for form in forms:
-            user = form.user
-            desired_positions = ", ".join(
-                [p.name for p in sorted(form.desired_positions, key=lambda x: x.id)]
+    @classmethod
+    def _users_forms_copy_query(cls, year_id: int) -> Select[Any]:
+        return (
+            _copy_select(
+                USERS_FORMS_HEADER,
+                User.id,
+                _text(User.last_name_ru),
+                _text(User.first_name_ru),
+                _text(User.patronymic_ru),
+                _text(User.last_name_en),
+                _text(User.first_name_en),
+                _text(User.email),
+                _text(User.phone),
+                _text(User.telegram_username),
+                func.nullif(User.telegram_id, 0),
+                _text(User.gender),
+                func.nullif(User.isu_id, 0),
+                _yes_no(User.is_admin),
+                _text(ApplicationForm.itmo_group),
+                _text(ApplicationForm.comments),
+                _yes_no(ApplicationForm.needs_invitation),
+                _text(cls._desired_positions()),
+                _isoformat(ApplicationForm.created_at),
+                _isoformat(ApplicationForm.updated_at),
             )
+            .select_from(ApplicationForm)
+            .join(User, ApplicationForm.user_id == User.id)
+            .where(ApplicationForm.year_id == year_id)
+            .order_by(ApplicationForm.user_id)
+        )
 
-            writer.writerow(
-                [
-                    user.id,
-                    user.last_name_ru,
-                    user.first_name_ru,
-                    user.patronymic_ru or "",
-                    user.last_name_en,
-                    user.first_name_en,
-                    user.email or "",
-                    user.phone or "",
-                    user.telegram_username or "",
-                    user.telegram_id or "",
-                    user.gender or "",
-                    user.isu_id or "",
-                    "Yes" if user.is_admin else "No",
-                    form.itmo_group or "",
-                    form.comments or "",
-                    "Yes" if form.needs_invitation else "No",
-                    desired_positions,
-                    form.created_at.isoformat() if hasattr(form, "created_at") else "",
-                    form.updated_at.isoformat() if hasattr(form, "updated_at") else "",
-                ]
+    @staticmethod
+    def _assignments_copy_query(year_id: int) -> Select[Any]:
+        return (
+            _copy_select(
+                ASSIGNMENTS_HEADER,
+                UserDay.id,
+                User.id,
+                _text(User.last_name_ru + " " + User.first_name_ru),
+                _text(User.first_name_en + " " + User.last_name_en),
+                Day.id,
+                _text(Day.name),
+                Position.id,
+                _text(Position.name),
+                Hall.id,
+                _text(Hall.name),
+                func.coalesce(func.lower(cast(UserDay.attendance, Text)), Attendance.UNKNOWN.value),
+                _text(UserDay.information),
+                _isoformat(UserDay.created_at),
+                _isoformat(UserDay.updated_at),
             )
-
-        return output.getvalue()
-
-    def _create_days_csv(self, days: list[Day]) -> str:
-        """Create CSV with days information."""
-        output = StringIO()
-        writer = csv.writer(output)
-
-        writer.writerow(
-            [
-                "Day ID",
-                "Day Name",
-                "Information",
-                "Score",
-                "Mandatory",
-                "Assignment Published",
-                "Created At",
-                "Updated At",
-            ]
+            .select_from(UserDay)
+            .join(ApplicationForm, UserDay.application_form_id == ApplicationForm.id)
+            .join(User, ApplicationForm.user_id == User.id)
+            .join(Day, UserDay.day_id == Day.id)
+            .join(Position, UserDay.position_id == Position.id)
+            .outerjoin(Hall, UserDay.hall_id == Hall.id)
+            .where(ApplicationForm.year_id == year_id)
+            .order_by(UserDay.day_id, UserDay.id)
         )
 
-        for day in days:
-            writer.writerow(
-                [
-                    day.id,
-                    day.name,
-                    day.information or "",
-                    day.score or "",
-                    "Yes" if day.mandatory else "No",
-                    "Yes" if day.assignment_published else "No",
-                    day.created_at.isoformat() if hasattr(day, "created_at") else "",
-                    day.updated_at.isoformat() if hasattr(day, "updated_at") else "",
-                ]
+    @staticmethod
+    def _assessments_copy_query(year_id: int) -> Select[Any]:
+        return (
+            _copy_select(
+                ASSESSMENTS_HEADER,
+                Assessment.id,
+                UserDay.id,
+                User.id,
+                _text(User.last_name_ru + " " + User.first_name_ru),
+                Day.id,
+                _text(Day.name),
+                _float(Assessment.value),
+                _text(Assessment.comment),
+                _isoformat(Assessment.created_at),
+                _isoformat(Assessment.updated_at),
             )
-
-        return output.getvalue()
-
-    def _create_positions_csv(self, positions: list[Position]) -> str:
-        """Create CSV with positions information."""
-        output = StringIO()
-        writer = csv.writer(output)
-
-        writer.writerow(
-            [
-                "Position ID",
-                "Position Name",
-                "Can Desire",
-                "Has Halls",
-                "Is Manager",
-                "Created At",
-                "Updated At",
-            ]
+            .select_from(Assessment)
+            .join(UserDay, Assessment.user_day_id == UserDay.id)
+            .join(ApplicationForm, UserDay.application_form_id == ApplicationForm.id)
+            .join(User, ApplicationForm.user_id == User.id)
+            .join(Day, UserDay.day_id == Day.id)
+            .where(ApplicationForm.year_id == year_id)
+            .order_by(UserDay.day_id, UserDay.id, Assessment.id)
         )
 
-        for position in positions:
-            writer.writerow(
-                [
-                    position.id,
-                    position.name,
-                    "Yes" if position.can_desire else "No",
-                    "Yes" if position.has_halls else "No",
-                    "Yes" if position.is_manager else "No",
-                    position.created_at.isoformat() if hasattr(position, "created_at") else "",
-                    position.updated_at.isoformat() if hasattr(position, "updated_at") else "",
-                ]
+    @classmethod
+    def _users_forms_query(cls, year_id: int) -> Select[Any]:
+        desired_positions = cls._desired_positions()
+        return (
+            select(
+                User.id,
+                User.last_name_ru,
+                User.first_name_ru,
+                User.patronymic_ru,
+                User.last_name_en,
+                User.first_name_en,
+                User.email,
+                User.phone,
+                User.telegram_username,
+                User.telegram_id,
+                User.gender,
+                User.isu_id,
+                User.is_admin,
+                ApplicationForm.itmo_group,
+                ApplicationForm.comments,
+                ApplicationForm.needs_invitation,
+                func.coalesce(desired_positions, "").label("desired_positions"),
+                ApplicationForm.created_at,
+                ApplicationForm.updated_at,
             )
-
-        return output.getvalue()
-
-    def _create_halls_csv(self, halls: list[Hall]) -> str:
-        """Create CSV with halls information."""
-        output = StringIO()
-        writer = csv.writer(output)
-
-        writer.writerow(
-            [
-                "Hall ID",
-                "Hall Name",
-                "Description",
-                "Created At",
-                "Updated At",
-            ]
+            .join(User, ApplicationForm.user_id == User.id)
+            .where(ApplicationForm.year_id == year_id)
+            .order_by(ApplicationForm.user_id)
         )
 
-        for hall in halls:
-            writer.writerow(
-                [
-                    hall.id,
-                    hall.name,
-                    hall.description or "",
-                    hall.created_at.isoformat() if hasattr(hall, "created_at") else "",
-                    hall.updated_at.isoformat() if hasattr(hall, "updated_at") else "",
-                ]
+    @staticmethod
+    def _users_forms_row(row: Row[Any]) -> list[Any]:
+        return [
+            row.id,
+            row.last_name_ru,
+            row.first_name_ru,
+            row.patronymic_ru or "",
+            row.last_name_en,
+            row.first_name_en,
+            row.email or "",
+            row.phone or "",
+            row.telegram_username or "",
+            row.telegram_id or "",
+            row.gender or "",
+            row.isu_id or "",
+            "Yes" if row.is_admin else "No",
+            row.itmo_group or "",
+            row.comments or "",
+            "Yes" if row.needs_invitation else "No",
+            row.desired_positions,
+            row.created_at.isoformat(),
+            row.updated_at.isoformat(),
+        ]
+
+    @staticmethod
+    def _days_row(row: Row[Any]) -> list[Any]:
+        day: Day = row[0]
+        return [
+            day.id,
+            day.name,
+            day.information or "",
+            day.score or "",
+            "Yes" if day.mandatory else "No",
+            "Yes" if day.assignment_published else "No",
+            day.created_at.isoformat(),
+            day.updated_at.isoformat(),
+        ]
+
+    @staticmethod
+    def _positions_row(row: Row[Any]) -> list[Any]:
+        position: Position = row[0]
+        return [
+            position.id,
+            position.name,
+            "Yes" if position.can_desire else "No",
+            "Yes" if position.has_halls else "No",
+            "Yes" if position.is_manager else "No",
+            position.created_at.isoformat(),
+            position.updated_at.isoformat(),
+        ]
+
+    @staticmethod
+    def _halls_row(row: Row[Any]) -> list[Any]:
+        hall: Hall = row[0]
+        return [
+            hall.id,
+            hall.name,
+            hall.description or "",
+            hall.created_at.isoformat(),
+            hall.updated_at.isoformat(),
+        ]
+
+    @staticmethod
+    def _assignments_query(year_id: int) -> Select[Any]:
+        return (
+            select(
+                UserDay.id,
+                User.id.label("user_id"),
+                User.last_name_ru,
+                User.first_name_ru,
+                User.first_name_en,
+                User.last_name_en,
+                Day.id.label("day_id"),
+                Day.name.label("day_name"),
+                Position.id.label("position_id"),
+                Position.name.label("position_name"),
+                Hall.id.label("hall_id"),
+                Hall.name.label("hall_name"),
+                UserDay.attendance,
+                UserDay.information,
+                UserDay.created_at,
+                UserDay.updated_at,
             )
-
-        return output.getvalue()
-
-    def _create_assignments_csv(self, assignments: list[UserDay]) -> str:
-        """Create CSV with assignments information."""
-        output = StringIO()
-        writer = csv.writer(output)
-
-        writer.writerow(
-            [
-                "Assignment ID",
-                "User ID",
-                "User Name (RU)",
-                "User Name (EN)",
-                "Day ID",
-                "Day Name",
-                "Position ID",
-                "Position Name",
-                "Hall ID",
-                "Hall Name",
-                "Attendance",
-                "Information",
-                "Created At",
-                "Updated At",
-            ]
+            .join(ApplicationForm, UserDay.application_form_id == ApplicationForm.id)
+            .join(User, ApplicationForm.user_id == User.id)
+            .join(Day, UserDay.day_id == Day.id)
+            .join(Position, UserDay.position_id == Position.id)
+            .outerjoin(Hall, UserDay.hall_id == Hall.id)
+            .where(ApplicationForm.year_id == year_id)
+            .order_by(UserDay.day_id, UserDay.id)
         )
 
-        for user_day in assignments:
-            user = user_day.application_form.user
-            day = user_day.day
-
-            writer.writerow(
-                [
-                    user_day.id,
-                    user.id,
-                    f"{user.last_name_ru} {user.first_name_ru}",
-                    f"{user.first_name_en} {user.last_name_en}",
-                    day.id,
-                    day.name,
-                    user_day.position.id,
-                    user_day.position.name,
-                    user_day.hall.id if user_day.hall else "",
-                    user_day.hall.name if user_day.hall else "",
-                    user_day.attendance.value if user_day.attendance else Attendance.UNKNOWN.value,
-                    user_day.information or "",
-                    user_day.created_at.isoformat() if hasattr(user_day, "created_at") else "",
-                    user_day.updated_at.isoformat() if hasattr(user_day, "updated_at") else "",
-                ]
+    @staticmethod
+    def _assignments_row(row: Row[Any]) -> list[Any]:
+        return [
+            row.id,
+            row.user_id,
+            f"{row.last_name_ru} {row.first_name_ru}",
+            f"{row.first_name_en} {row.last_name_en}",
+            row.day_id,
+            row.day_name,
+            row.position_id,
+            row.position_name,
+            row.hall_id if row.hall_id is not None else "",
+            row.hall_name if row.hall_id is not None else "",
+            row.attendance.value if row.attendance else Attendance.UNKNOWN.value,
+            row.information or "",
+            row.created_at.isoformat(),
+            row.updated_at.isoformat(),
+        ]
+
+    @staticmethod
+    def _assessments_query(year_id: int) -> Select[Any]:
+        return (
+            select(
+                Assessment.id,
+                UserDay.id.label("user_day_id"),
+                User.id.label("user_id"),
+                User.last_name_ru,
+                User.first_name_ru,
+                Day.id.label("day_id"),
+                Day.name.label("day_name"),
+                Assessment.value,
+                Assessment.comment,
+                Assessment.created_at,
+                Assessment.updated_at,
             )
-
-        return output.getvalue()
-
-    def _create_assessments_csv(self, assignments: list[UserDay]) -> str:
-        """Create CSV with all assessments."""
-        output = StringIO()
-        writer = csv.writer(output)
-
-        writer.writerow(
-            [
-                "Assessment ID",
-                "User Day ID",
-                "User ID",
-                "User Name (RU)",
-                "Day ID",
-                "Day Name",
-                "Value",
-                "Comment",
-                "Created At",
-                "Updated At",
-            ]
+            .join(UserDay, Assessment.user_day_id == UserDay.id)
+            .join(ApplicationForm, UserDay.application_form_id == ApplicationForm.id)
+            .join(User, ApplicationForm.user_id == User.id)
+            .join(Day, UserDay.day_id == Day.id)
+            .where(ApplicationForm.year_id == year_id)
+            .order_by(UserDay.day_id, UserDay.id, Assessment.id)
         )
 
-        for user_day in assignments:
-            user = user_day.application_form.user
-            for assessment in user_day.assessments:
-                writer.writerow(
-                    [
-                        assessment.id,
-                        user_day.id,
-                        user.id,
-                        f"{user.last_name_ru} {user.first_name_ru}",
-                        user_day.day.id,
-                        user_day.day.name,
-                        assessment.value,
-                        assessment.comment or "",
-                        assessment.created_at.isoformat()
-                        if hasattr(assessment, "created_at")
-                        else "",
-                        assessment.updated_at.isoformat()
-                        if hasattr(assessment, "updated_at")
-                        else "",
-                    ]
+    @staticmethod
+    def _assessments_row(row: Row[Any]) -> list[Any]:
+        return [
+            row.id,
+            row.user_day_id,
+            row.user_id,
+            f"{row.last_name_ru} {row.first_name_ru}",
+            row.day_id,
+            row.day_name,
+            row.value,
+            row.comment or "",
+            row.created_at.isoformat(),
+            row.updated_at.isoformat(),
+        ]
+
+    async def stream_all_users_copy(
+        self, progress: ProgressCallback | None = None
+    ) -> AsyncIterator[bytes]:
+        """Export all users to CSV format with PostgreSQL COPY.
+
+        Same columns as ``export_all_users``, streamed as the database produces them.
+        """
+        participated_years = (
+            select(
+                func.string_agg(
+                    Year.year_name,
+                    aggregate_order_by(literal_column("', '"), Year.year_name.collate("C")),
                 )
-
-        return output.getvalue()
-
-    async def export_all_users(self) -> str:
+            )
+            .join(ApplicationForm, ApplicationForm.year_id == Year.id)
+            .where(ApplicationForm.user_id == User.id)
+            .scalar_subquery()
+        )
+        query = _copy_select(
+            ALL_USERS_HEADER,
+            User.id,
+            func.nullif(User.telegram_id, 0),
+            _text(User.last_name_ru),
+            _text(User.first_name_ru),
+            _text(User.patronymic_ru),
+            _text(User.last_name_en),
+            _text(User.first_name_en),
+            _text(User.email),
+            _text(User.phone),
+            _text(User.telegram_username),
+            _text(User.gender),
+            func.nullif(User.isu_id, 0),
+            _yes_no(User.is_admin),
+            _text(participated_years),
+            _isoformat(User.created_at),
+            _isoformat(User.updated_at),
+        ).order_by(User.id)
+        async with self.session_scope(read_only=True) as session:
+            async for data in self._copy_csv(session, query, progress):
+                yield data
+
+    async def export_all_users(self, progress: ProgressCallback | None = None) -> str:
         """
         Export all users to CSV format.
         Includes: user data and participation in years.
 
         Returns CSV content as string.
         """
-        async with self.session_scope() as session:
+        async with self.session_scope(read_only=True) as session:
             # Get all users with their application forms
             users_result = await session.execute(
                 select(User)
@@ -400,26 +834,7 @@ class ExportService(BaseService):
             writer = csv.writer(output)
 
             # Write header
-            writer.writerow(
-                [
-                    "User ID",
-                    "Telegram ID",
-                    "Last Name (RU)",
-                    "First Name (RU)",
-                    "Patronymic (RU)",
-                    "Last Name (EN)",
-                    "First Name (EN)",
-                    "Email",
-                    "Phone",
-                    "Telegram Username",
-                    "Gender",
-                    "ISU ID",
-                    "Is Admin",
-                    "Participated Years",
-                    "Created At",
-                    "Updated At",
-                ]
-            )
+            writer.writerow(ALL_USERS_HEADER)
 
             # Write data rows
             for user in users:
@@ -448,5 +863,7 @@ class ExportService(BaseService):
                         user.updated_at.isoformat() if hasattr(user, "updated_at") else "",
                     ]
                 )
+            if progress:
+                progress(len(users))
 
             return output.getvalue()
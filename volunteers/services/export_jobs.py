@@ -0,0 +1,230 @@
+"""Background export jobs.
+
+Exports run in a bounded pool of asyncio tasks of the process that accepted them. The
+job state is kept as a JSON file next to the artifact, so any web worker sharing the
+directory can report progress and serve the result. A job keeps saving its state while
+it is queued or running; one whose state went stale lost its process, e.g. to a
+restart, and is reported as failed.
+"""
+
+import asyncio
+import enum
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import suppress
+from datetime import UTC, datetime
+from pathlib import Path
+
+from loguru import logger
+from pydantic import BaseModel
+
+from .errors import DomainError
+from .export import ExportEngine, ExportService, ProgressCallback
+
+# Delay between two state writes of a queued or running job, in seconds
+PROGRESS_SAVE_INTERVAL = 1.0
+# Unfinished jobs whose state is older than this, in seconds, lost their process
+JOB_STALE_AFTER = 60.0
+
+
+class ExportJobKind(str, enum.Enum):
+    YEAR = "year"
+    USERS = "users"
+
+
+class ExportJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ExportJob(BaseModel):
+    job_id: str
+    kind: ExportJobKind
+    year_id: int | None
+    engine: ExportEngine
+    filename: str
+    status: ExportJobStatus = ExportJobStatus.QUEUED
+    rows_processed: int = 0
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class ExportJobNotFound(DomainError):
+    """Raised when an export job does not exist (or has expired)."""
+
+    def __init__(self) -> None:
+        super().__init__("Export job not found")
+
+
+class ExportJobYearRequired(DomainError):
+    """Raised when a year export is requested without a year."""
+
+    def __init__(self) -> None:
+        super().__init__("year_id is required for year exports")
+
+
+class ExportJobService:
+    def __init__(
+        self,
+        export_service: ExportService,
+        directory: str,
+        max_concurrency: int,
+        retention: int,
+    ) -> None:
+        self.export_service = export_service
+        self.directory = Path(directory)
+        self.retention = retention
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Keep references so running jobs are not garbage collected
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def _state_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def artifact_path(self, job: ExportJob) -> Path:
+        suffix = ".zip" if job.kind is ExportJobKind.YEAR else ".csv"
+        return self.directory / f"{job.job_id}{suffix}"
+
+    def _save(self, job: ExportJob) -> None:
+        job.updated_at = datetime.now(tz=UTC)
+        # Unique, as the final write of a job may overlap with a progress write
+        tmp_path = self._state_path(job.job_id).with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_text(job.model_dump_json())
+        tmp_path.replace(self._state_path(job.job_id))
+
+    def _load(self, state_path: Path) -> ExportJob:
+        job = ExportJob.model_validate_json(state_path.read_text())
+        updated_at = job.updated_at or job.created_at
+        if (
+            job.finished_at is None
+            and (datetime.now(tz=UTC) - updated_at).total_seconds() > JOB_STALE_AFTER
+        ):
+            job.status = ExportJobStatus.FAILED
+            job.error = "The export was interrupted"
+            job.finished_at = updated_at
+        return job
+
+    async def get_job(self, job_id: str) -> ExportJob:
+        """Load the current state of a job.
+
+        Raises:
+            ExportJobNotFound: If there is no such job
+        """
+        try:
+            return await asyncio.to_thread(self._load, self._state_path(job_id))
+        except FileNotFoundError:
+            raise ExportJobNotFound() from None
+
+    async def submit(
+        self, kind: ExportJobKind, year_id: int | None, engine: ExportEngine, filename: str
+    ) -> ExportJob:
+        """Queue an export and return immediately.
+
+        Args:
+            kind: What to export
+            year_id: Year to export, required for ``ExportJobKind.YEAR``
+            engine: How CSV rows are produced
+            filename: Name offered to the client when downloading the artifact
+
+        Returns:
+            The queued job
+
+        Raises:
+            ExportJobYearRequired: If a year export has no ``year_id``
+        """
+        if kind is ExportJobKind.YEAR and year_id is None:
+            raise ExportJobYearRequired()
+        if kind is ExportJobKind.USERS:
+            year_id = None
+
+        await asyncio.to_thread(self.directory.mkdir, parents=True, exist_ok=True)
+        await asyncio.to_thread(self._remove_expired)
+
+        job = ExportJob(
+            job_id=uuid.uuid4().hex,
+            kind=kind,
+            year_id=year_id,
+            engine=engine,
+            filename=filename,
+            created_at=datetime.now(tz=UTC),
+        )
+        await asyncio.to_thread(self._save, job)
+
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: ExportJob) -> None:
+        finished = asyncio.Event()
+        heartbeat = asyncio.create_task(self._save_until(job, finished))
+        status = ExportJobStatus.FAILED
+        error: str | None = "The export was interrupted"
+        try:
+            async with self._semaphore:
+                job.status = ExportJobStatus.RUNNING
+
+                def progress(rows: int) -> None:
+                    job.rows_processed += rows
+
+                artifact = self.artifact_path(job)
+                tmp_path = artifact.with_suffix(artifact.suffix + ".tmp")
+                try:
+                    file = await asyncio.to_thread(tmp_path.open, "wb")
+                    try:
+                        async for chunk in self._export(job, progress):
+                            await asyncio.to_thread(file.write, chunk)
+                    finally:
+                        await asyncio.to_thread(file.close)
+                    await asyncio.to_thread(tmp_path.replace, artifact)
+                    status, error = ExportJobStatus.DONE, None
+                except Exception as e:
+                    logger.exception(f"Export job {job.job_id} failed")
+                    await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+                    error = str(e)
+        finally:
+            finished.set()
+            await heartbeat
+            # Set after the progress writes stopped, so the final write is the only one with it
+            job.status, job.error = status, error
+            job.finished_at = datetime.now(tz=UTC)
+            await asyncio.to_thread(self._save, job)
+
+    async def _save_until(self, job: ExportJob, finished: asyncio.Event) -> None:
+        """Save the state of ``job`` periodically, showing its progress and that it is alive."""
+        while not finished.is_set():
+            with suppress(TimeoutError):
+                await asyncio.wait_for(finished.wait(), PROGRESS_SAVE_INTERVAL)
+            if not finished.is_set():
+                try:
+                    await asyncio.to_thread(self._save, job)
+                except OSError:
+                    logger.exception(f"Cannot save the state of export job {job.job_id}")
+
+    async def _export(self, job: ExportJob, progress: ProgressCallback) -> AsyncIterator[bytes]:
+        if job.year_id is not None:
+            async for chunk in self.export_service.stream_year_data(
+                job.year_id, job.engine, progress
+            ):
+                yield chunk
+        elif job.engine is ExportEngine.COPY:
+            async for chunk in self.export_service.stream_all_users_copy(progress):
+                yield chunk
+        else:
+            yield (await self.export_service.export_all_users(progress)).encode()
+
+    def _remove_expired(self) -> None:
+        """Delete jobs that finished, or were interrupted, more than ``retention`` seconds ago."""
+        now = datetime.now(tz=UTC)
+        for state_path in self.directory.glob("*.json"):
+            try:
+                job = self._load(state_path)
+            except (FileNotFoundError, ValueError):
+                continue
+            if job.finished_at and (now - job.finished_at).total_seconds() > self.retention:
+                self.artifact_path(job).unlink(missing_ok=True)
+                state_path.unlink(missing_ok=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import selectinload
 
 from volunteers.models import LegacyUser
@@ -15,3 +15,12 @@ class LegacyUserService(BaseService):
                 .options(selectinload(LegacyUser.new_user))
             )
             return result.scalar_one_or_none()
+
+    async def update_password(self, legacy_user_id: int, password_hash: str) -> None:
+        async with self.session_scope() as session:
+            await session.execute(
+                update(LegacyUser)
+                .where(LegacyUser.id == legacy_user_id)
+                .values(password=password_hash)
+            )
+            await session.commit()
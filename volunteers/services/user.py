@@ -1,13 +1,32 @@
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from volunteers.core.cache import TTLCache
+from volunteers.core.pubsub import PgPubSub
 from volunteers.models import ApplicationForm, User
 from volunteers.schemas.user import UserIn, UserUpdate
 
 from .base import BaseService
 
+# Pub/sub topic carrying ids of users whose cached copies are stale
+USER_CACHE_TOPIC = "user_cache"
+
 
 class UserService(BaseService):
+    def __init__(
+        self, cache: TTLCache[int, User] | None = None, pubsub: PgPubSub | None = None
+    ) -> None:
+        super().__init__()
+        self.cache = cache
+        self.pubsub = pubsub
+        if cache is not None and pubsub is not None:
+            pubsub.subscribe(
+                USER_CACHE_TOPIC,
+                lambda user_id: cache.invalidate(int(user_id)),
+                on_reconnect=cache.clear,
+            )
+
     async def get_user_by_telegram_id(self, telegram_id: int) -> User | None:
         async with self.session_scope() as session:
             result = await session.execute(select(User).where(User.telegram_id == telegram_id))
@@ -18,6 +37,31 @@ class UserService(BaseService):
             result = await session.execute(select(User).where(User.id == id))
             return result.scalar_one_or_none()
 
+    async def get_user_by_id_cached(self, id: int) -> User | None:
+        """Like ``get_user_by_id``, but served from the in-process cache when possible.
+
+        Meant for authentication, which runs on every request. The returned user is
+        detached and shared between requests, so it must not be modified.
+        """
+        if self.cache is None:
+            return await self.get_user_by_id(id)
+
+        async def load() -> User | None:
+            async with self.session_scope() as session:
+                user = (
+                    await session.execute(select(User).where(User.id == id))
+                ).scalar_one_or_none()
+                if user is not None:
+                    session.expunge(user)
+                return user
+
+        return await self.cache.get_or_load(id, load)
+
+    async def _invalidate_cached_user(self, session: AsyncSession, user_id: int) -> None:
+        """Drop ``user_id`` from the user caches of every process once ``session`` commits."""
+        if self.pubsub is not None:
+            await self.pubsub.publish(session, USER_CACHE_TOPIC, str(user_id))
+
     async def get_all_users(self) -> list[User]:
         async with self.session_scope() as session:
             result = await session.execute(select(User).order_by(User.id))
@@ -40,8 +84,12 @@ class UserService(BaseService):
         )
         async with self.session_scope() as session:
             session.add(user)
+            await session.flush()
+            await self._invalidate_cached_user(session, user.id)
             await session.commit()
-            return user
+        if self.cache is not None:
+            self.cache.invalidate(user.id)
+        return user
 
     async def update_user(self, user_id: int, user_update: UserUpdate) -> User | None:
         async with self.session_scope() as session:
@@ -75,8 +123,11 @@ class UserService(BaseService):
             if user_update.gender is not None:
                 user.gender = user_update.gender
 
+            await self._invalidate_cached_user(session, user_id)
             await session.commit()
-            return user
+        if self.cache is not None:
+            self.cache.invalidate(user_id)
+        return user
 
     async def get_users_with_registration_status(
         self, year_id: int
@@ -1,12 +1,45 @@
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
-
-import socketio  # type: ignore[import-untyped]
-from sqlalchemy import and_, delete, select
-from sqlalchemy.orm import selectinload
+from io import BytesIO
+from typing import Any
+
+import asyncpg  # type: ignore[import-untyped]
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    ColumnElement,
+    Identity,
+    Integer,
+    MetaData,
+    Table,
+    and_,
+    column,
+    delete,
+    exists,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    true,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.schema import CreateTable
 
 from volunteers.api.v1.admin.year.schemas import ExperienceItem
-from volunteers.bot.notify import Notifier
-from volunteers.core.experience import ATTENDANCE_MAP
+from volunteers.core.cache import TTLCache
+from volunteers.core.experience import (
+    ATTENDANCE_MAP,
+    forms_of_user_day,
+    refresh_user_year_experience,
+)
+from volunteers.core.outbox import ASSIGNMENT_EVENTS, NOTIFICATIONS, Outbox
+from volunteers.core.pubsub import PgPubSub
 from volunteers.models import (
     ApplicationForm,
     Assessment,
@@ -16,21 +49,25 @@ from volunteers.models import (
     Position,
     User,
     UserDay,
+    UserYearExperience,
     Year,
 )
 from volunteers.models.attendance import Attendance
 from volunteers.schemas.application_form import ApplicationFormIn
 from volunteers.schemas.assessment import AssessmentEditIn, AssessmentIn
 from volunteers.schemas.day import DayEditIn, DayIn
+from volunteers.schemas.day_assignment import AssignmentEvent, day_assignment_item
 from volunteers.schemas.hall import HallEditIn, HallIn
 from volunteers.schemas.position import PositionEditIn, PositionIn
 from volunteers.schemas.user_day import UserDayEditIn, UserDayIn
 from volunteers.schemas.year import YearEditIn, YearIn
-from volunteers.sockets.assignments import broadcast_assignment_update
 
 from .base import BaseService
 from .errors import DomainError, PositionAlreadyExists
 
+# Pub/sub topic carrying ids of users whose cached manager scopes are stale, or "" for all users
+MANAGER_CACHE_TOPIC = "manager_cache"
+
 
 class ApplicationFormNotFound(DomainError):
     """Application form not found"""
@@ -66,22 +103,145 @@ class HallNotFound(DomainError):
     """Hall not found"""
 
 
+class UserDayNotManaged(DomainError):
+    """User day on a day or hall the user does not manage"""
+
+
+class AssignmentImportInvalid(DomainError):
+    """Assignment import with malformed or inconsistent lines"""
+
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__("Invalid assignment import")
+        self.errors = errors
+
+
 @dataclass(frozen=True)
 class ManagerForYear:
     hall_id: int | None
     day_id: int
 
 
+@dataclass(frozen=True)
+class AssignmentImport:
+    """Outcome of an assignment import."""
+
+    created: int
+    updated: int
+    unchanged: int
+
+
+@dataclass(frozen=True)
+class ManagerScope:
+    """A day and hall of a year that a user has a manager assignment for."""
+
+    year_id: int
+    day_id: int
+    hall_id: int | None
+
+
+# Columns of an assignment import, after a header line
+IMPORT_COLUMNS = ["user_id", "day_id", "position_id", "hall_id"]
+# Invalid lines reported back to the admin, so that a wrong file does not flood the response
+MAX_IMPORT_ERRORS = 50
+
+# Staging table an assignment import is copied into, private to its transaction
+_import_staging = Table(
+    "assignment_import",
+    MetaData(),
+    Column("line", BigInteger, Identity(always=True)),
+    Column("user_id", BigInteger),
+    Column("day_id", Integer),
+    Column("position_id", Integer),
+    Column("hall_id", Integer),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def _managed_by(manager_id: int) -> ColumnElement[bool]:
+    """Whether a ``UserDay`` is on a day and hall the user has a manager assignment for."""
+    # Aliased, as queries of user days often join their own form and position
+    manager_day = aliased(UserDay)
+    manager_form = aliased(ApplicationForm)
+    manager_position = aliased(Position)
+    return exists().where(
+        manager_day.day_id == UserDay.day_id,
+        manager_day.hall_id.is_not_distinct_from(UserDay.hall_id),
+        manager_day.application_form_id == manager_form.id,
+        manager_day.position_id == manager_position.id,
+        manager_form.user_id == manager_id,
+        manager_position.is_manager.is_(True),
+    )
+
+
+def _import_error(row: Any) -> str:
+    """Describe the first problem of a checked import line."""
+    if row.form_found is None:
+        return f"user {row.user_id} has no application form for the year"
+    if row.day_found is None:
+        return f"day {row.day_id} is not a day of the year"
+    if row.position_found is None:
+        return f"position {row.position_id} is not a position of the year"
+    if row.hall_id is not None and row.hall_found is None:
+        return f"hall {row.hall_id} is not a hall of the year"
+    if row.hall_id is not None and not row.has_halls:
+        return f"position {row.position_id} has no halls"
+    return f"user {row.user_id} is assigned to day {row.day_id} more than once"
+
+
 class YearService(BaseService):
     def __init__(
         self,
-        notifier: Notifier,
-        socketio_server: socketio.AsyncServer,
+        outbox: Outbox | None = None,
+        manager_cache: TTLCache[int, frozenset[ManagerScope]] | None = None,
+        pubsub: PgPubSub | None = None,
     ) -> None:
-        self.notifier = notifier
-        self.socketio_server = socketio_server
+        # Notifications and socket events go through the outbox, in the transaction of the change
+        self.outbox = outbox or Outbox()
+        self.manager_cache = manager_cache
+        self.pubsub = pubsub
+        if manager_cache is not None and pubsub is not None:
+            pubsub.subscribe(
+                MANAGER_CACHE_TOPIC, self._drop_manager_scopes, on_reconnect=manager_cache.clear
+            )
         super().__init__()
 
+    def _drop_manager_scopes(self, user_id: str) -> None:
+        if self.manager_cache is None:
+            return
+        if user_id:
+            self.manager_cache.invalidate(int(user_id))
+        else:
+            self.manager_cache.clear()
+
+    async def _invalidate_manager_scopes(self, session: AsyncSession, user_id: int | None) -> None:
+        """Drop cached manager scopes of ``user_id``, or of everyone, in every process on commit."""
+        if self.pubsub is not None:
+            await self.pubsub.publish(
+                session, MANAGER_CACHE_TOPIC, "" if user_id is None else str(user_id)
+            )
+        else:
+            self._drop_manager_scopes("" if user_id is None else str(user_id))
+
+    async def _bump_assignment_version(
+        self, session: AsyncSession, day_id: int
+    ) -> tuple[int, bool]:
+        """Count a change to the assignments of a day, in the transaction of the change.
+
+        The row lock also orders concurrent changes of the day by their version.
+
+        Returns:
+            The new assignment_version and the assignment_published of the day
+        """
+        result = await session.execute(
+            update(Day)
+            .where(Day.id == day_id)
+            .values(assignment_version=Day.assignment_version + 1)
+            .returning(Day.assignment_version, Day.assignment_published)
+        )
+        version, published = result.one()
+        return version, published
+
     async def get_years(self) -> list[Year]:
         async with self.session_scope() as session:
             result = await session.execute(select(Year).order_by(Year.id))
@@ -163,7 +323,7 @@ class YearService(BaseService):
 
     async def get_all_forms_by_year_id(self, year_id: int) -> list[ApplicationForm]:
         """Get all application forms for a specific year with user and position data."""
-        async with self.session_scope() as session:
+        async with self.session_scope(read_only=True) as session:
             result = await session.execute(
                 select(ApplicationForm)
                 .where(ApplicationForm.year_id == year_id)
@@ -175,13 +335,23 @@ class YearService(BaseService):
             )
             return list(result.scalars().all())
 
-    async def get_all_assignments_by_year_id(self, year_id: int) -> list[UserDay]:
-        """Get all user day assignments for a specific year with related data."""
-        async with self.session_scope() as session:
+    async def get_all_assignments_by_year_id(
+        self, year_id: int, manager_id: int | None = None
+    ) -> list[UserDay]:
+        """Get all user day assignments for a specific year with related data.
+
+        Args:
+            year_id: The ID of the year
+            manager_id: If set, only the assignments on days and halls this user manages
+        """
+        async with self.session_scope(read_only=True) as session:
             result = await session.execute(
                 select(UserDay)
                 .join(ApplicationForm)
-                .where(ApplicationForm.year_id == year_id)
+                .where(
+                    ApplicationForm.year_id == year_id,
+                    true() if manager_id is None else _managed_by(manager_id),
+                )
                 .options(
                     selectinload(UserDay.application_form).selectinload(ApplicationForm.user),
                     selectinload(UserDay.day),
@@ -358,14 +528,27 @@ class YearService(BaseService):
             if (has_halls := position_edit_in.has_halls) is not None:
                 updated_position.has_halls = has_halls
             if (is_manager := position_edit_in.is_manager) is not None:
+                if updated_position.is_manager != is_manager:
+                    await self._invalidate_manager_scopes(session, None)
                 updated_position.is_manager = is_manager
+            score_changed = False
             if (score := position_edit_in.score) is not None:
+                score_changed = updated_position.score != score
                 updated_position.score = score
             if (save_flag := position_edit_in.save_for_next_year) is not None:
                 updated_position.save_for_next_year = save_flag
             if position_edit_in.description is not None:
                 updated_position.description = position_edit_in.description
 
+            if score_changed:
+                await refresh_user_year_experience(
+                    session,
+                    ApplicationForm.id.in_(
+                        select(UserDay.application_form_id).where(
+                            UserDay.position_id == position_id
+                        )
+                    ),
+                )
             await session.commit()
             self.logger.info(f"Position {position_id} updated successfully")
 
@@ -380,6 +563,11 @@ class YearService(BaseService):
         )
         async with self.session_scope() as session:
             session.add(created_day)
+            if created_day.mandatory:
+                # Changes the number of mandatory days for everyone in the year
+                await refresh_user_year_experience(
+                    session, ApplicationForm.year_id == created_day.year_id
+                )
             await session.commit()
         return created_day
 
@@ -392,6 +580,8 @@ class YearService(BaseService):
                 raise DayNotFound()
 
             old_assignment_published = updated_day.assignment_published
+            old_score = updated_day.score
+            old_mandatory = updated_day.mandatory
 
             if (name := day_edit_in.name) is not None:
                 updated_day.name = name
@@ -404,19 +594,24 @@ class YearService(BaseService):
             if (assignment_published := day_edit_in.assignment_published) is not None:
                 updated_day.assignment_published = assignment_published
 
-            await session.commit()
+            if old_score != updated_day.score or old_mandatory != updated_day.mandatory:
+                await refresh_user_year_experience(
+                    session, ApplicationForm.year_id == updated_day.year_id
+                )
 
             # Broadcast if assignment_published status changed
             if (
                 day_edit_in.assignment_published is not None
                 and old_assignment_published != day_edit_in.assignment_published
             ):
-                await broadcast_assignment_update(
-                    self.socketio_server,
-                    day_id,
-                    "published" if day_edit_in.assignment_published else "unpublished",
-                    None,
+                event = AssignmentEvent(
+                    day_id=day_id,
+                    type="published" if day_edit_in.assignment_published else "unpublished",
+                    version=updated_day.assignment_version,
+                    published=day_edit_in.assignment_published,
                 )
+                await self.outbox.add(session, ASSIGNMENT_EVENTS, event.dump())
+            await session.commit()
 
     async def add_user_day(self, user_day_in: UserDayIn, author: User) -> UserDay:
         created_user_day = UserDay(
@@ -429,23 +624,33 @@ class YearService(BaseService):
         )
         async with self.session_scope() as session:
             session.add(created_user_day)
-            await session.commit()
+            await refresh_user_year_experience(
+                session, ApplicationForm.id == user_day_in.application_form_id
+            )
+            version, published = await self._bump_assignment_version(session, user_day_in.day_id)
             day = await created_user_day.awaitable_attrs.day
             application_form = await created_user_day.awaitable_attrs.application_form
             user = await application_form.awaitable_attrs.user
             position = await created_user_day.awaitable_attrs.position
             hall = await created_user_day.awaitable_attrs.hall
-            await self.notifier.notify(
-                f"[{day.name}] {user.first_name_ru} {user.last_name_ru} (@{user.telegram_username}) \n(unassigned) -> {position.name} {hall.name if hall else ''}\n(by @{author.telegram_username})"
+            if position.is_manager:
+                await self._invalidate_manager_scopes(session, user.id)
+            await self.outbox.add(
+                session,
+                NOTIFICATIONS,
+                f"[{day.name}] {user.first_name_ru} {user.last_name_ru} (@{user.telegram_username}) \n(unassigned) -> {position.name} {hall.name if hall else ''}\n(by @{author.telegram_username})",
             )
 
             # Broadcast assignment update via WebSocket
-            await broadcast_assignment_update(
-                self.socketio_server,
-                user_day_in.day_id,
-                "created",
-                {"user_day_id": created_user_day.id},
+            event = AssignmentEvent(
+                day_id=user_day_in.day_id,
+                type="created",
+                version=version,
+                published=published,
+                assignments=[day_assignment_item(created_user_day)],
             )
+            await self.outbox.add(session, ASSIGNMENT_EVENTS, event.dump())
+            await session.commit()
         return created_user_day
 
     async def edit_user_day_by_user_day_id(
@@ -482,23 +687,35 @@ class YearService(BaseService):
                 updated_user_day.attendance = attendance
             updated_user_day.position = new_position
             updated_user_day.hall = new_hall
-            await session.commit()
+            await refresh_user_year_experience(
+                session, ApplicationForm.id == updated_user_day.application_form_id
+            )
+            version, published = await self._bump_assignment_version(
+                session, updated_user_day.day_id
+            )
 
             day = await updated_user_day.awaitable_attrs.day
             application_form = await updated_user_day.awaitable_attrs.application_form
             user = await application_form.awaitable_attrs.user
+            if old_position.is_manager or new_position.is_manager:
+                await self._invalidate_manager_scopes(session, user.id)
 
-            await self.notifier.notify(
-                f"[{day.name}] {user.first_name_ru} {user.last_name_ru} (@{user.telegram_username})\n{old_position.name} {old_hall.name if old_hall else ''} -> {new_position.name} {new_hall.name if new_hall else ''}\n(by @{author.telegram_username})"
+            await self.outbox.add(
+                session,
+                NOTIFICATIONS,
+                f"[{day.name}] {user.first_name_ru} {user.last_name_ru} (@{user.telegram_username})\n{old_position.name} {old_hall.name if old_hall else ''} -> {new_position.name} {new_hall.name if new_hall else ''}\n(by @{author.telegram_username})",
             )
 
             # Broadcast assignment update via WebSocket
-            await broadcast_assignment_update(
-                self.socketio_server,
-                day.id,
-                "updated",
-                {"user_day_id": updated_user_day.id},
+            event = AssignmentEvent(
+                day_id=day.id,
+                type="updated",
+                version=version,
+                published=published,
+                assignments=[day_assignment_item(updated_user_day)],
             )
+            await self.outbox.add(session, ASSIGNMENT_EVENTS, event.dump())
+            await session.commit()
 
     async def delete_user_day_by_user_day_id(self, user_day_id: int, author: User) -> None:
         """Delete a user day by its ID."""
@@ -511,135 +728,338 @@ class YearService(BaseService):
                 raise UserDayNotFound()
 
             day_id = user_day.day_id
-
-            await session.delete(user_day)
-            await session.commit()
-
+            # Loaded before the user day is deleted, for the notification
             day = await user_day.awaitable_attrs.day
             application_form = await user_day.awaitable_attrs.application_form
             user = await application_form.awaitable_attrs.user
             position = await user_day.awaitable_attrs.position
             hall = await user_day.awaitable_attrs.hall
-            await self.notifier.notify(
-                f"[{day.name}] {user.first_name_ru} {user.last_name_ru} (@{user.telegram_username})\n{position.name} {hall.name if hall else ''} -> (unassigned)\n(by @{author.telegram_username})"
+
+            await session.delete(user_day)
+            await refresh_user_year_experience(
+                session, ApplicationForm.id == user_day.application_form_id
+            )
+            if position.is_manager:
+                await self._invalidate_manager_scopes(session, user.id)
+            version, published = await self._bump_assignment_version(session, day_id)
+            await self.outbox.add(
+                session,
+                NOTIFICATIONS,
+                f"[{day.name}] {user.first_name_ru} {user.last_name_ru} (@{user.telegram_username})\n{position.name} {hall.name if hall else ''} -> (unassigned)\n(by @{author.telegram_username})",
             )
 
             # Broadcast assignment update via WebSocket
-            await broadcast_assignment_update(
-                self.socketio_server,
-                day_id,
-                "deleted",
-                {"user_day_id": user_day_id},
+            event = AssignmentEvent(
+                day_id=day_id,
+                type="deleted",
+                version=version,
+                published=published,
+                deleted=[user_day_id],
             )
+            await self.outbox.add(session, ASSIGNMENT_EVENTS, event.dump())
+            await session.commit()
 
     async def copy_assignments_from_day(
         self,
         source_day_id: int,
-        target_day_id: int,
+        target_day_ids: Sequence[int],
         overwrite_existing: bool = False,
         replace_all: bool = False,
     ) -> int:
-        """Copy all assignments from source day to target day.
+        """Copy all assignments from source day to each of the target days, in one transaction.
+
+        Assignments are copied by a single ``INSERT ... SELECT``; an assignment of a user
+        who is already assigned on a target day is skipped, or overwritten in place.
 
         Args:
             source_day_id: The ID of the day to copy assignments from
-            target_day_id: The ID of the day to copy assignments to
+            target_day_ids: The IDs of the days to copy assignments to; the source day is skipped
             overwrite_existing: If True, overwrite existing assignments for users who already have assignments on target day
             replace_all: If True, delete all existing assignments on target day before copying (overrides overwrite_existing)
 
         Returns:
-            The number of assignments copied
+            The number of assignments created or overwritten on all target days
+
+        Raises:
+            DayNotFound: If the source day or any of the target days does not exist
         """
+        target_day_ids = sorted(set(target_day_ids) - {source_day_id})
         async with self.session_scope() as session:
-            # Verify both days exist
-            source_day = await session.execute(select(Day).where(Day.id == source_day_id))
-            source_day_obj = source_day.scalar_one_or_none()
-            if not source_day_obj:
+            source_day = await session.execute(select(Day.id).where(Day.id == source_day_id))
+            if source_day.scalar_one_or_none() is None:
                 raise DayNotFound()
-
-            target_day = await session.execute(select(Day).where(Day.id == target_day_id))
-            target_day_obj = target_day.scalar_one_or_none()
-            if not target_day_obj:
+            # Locked in order, so that concurrent copies to overlapping days do not deadlock
+            target_days = await session.execute(
+                select(Day.id, Day.year_id)
+                .where(Day.id.in_(target_day_ids))
+                .order_by(Day.id)
+                .with_for_update()
+            )
+            year_ids = dict(target_days.tuples().all())
+            if len(year_ids) < len(target_day_ids):
                 raise DayNotFound()
 
-            # Get all assignments from source day
-            source_assignments = await session.execute(
-                select(UserDay)
+            deleted_ids: defaultdict[int, list[int]] = defaultdict(list)
+            if replace_all:
+                replaced = select(UserDay.id).where(UserDay.day_id.in_(target_day_ids))
+                await session.execute(
+                    delete(Assessment).where(Assessment.user_day_id.in_(replaced))
+                )
+                deleted = await session.execute(
+                    delete(UserDay)
+                    .where(UserDay.day_id.in_(target_day_ids))
+                    .returning(UserDay.id, UserDay.day_id)
+                    .execution_options(synchronize_session=False)
+                )
+                for user_day_id, day_id in deleted.tuples():
+                    deleted_ids[day_id].append(user_day_id)
+
+            targets = values(column("day_id", Integer), name="targets").data(
+                [(day_id,) for day_id in target_day_ids]
+            )
+            copied_columns = ["information", "attendance", "position_id", "hall_id"]
+            source_assignments = (
+                select(
+                    UserDay.application_form_id,
+                    targets.c.day_id,
+                    UserDay.information,
+                    UserDay.attendance,
+                    UserDay.position_id,
+                    UserDay.hall_id,
+                )
+                .join(targets, true())
                 .where(UserDay.day_id == source_day_id)
+            )
+            stmt = insert(UserDay).from_select(
+                ["application_form_id", "day_id", *copied_columns], source_assignments
+            )
+            if overwrite_existing:
+                stmt = stmt.on_conflict_do_update(
+                    constraint="uq_user_day_application_form_day",
+                    set_={
+                        **{name: stmt.excluded[name] for name in copied_columns},
+                        "updated_at": func.now(),
+                    },
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(constraint="uq_user_day_application_form_day")
+            copied = await session.execute(stmt.returning(UserDay.id))
+            copied_ids = list(copied.scalars())
+
+            if not (copied_ids or deleted_ids):
+                # Releases the day locks, which a request's shared session would keep
+                await session.rollback()
+                return 0
+            await refresh_user_year_experience(
+                session, ApplicationForm.year_id.in_(set(year_ids.values()))
+            )
+            # Copies can add and remove manager assignments of many users
+            await self._invalidate_manager_scopes(session, None)
+
+            # Broadcast bulk assignment updates via WebSocket, one per changed day
+            result = await session.execute(
+                select(UserDay)
+                .where(UserDay.id.in_(copied_ids))
                 .options(
-                    selectinload(UserDay.application_form),
+                    selectinload(UserDay.application_form).selectinload(ApplicationForm.user),
                     selectinload(UserDay.position),
                     selectinload(UserDay.hall),
                 )
             )
-            source_assignments_list = list(source_assignments.scalars().all())
+            assignments: defaultdict[int, list[UserDay]] = defaultdict(list)
+            for assignment in result.scalars():
+                assignments[assignment.day_id].append(assignment)
+            for day_id in sorted(assignments.keys() | deleted_ids.keys()):
+                version, published = await self._bump_assignment_version(session, day_id)
+                event = AssignmentEvent(
+                    day_id=day_id,
+                    type="bulk_created",
+                    version=version,
+                    published=published,
+                    assignments=[day_assignment_item(a) for a in assignments[day_id]],
+                    deleted=deleted_ids[day_id],
+                )
+                await self.outbox.add(session, ASSIGNMENT_EVENTS, event.dump())
+            await session.commit()
 
-            # Get existing assignments for target day
-            existing_assignments = await session.execute(
-                select(UserDay).where(UserDay.day_id == target_day_id)
-            )
-            existing_assignments_list = list(existing_assignments.scalars().all())
+            return len(copied_ids)
 
-            # If replace_all is True, delete all existing assignments first
-            if replace_all:
-                for existing_assignment in existing_assignments_list:
-                    await session.delete(existing_assignment)
-                existing_assignments_list = []
-                existing_application_form_ids: set[int] = set()
-            else:
-                existing_application_form_ids = {
-                    assignment.application_form_id for assignment in existing_assignments_list
-                }
+    async def import_assignments(self, year_id: int, data: bytes, author: User) -> AssignmentImport:
+        """Assign volunteers to days of a year from a CSV file, in one transaction.
 
-            if not source_assignments_list:
-                await session.commit()
-                return 0
+        The file has a header line and ``user_id,day_id,position_id,hall_id`` lines, with
+        an empty hall for positions without halls. It is copied into a staging table
+        with ``COPY``, checked with joins against the year, and upserted into user days
+        by one statement: a user already assigned to a day gets the new position and
+        hall. Admins get one summary notification and clients one event per changed day.
 
-            copied_count = 0
-
-            for source_assignment in source_assignments_list:
-                # Check if user already has an assignment on target day
-                if source_assignment.application_form_id in existing_application_form_ids:
-                    if overwrite_existing:
-                        # Delete existing assignment
-                        existing_assignment_to_delete = next(
-                            (
-                                a
-                                for a in existing_assignments_list
-                                if a.application_form_id == source_assignment.application_form_id
-                            ),
-                            None,
-                        )
-                        if existing_assignment_to_delete is not None:
-                            await session.delete(existing_assignment_to_delete)
-                    else:
-                        # Skip this assignment
-                        continue
-
-                # Create new assignment for target day
-                new_assignment = UserDay(
-                    application_form_id=source_assignment.application_form_id,
-                    day_id=target_day_id,
-                    information=source_assignment.information,
-                    attendance=source_assignment.attendance,
-                    position_id=source_assignment.position_id,
-                    hall_id=source_assignment.hall_id,
-                )
-                session.add(new_assignment)
-                copied_count += 1
+        Raises:
+            YearNotFound: If the year does not exist
+            AssignmentImportInvalid: If the file is malformed or any line does not fit the year
+        """
+        staging = _import_staging.c
+        async with self.session_scope() as session:
+            if await session.get(Year, year_id) is None:
+                raise YearNotFound()
+            await session.execute(CreateTable(_import_staging))
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            driver_connection: Any = raw_connection.driver_connection
+            try:
+                await driver_connection.copy_to_table(
+                    _import_staging.name,
+                    source=BytesIO(data),
+                    columns=IMPORT_COLUMNS,
+                    format="csv",
+                    header=True,
+                )
+            except asyncpg.DataError as e:
+                context = f" ({e.context})" if getattr(e, "context", None) else ""
+                raise AssignmentImportInvalid([f"{e}{context}"]) from e
+
+            checked = (
+                select(
+                    staging.line,
+                    staging.user_id,
+                    staging.day_id,
+                    staging.position_id,
+                    staging.hall_id,
+                    ApplicationForm.id.label("form_found"),
+                    Day.id.label("day_found"),
+                    Position.id.label("position_found"),
+                    Position.has_halls,
+                    Hall.id.label("hall_found"),
+                    func.count()
+                    .over(partition_by=[staging.user_id, staging.day_id])
+                    .label("assignments"),
+                )
+                .select_from(_import_staging)
+                .outerjoin(
+                    ApplicationForm,
+                    and_(
+                        ApplicationForm.user_id == staging.user_id,
+                        ApplicationForm.year_id == year_id,
+                    ),
+                )
+                .outerjoin(Day, and_(Day.id == staging.day_id, Day.year_id == year_id))
+                .outerjoin(
+                    Position, and_(Position.id == staging.position_id, Position.year_id == year_id)
+                )
+                .outerjoin(Hall, and_(Hall.id == staging.hall_id, Hall.year_id == year_id))
+                .subquery()
+            )
+            invalid = await session.execute(
+                select(checked)
+                .where(
+                    or_(
+                        checked.c.form_found.is_(None),
+                        checked.c.day_found.is_(None),
+                        checked.c.position_found.is_(None),
+                        and_(checked.c.hall_id.is_not(None), checked.c.hall_found.is_(None)),
+                        and_(checked.c.hall_id.is_not(None), checked.c.has_halls.is_(False)),
+                        checked.c.assignments > 1,
+                    )
+                )
+                .order_by(checked.c.line)
+                .limit(MAX_IMPORT_ERRORS)
+            )
+            errors = [
+                # The header is the first line of the file
+                f"Line {row.line + 1}: {_import_error(row)}"
+                for row in invalid
+            ]
+            if errors:
+                raise AssignmentImportInvalid(errors)
+
+            lines = await session.scalar(select(func.count()).select_from(_import_staging))
+            assignments = select(
+                ApplicationForm.id,
+                staging.day_id,
+                literal(""),
+                literal(Attendance.UNKNOWN, UserDay.attendance.type),
+                staging.position_id,
+                staging.hall_id,
+            ).join(
+                ApplicationForm,
+                and_(
+                    ApplicationForm.user_id == staging.user_id, ApplicationForm.year_id == year_id
+                ),
+            )
+            stmt = insert(UserDay).from_select(
+                [
+                    "application_form_id",
+                    "day_id",
+                    "information",
+                    "attendance",
+                    "position_id",
+                    "hall_id",
+                ],
+                assignments,
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_user_day_application_form_day",
+                set_={
+                    "position_id": stmt.excluded.position_id,
+                    "hall_id": stmt.excluded.hall_id,
+                    "updated_at": func.now(),
+                },
+                # Assignments the file repeats unchanged keep their row and version
+                where=or_(
+                    UserDay.position_id != stmt.excluded.position_id,
+                    UserDay.hall_id.is_distinct_from(stmt.excluded.hall_id),
+                ),
+            )
+            # xmax is zero only for rows inserted rather than updated by the statement
+            result = await session.execute(
+                stmt.returning(UserDay.id, UserDay.application_form_id, literal_column("xmax") == 0)
+            )
+            changed = result.tuples().all()
+            created = sum(1 for _, _, inserted in changed if inserted)
+            outcome = AssignmentImport(
+                created=created,
+                updated=len(changed) - created,
+                unchanged=(lines or 0) - len(changed),
+            )
+            if not changed:
+                return outcome
 
-            await session.commit()
+            await refresh_user_year_experience(
+                session, ApplicationForm.id.in_({form_id for _, form_id, _ in changed})
+            )
+            # Imports can add and remove manager assignments of many users
+            await self._invalidate_manager_scopes(session, None)
 
-            # Broadcast bulk assignment update via WebSocket
-            if copied_count > 0:
-                await broadcast_assignment_update(
-                    self.socketio_server,
-                    target_day_id,
-                    "bulk_created",
-                    {"count": copied_count},
+            loaded = await session.execute(
+                select(UserDay)
+                .where(UserDay.id.in_([user_day_id for user_day_id, _, _ in changed]))
+                .options(
+                    selectinload(UserDay.application_form).selectinload(ApplicationForm.user),
+                    selectinload(UserDay.day),
+                    selectinload(UserDay.position),
+                    selectinload(UserDay.hall),
                 )
-
-            return copied_count
+            )
+            by_day: defaultdict[int, list[UserDay]] = defaultdict(list)
+            for user_day in loaded.scalars():
+                by_day[user_day.day_id].append(user_day)
+            day_names = ", ".join(by_day[day_id][0].day.name for day_id in sorted(by_day))
+            await self.outbox.add(
+                session,
+                NOTIFICATIONS,
+                f"[{day_names}] Imported {outcome.created} new and {outcome.updated} changed assignments\n(by @{author.telegram_username})",
+            )
+            for day_id in sorted(by_day):
+                version, published = await self._bump_assignment_version(session, day_id)
+                event = AssignmentEvent(
+                    day_id=day_id,
+                    type="bulk_created",
+                    version=version,
+                    published=published,
+                    assignments=[day_assignment_item(a) for a in by_day[day_id]],
+                )
+                await self.outbox.add(session, ASSIGNMENT_EVENTS, event.dump())
+            await session.commit()
+            return outcome
 
     async def add_assessment(self, assessment_in: AssessmentIn) -> Assessment:
         created_assessment = Assessment(
@@ -649,6 +1069,9 @@ class YearService(BaseService):
         )
         async with self.session_scope() as session:
             session.add(created_assessment)
+            await refresh_user_year_experience(
+                session, forms_of_user_day(assessment_in.user_day_id)
+            )
             await session.commit()
             await session.refresh(created_assessment)
         return created_assessment
@@ -669,6 +1092,9 @@ class YearService(BaseService):
                 updated_assessment.comment = comment
             if (value := assessment_edit_in.value) is not None:
                 updated_assessment.value = value
+                await refresh_user_year_experience(
+                    session, forms_of_user_day(updated_assessment.user_day_id)
+                )
 
             await session.commit()
 
@@ -681,6 +1107,48 @@ class YearService(BaseService):
                 raise UserDayNotFound()
 
             user_day_obj.attendance = attendance
+            await refresh_user_year_experience(
+                session, ApplicationForm.id == user_day_obj.application_form_id
+            )
+            await session.commit()
+
+    async def update_user_days_attendance(
+        self, attendance: Mapping[int, Attendance], manager_id: int | None = None
+    ) -> None:
+        """Update attendance for several user days with one permission check and one update.
+
+        Args:
+            attendance: New attendance by user day ID
+            manager_id: If set, every user day must be on a day and hall this user manages
+
+        Raises:
+            UserDayNotFound: If any of the user days does not exist
+            UserDayNotManaged: If ``manager_id`` does not manage any of the user days
+        """
+        if not attendance:
+            return
+        async with self.session_scope() as session:
+            managed = true() if manager_id is None else _managed_by(manager_id)
+            result = await session.execute(
+                select(UserDay.id, managed).where(UserDay.id.in_(attendance))
+            )
+            allowed = dict(result.tuples().all())
+            if len(allowed) < len(attendance):
+                raise UserDayNotFound()
+            if not all(allowed.values()):
+                raise UserDayNotManaged()
+
+            new = values(
+                column("id", Integer), column("attendance", UserDay.attendance.type), name="new"
+            ).data(list(attendance.items()))
+            form_ids = await session.scalars(
+                update(UserDay)
+                .where(UserDay.id == new.c.id)
+                .values(attendance=new.c.attendance)
+                .returning(UserDay.application_form_id)
+                .execution_options(synchronize_session=False)
+            )
+            await refresh_user_year_experience(session, ApplicationForm.id.in_(set(form_ids)))
             await session.commit()
 
     async def create_form(self, form: ApplicationFormIn) -> None:
@@ -702,6 +1170,7 @@ class YearService(BaseService):
                     year_id=form.year_id,
                 )
                 session.add(association)
+            await refresh_user_year_experience(session, ApplicationForm.id == created_form.id)
             await session.commit()
 
     async def update_form(self, form: ApplicationFormIn) -> None:
@@ -743,39 +1212,35 @@ class YearService(BaseService):
 
     async def manager_for_years(self, user_id: int) -> set[int]:
         """A user is a manager for a year if they have at least one manager assignment for this year."""
-        async with self.session_scope() as session:
-            user_days = await session.scalars(
-                select(UserDay)
-                .join(ApplicationForm)
-                .join(Position)
-                .options(selectinload(UserDay.application_form))
-                .where(
-                    and_(
-                        ApplicationForm.user_id == user_id,
-                        Position.is_manager.is_(True),
-                    )
-                )
-            )
-            return {user_day.application_form.year_id for user_day in user_days}
+        return {scope.year_id for scope in await self.manager_scopes(user_id)}
 
     async def manager_for_year(self, user_id: int, year_id: int) -> set[ManagerForYear]:
         """Gett all days and halls that the user is manager for in a year."""
-        async with self.session_scope() as session:
-            result = await session.execute(
-                select(UserDay)
-                .join(ApplicationForm)
-                .join(Position)
-                .where(
-                    and_(
-                        ApplicationForm.user_id == user_id,
-                        ApplicationForm.year_id == year_id,
-                        Position.is_manager.is_(True),
-                    )
+        return {
+            ManagerForYear(hall_id=scope.hall_id, day_id=scope.day_id)
+            for scope in await self.manager_scopes(user_id)
+            if scope.year_id == year_id
+        }
+
+    async def manager_scopes(self, user_id: int) -> frozenset[ManagerScope]:
+        """All days and halls the user is manager for, served from the cache when possible."""
+
+        async def load() -> frozenset[ManagerScope]:
+            # From the primary, as a lagging replica could cache revoked scopes until the TTL
+            async with self.session_scope() as session:
+                result = await session.execute(
+                    select(ApplicationForm.year_id, UserDay.day_id, UserDay.hall_id)
+                    .join(ApplicationForm)
+                    .join(Position)
+                    .where(ApplicationForm.user_id == user_id, Position.is_manager.is_(True))
                 )
-            )
-            return {
-                ManagerForYear(hall_id=res.hall_id, day_id=res.day_id) for res in result.scalars()
-            }
+                return frozenset(ManagerScope(*row) for row in result.tuples())
+
+        if self.manager_cache is None:
+            return await load()
+        # Users without manager assignments are cached too, as an empty set
+        scopes = await self.manager_cache.get_or_load(user_id, load)
+        return scopes if scopes is not None else frozenset()
 
     async def get_user_day_by_id(self, user_day_id: int) -> UserDay | None:
         """Get a user day by ID with all relationships loaded."""
@@ -795,52 +1260,81 @@ class YearService(BaseService):
 
     async def get_user_experience(self, user_id: int) -> list[ExperienceItem]:
         """Get prior experience data for a user across all years."""
-        async with self.session_scope() as session:
-            # Get all user days for this user with related data
-            result = await session.execute(
-                select(UserDay)
-                .join(ApplicationForm)
-                .where(ApplicationForm.user_id == user_id)
-                .options(
-                    selectinload(UserDay.application_form).selectinload(ApplicationForm.year),
-                    selectinload(UserDay.position),
-                    selectinload(UserDay.assessments),
-                )
-                .order_by(ApplicationForm.year_id)
-            )
-            user_days = list(result.scalars().all())
+        return (await self.get_users_experience([user_id])).get(user_id, [])
 
-            # Group by year and build experience list directly
-            experience_by_year: dict[int, ExperienceItem] = {}
+    async def get_users_experience(
+        self, user_ids: Sequence[int]
+    ) -> dict[int, list[ExperienceItem]]:
+        """Get prior experience data for several users across all years.
 
-            for user_day in user_days:
-                year_id = user_day.application_form.year_id
-                year_name = user_day.application_form.year.year_name
+        Loads user days and assessments with two queries regardless of the number of users.
 
-                if year_id not in experience_by_year:
-                    experience_by_year[year_id] = ExperienceItem(
-                        year_name=year_name,
-                        positions=[],
-                        attendance_stats={},
-                        assessments=[],
-                    )
+        Args:
+            user_ids: IDs of the users
+
+        Returns:
+            Experience items ordered by year for every user that has at least one user day
+        """
+        if not user_ids:
+            return {}
+        async with self.session_scope(read_only=True) as session:
+            user_days_result = await session.execute(
+                select(
+                    UserDay.id,
+                    ApplicationForm.user_id,
+                    ApplicationForm.year_id,
+                    Year.year_name,
+                    Position.name,
+                    UserDay.attendance,
+                )
+                .join(ApplicationForm, UserDay.application_form_id == ApplicationForm.id)
+                .join(Year, ApplicationForm.year_id == Year.id)
+                .join(Position, UserDay.position_id == Position.id)
+                .where(ApplicationForm.user_id.in_(user_ids))
+                .order_by(ApplicationForm.year_id, UserDay.id)
+            )
+            user_days = user_days_result.tuples().all()
 
-                # Add position if not already present
-                if user_day.position.name not in experience_by_year[year_id].positions:
-                    experience_by_year[year_id].positions.append(user_day.position.name)
+            assessments_result = await session.execute(
+                select(Assessment.user_day_id, Assessment.value, Assessment.comment)
+                .join(UserDay, Assessment.user_day_id == UserDay.id)
+                .join(ApplicationForm, UserDay.application_form_id == ApplicationForm.id)
+                .where(ApplicationForm.user_id.in_(user_ids))
+                .order_by(Assessment.id)
+            )
+            assessments_by_user_day: dict[int, list[str]] = {}
+            for user_day_id, value, comment in assessments_result.tuples():
+                assessments_by_user_day.setdefault(user_day_id, []).append(
+                    str(value) + ": " + comment
+                )
 
-                # Increment attendance count
-                experience_by_year[year_id].attendance_stats[user_day.attendance] = (
-                    experience_by_year[year_id].attendance_stats.get(user_day.attendance, 0) + 1
+        # Group by user and year and build experience lists directly
+        experience_by_user: dict[int, dict[int, ExperienceItem]] = {}
+        for user_day_id, user_id, year_id, year_name, position_name, attendance in user_days:
+            experience_by_year = experience_by_user.setdefault(user_id, {})
+            if year_id not in experience_by_year:
+                experience_by_year[year_id] = ExperienceItem(
+                    year_name=year_name,
+                    positions=[],
+                    attendance_stats={},
+                    assessments=[],
                 )
+            item = experience_by_year[year_id]
 
-                # Add assessment comments
-                for assessment in user_day.assessments:
-                    experience_by_year[year_id].assessments.append(
-                        str(assessment.value) + ": " + assessment.comment
-                    )
+            # Add position if not already present
+            if position_name not in item.positions:
+                item.positions.append(position_name)
+
+            # Increment attendance count
+            item.attendance_stats[attendance] = item.attendance_stats.get(attendance, 0) + 1
+
+            # Add assessment comments
+            item.assessments.extend(assessments_by_user_day.get(user_day_id, []))
 
-            return list(experience_by_year.values())
+        return {
+            user_id: list(experience_by_year.values())
+            for user_id, experience_by_year in experience_by_user.items()
+        }
 
     async def calculate_year_experience(self, year_id: int, user_id: int) -> float:
         """Calculate experience for a user in a specific year.
@@ -927,10 +1421,10 @@ class YearService(BaseService):
 
         Returns list of tuples: (application_form, total_assessments_sum, calculated_experience)
 
-        Experience is calculated dynamically by summing experience from all previous years
-        (compared by year_id) plus current year experience.
+        Experience is the sum of experience from all previous years (compared by year_id)
+        plus current year experience, read from the ``user_year_experience`` table.
         """
-        async with self.session_scope() as session:
+        async with self.session_scope(read_only=True) as session:
             # Get all application forms for this year with user and user_days data
             result = await session.execute(
                 select(ApplicationForm)
@@ -944,7 +1438,23 @@ class YearService(BaseService):
             )
             forms = list(result.scalars().all())
 
-            # Calculate total assessments sum and experience for each form
+            # Sum stored experience from all previous years (by year_id) + current year
+            experience_result = await session.execute(
+                select(UserYearExperience.user_id, func.sum(UserYearExperience.experience))
+                .where(
+                    and_(
+                        UserYearExperience.year_id <= year_id,
+                        UserYearExperience.user_id.in_(
+                            select(ApplicationForm.user_id).where(
+                                ApplicationForm.year_id == year_id
+                            )
+                        ),
+                    )
+                )
+                .group_by(UserYearExperience.user_id)
+            )
+            experience_by_user: dict[int, float] = dict(experience_result.tuples().all())
+
             results: list[tuple[ApplicationForm, float, float]] = []
             for form in forms:
                 total_assessments = sum(
@@ -952,34 +1462,6 @@ class YearService(BaseService):
                     for user_day in form.user_days
                     for assessment in user_day.assessments
                 )
-
-                # Calculate experience dynamically:
-                # Sum experience from all previous years (by year_id) + current year
-                previous_experience = 0.0
-
-                # Get all application forms for this user in previous years (year_id < current)
-                prev_forms_result = await session.execute(
-                    select(ApplicationForm)
-                    .where(
-                        and_(
-                            ApplicationForm.user_id == form.user_id,
-                            ApplicationForm.year_id < year_id,
-                        )
-                    )
-                    .order_by(ApplicationForm.year_id)
-                )
-                prev_forms = list(prev_forms_result.scalars().all())
-
-                # Calculate experience for each previous year
-                for prev_form in prev_forms:
-                    prev_year_exp = await self.calculate_year_experience(
-                        prev_form.year_id, form.user_id
-                    )
-                    previous_experience += prev_year_exp
-
-                # Calculate current year exp
-                current_year_exp = await self.calculate_year_experience(year_id, form.user_id)
-
-                results.append((form, total_assessments, previous_experience + current_year_exp))
+                results.append((form, total_assessments, experience_by_user.get(form.user_id, 0.0)))
 
             return results
@@ -1,5 +1,13 @@
 """WebSocket handlers package."""
 
-from .assignments import broadcast_assignment_update, register_assignment_handlers
+from .assignments import (
+    AssignmentBroadcaster,
+    AssignmentHistory,
+    register_assignment_handlers,
+)
 
-__all__ = ["broadcast_assignment_update", "register_assignment_handlers"]
+__all__ = [
+    "AssignmentBroadcaster",
+    "AssignmentHistory",
+    "register_assignment_handlers",
+]
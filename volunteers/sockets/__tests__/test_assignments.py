@@ -0,0 +1,323 @@
+import asyncio
+import json
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import socketio  # type: ignore[import-untyped]
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from volunteers.conftest import seed_year
+from volunteers.core.outbox import ASSIGNMENT_EVENTS, NOTIFICATIONS, OutboxDispatcher
+from volunteers.core.pubsub import PgPubSub
+from volunteers.core.socketio import PgPubSubManager
+from volunteers.models import Day, Hall, Position, UserDay
+from volunteers.schemas.day import DayEditIn
+from volunteers.schemas.day_assignment import AssignmentEvent, DayAssignmentItem
+from volunteers.schemas.user_day import UserDayEditIn, UserDayIn
+from volunteers.services.year import YearService
+from volunteers.sockets.assignments import (
+    AssignmentBroadcaster,
+    AssignmentHistory,
+    refetch_event,
+)
+
+ADMIN_ROOM = "day_assignments_1_admin"
+PUBLIC_ROOM = "day_assignments_1"
+
+
+def make_sio() -> MagicMock:
+    sio = MagicMock()
+    sio.emit = AsyncMock()
+    return sio
+
+
+def item(user_day_id: int, position: str = "Cloakroom") -> DayAssignmentItem:
+    return DayAssignmentItem(
+        user_day_id=user_day_id, name="N L", telegram=None, position=position, hall=None
+    )
+
+
+def emitted(sio: MagicMock) -> list[tuple[dict[str, Any], list[str]]]:
+    return [(c.args[1], c.kwargs["room"]) for c in sio.emit.call_args_list]
+
+
+def dumped(*events: AssignmentEvent) -> list[dict[str, Any]]:
+    return [event.dump() for event in events]
+
+
+async def test_events_delivered_together_are_merged_per_day() -> None:
+    sio = make_sio()
+    broadcaster = AssignmentBroadcaster(sio)
+
+    await broadcaster.deliver(
+        dumped(
+            AssignmentEvent(1, "created", 5, True, [item(10)]),
+            # Committed late, but happened before the previous event
+            AssignmentEvent(1, "created", 4, True, [item(11)]),
+            AssignmentEvent(1, "updated", 6, True, [item(10, "Hall")]),
+            AssignmentEvent(1, "deleted", 7, True, deleted=[11]),
+            AssignmentEvent(2, "created", 1, True, [item(20)]),
+        )
+    )
+
+    assert emitted(sio) == [
+        (
+            {
+                "type": "changed",
+                "day_id": 1,
+                "base_version": 3,
+                "version": 7,
+                "published": True,
+                "assignments": [item(10, "Hall").model_dump()],
+                "deleted": [11],
+                "user_day_ids": [10, 11],
+            },
+            [ADMIN_ROOM, PUBLIC_ROOM],
+        ),
+        (
+            {
+                "type": "created",
+                "day_id": 2,
+                "base_version": 0,
+                "version": 1,
+                "published": True,
+                "assignments": [item(20).model_dump()],
+                "deleted": [],
+                "user_day_ids": [20],
+            },
+            ["day_assignments_2_admin", "day_assignments_2"],
+        ),
+    ]
+
+
+async def test_events_are_not_merged_across_missing_versions() -> None:
+    sio = make_sio()
+    broadcaster = AssignmentBroadcaster(sio)
+
+    # Version 2 was broadcast by another worker
+    await broadcaster.deliver(
+        dumped(
+            AssignmentEvent(1, "created", 1, True, [item(10)]),
+            AssignmentEvent(1, "created", 3, True, [item(11)]),
+        )
+    )
+
+    assert [(p["base_version"], p["version"]) for p, _ in emitted(sio)] == [(0, 1), (2, 3)]
+
+
+async def test_unpublished_changes_are_sent_to_admins_only() -> None:
+    sio = make_sio()
+    broadcaster = AssignmentBroadcaster(sio)
+
+    await broadcaster.deliver(
+        dumped(
+            AssignmentEvent(1, "created", 1, False, [item(10)]),
+            AssignmentEvent(1, "published", 1, True),
+            AssignmentEvent(1, "updated", 2, True, [item(10, "Hall")]),
+        )
+    )
+
+    admin, public = emitted(sio)
+    assert admin[1] == [ADMIN_ROOM]
+    assert (admin[0]["type"], admin[0]["base_version"], admin[0]["version"]) == ("changed", 0, 2)
+    assert public[1] == [PUBLIC_ROOM]
+    assert (public[0]["base_version"], public[0]["version"]) == (1, 2)
+    assert public[0]["published"]
+    assert public[0]["assignments"] == [item(10, "Hall").model_dump()]
+
+
+def make_history(
+    version: int, published: bool = True, max_events: int = 10
+) -> tuple[AssignmentHistory, AssignmentBroadcaster, MagicMock]:
+    """History fed by a broadcaster, as in the app, of a day at ``version``."""
+    year_service = MagicMock()
+    year_service.get_day_by_id = AsyncMock(
+        return_value=Day(id=1, assignment_version=version, assignment_published=published)
+    )
+    history = AssignmentHistory(year_service, max_events=max_events, max_days=10)
+    manager = PgPubSubManager()
+    manager.on_emit("assignment_updated", history.record)
+    broadcaster = AssignmentBroadcaster(socketio.AsyncServer(client_manager=manager))
+    return history, broadcaster, year_service
+
+
+async def test_resume_sends_missed_events() -> None:
+    history, broadcaster, _ = make_history(version=3)
+    for version in (1, 2, 3):
+        await broadcaster.deliver(
+            dumped(AssignmentEvent(1, "created", version, True, [item(version)]))
+        )
+
+    resumed = await history.resume(1, admin=False, version=1, published=True)
+    assert resumed is not None
+    assert [event["version"] for event in resumed["events"]] == [2, 3]
+    assert await history.resume(1, admin=True, version=3, published=True) == {"events": []}
+
+
+async def test_resume_sends_snapshot_when_events_are_missing() -> None:
+    history, broadcaster, year_service = make_history(version=4, max_events=2)
+    loaded = asyncio.Event()
+
+    async def get_all_assignments_by_day_id(day_id: int) -> list[UserDay]:
+        await loaded.wait()
+        return []
+
+    year_service.get_all_assignments_by_day_id = AsyncMock(
+        side_effect=get_all_assignments_by_day_id
+    )
+    for version in (1, 2, 3):
+        await broadcaster.deliver(
+            dumped(AssignmentEvent(1, "created", version, True, [item(version)]))
+        )
+
+    # Version 1 is no longer kept and version 4 was not received
+    resumes = [
+        asyncio.create_task(history.resume(1, admin=False, version=version, published=True))
+        for version in (0, 0, 3)
+    ]
+    await asyncio.sleep(0)
+    loaded.set()
+    snapshot = {"snapshot": {"version": 4, "published": True, "assignments": []}}
+    assert await asyncio.gather(*resumes) == [snapshot] * 3
+    # Clients reconnecting together share one snapshot
+    year_service.get_all_assignments_by_day_id.assert_awaited_once_with(1)
+
+    # A client whose copy was published differently needs a snapshot too
+    assert await history.resume(1, admin=False, version=4, published=False) == snapshot
+
+
+async def test_resume_hides_unpublished_assignments() -> None:
+    history, broadcaster, year_service = make_history(version=1, published=False)
+    await broadcaster.deliver(dumped(AssignmentEvent(1, "created", 1, False, [item(1)])))
+
+    assert await history.resume(1, admin=False, version=0, published=True) == {
+        "snapshot": {"version": 1, "published": False, "assignments": []}
+    }
+    resumed = await history.resume(1, admin=True, version=0, published=False)
+    assert resumed is not None
+    assert [event["version"] for event in resumed["events"]] == [1]
+
+
+@pytest.mark.postgres
+async def test_events_too_large_to_publish_reach_other_workers_as_refetch(
+    pg_engine: AsyncEngine, pg_session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    listener = PgPubSub(pg_engine)
+    published: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    listener.subscribe("socketio", lambda message: published.put_nowait(json.loads(message)))
+    await listener.start()
+    await asyncio.wait_for(listener.connected.wait(), 5)
+
+    emitter = PgPubSubManager(write_only=True)
+    emitter.bind(PgPubSub(pg_engine), pg_session_factory)
+    emitter.on_oversized_emit("assignment_updated", refetch_event)
+    local: list[dict[str, Any]] = []
+    emitter.on_emit("assignment_updated", lambda data, rooms: local.append(data))
+    broadcaster = AssignmentBroadcaster(socketio.AsyncServer(client_manager=emitter))
+    try:
+        # A copied day with a few dozen assignments is over the 8000 bytes of a NOTIFY
+        items = [item(user_day_id, position="Гардероб" * 5) for user_day_id in range(60)]
+        assert len(json.dumps([i.model_dump() for i in items])) > 8000
+        await broadcaster.deliver(dumped(AssignmentEvent(1, "bulk_created", 3, True, items)))
+        await broadcaster.deliver(dumped(AssignmentEvent(1, "created", 4, True, [item(100)])))
+
+        big = (await asyncio.wait_for(published.get(), 5))["data"]
+        small = (await asyncio.wait_for(published.get(), 5))["data"]
+    finally:
+        await listener.stop()
+
+    assert (big["type"], big["base_version"], big["version"]) == ("refetch", 2, 3)
+    assert (big["assignments"], big["user_day_ids"]) == ([], [])
+    assert small["type"] == "created"
+    assert small["assignments"] == [item(100).model_dump()]
+    # Clients of the emitting worker still get the changes
+    assert len(local[0]["assignments"]) == 60
+
+    # Other workers cannot resume across the refetch, so they send snapshots
+    history, _, _ = make_history(version=4)
+    history.record(big, [ADMIN_ROOM, PUBLIC_ROOM])
+    history.record(small, [ADMIN_ROOM, PUBLIC_ROOM])
+    assert history.events_since(1, False, 2, 4) is None
+    assert history.events_since(1, False, 3, 4) == [small]
+
+
+@pytest.mark.postgres
+async def test_year_service_broadcasts_versioned_changes(
+    pg_engine: AsyncEngine,
+    pg_session_factory: async_sessionmaker[AsyncSession],
+    year_service: YearService,
+) -> None:
+    sio = make_sio()
+
+    async with pg_session_factory() as session:
+        source, target = (Day(name=n, information="") for n in "st")
+        position = Position(name="Cloakroom", has_halls=True)
+        hall = Hall(name="Main")
+        seeded = await seed_year(
+            session, days=[source, target], positions=[position], halls=[hall], users=1
+        )
+        [user], [form] = seeded.users, seeded.forms
+        await session.commit()
+
+    user_day = await year_service.add_user_day(
+        UserDayIn(
+            application_form_id=form.id,
+            day_id=source.id,
+            information="",
+            attendance="unknown",
+            position_id=position.id,
+        ),
+        author=user,
+    )
+    await year_service.edit_user_day_by_user_day_id(
+        user_day.id,
+        UserDayEditIn(information=None, attendance=None, position_id=position.id, hall_id=hall.id),
+        author=user,
+    )
+    await year_service.edit_day_by_day_id(
+        source.id,
+        DayEditIn(
+            name=None, information=None, score=None, mandatory=None, assignment_published=True
+        ),
+    )
+    assert await year_service.copy_assignments_from_day(source.id, [target.id]) == 1
+    await year_service.delete_user_day_by_user_day_id(user_day.id, author=user)
+
+    # One event at a time, so that they are not merged
+    dispatcher = OutboxDispatcher(
+        pg_session_factory, PgPubSub(pg_engine), batch_size=1, poll_interval=60
+    )
+    notifications: list[str] = []
+    dispatcher.register(NOTIFICATIONS, AsyncMock(side_effect=notifications.extend))
+    dispatcher.register(ASSIGNMENT_EVENTS, AssignmentBroadcaster(sio).deliver)
+    for kind in (NOTIFICATIONS, ASSIGNMENT_EVENTS):
+        while await dispatcher.dispatch(kind):
+            pass
+    assert [n.splitlines()[1] for n in notifications] == [
+        "(unassigned) -> Cloakroom ",
+        "Cloakroom  -> Cloakroom Main",
+        "Cloakroom Main -> (unassigned)",
+    ]
+
+    created, updated, published, copied, deleted = (payload for payload, _ in emitted(sio))
+    expected = DayAssignmentItem(
+        user_day_id=user_day.id, name="N 0", telegram="n0", position="Cloakroom", hall=None
+    )
+    assert created["assignments"] == [expected.model_dump()]
+    assert (created["version"], created["published"]) == (1, False)
+    assert updated["assignments"] == [expected.model_copy(update={"hall": "Main"}).model_dump()]
+    assert updated["version"] == 2
+    assert (published["type"], published["version"], published["published"]) == (
+        "published",
+        2,
+        True,
+    )
+    assert copied["day_id"] == target.id
+    assert copied["version"] == 1
+    assert [a["hall"] for a in copied["assignments"]] == ["Main"]
+    assert (deleted["version"], deleted["deleted"]) == (3, [user_day.id])
+
+    day = await year_service.get_day_by_id(source.id)
+    assert day is not None
+    assert day.assignment_version == 3
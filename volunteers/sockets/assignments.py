@@ -1,18 +1,80 @@
-"""WebSocket handlers for assignment updates."""
+"""WebSocket handlers for assignment updates.
 
-from typing import Any
+Clients subscribe to a day and receive ``assignment_updated`` events carrying the
+changes themselves, so that they can update their copy of the day's assignments
+without refetching it::
+
+    {
+        "type": "created",  # or updated, deleted, bulk_created, published, unpublished,
+                            # or changed when updates of several types were merged
+        "day_id": 1,
+        "base_version": 4,  # the changes apply on top of this assignment_version
+        "version": 5,  # assignment_version of the day after the changes
+        "published": True,  # assignment_published of the day after the changes
+        "assignments": [...],  # DayAssignmentItem of every created or updated user day
+        "deleted": [...],  # ids of deleted user days
+        "user_day_ids": [...],  # ids of all changed user days
+    }
+
+A client whose copy is at ``base_version`` applies the changes, one already at
+``version`` or later ignores the event, and any other client refetches the day, as
+it does when ``published`` differs from what it has. Events too large to pass
+between workers reach the clients of other workers as type ``refetch``, without
+the changes, so every client older than ``version`` refetches the day. Admins see every change;
+other users see the changes of published days only.
+
+A client that already has a copy, e.g. after reconnecting, subscribes with its
+``last_version`` and ``published``; the acknowledgement then brings it up to date
+with either the ``events`` it missed or a ``snapshot`` of the day::
+
+    {"snapshot": {"version": 7, "published": True, "assignments": [...]}}
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Any
 
 import socketio  # type: ignore[import-untyped]
+from fastapi import HTTPException
 from loguru import logger
 
+from volunteers.models import Day
+from volunteers.schemas.day_assignment import (
+    AssignmentEvent,
+    DayAssignmentItem,
+    day_assignment_item,
+)
+
+if TYPE_CHECKING:
+    from volunteers.services.user import UserService
+    from volunteers.services.year import YearService
+
+
+def day_room(day_id: int, admin: bool) -> str:
+    """Admins get their own room, as they also see unpublished assignments."""
+    return f"day_assignments_{day_id}_admin" if admin else f"day_assignments_{day_id}"
+
 
-async def register_assignment_handlers(sio: socketio.AsyncServer) -> None:
+async def register_assignment_handlers(
+    sio: socketio.AsyncServer, user_service: "UserService", history: "AssignmentHistory"
+) -> None:
     """Register all assignment-related socket handlers."""
 
     @sio.event  # type: ignore[misc]
-    async def connect(sid: str, environ: dict[str, Any]) -> None:
-        """Handle client connection."""
-        logger.info(f"Client connected: {sid}")
+    async def connect(sid: str, environ: dict[str, Any], auth: Any = None) -> None:
+        """Handle client connection, authenticated with an access token like the API."""
+        # Imported here as the token helpers depend on the container, which imports us
+        from volunteers.auth.jwt_tokens import verify_access_token
+
+        token = auth.get("token") if isinstance(auth, dict) else None
+        if not isinstance(token, str):
+            raise socketio.exceptions.ConnectionRefusedError("Unauthorized")
+        try:
+            payload = await verify_access_token(token)
+        except HTTPException as e:
+            raise socketio.exceptions.ConnectionRefusedError("Unauthorized") from e
+        await sio.save_session(sid, {"user_id": payload.user_id})
+        logger.info(f"Client connected: {sid}, user {payload.user_id}")
 
     @sio.event  # type: ignore[misc]
     async def disconnect(sid: str) -> None:
@@ -20,17 +82,31 @@ async def register_assignment_handlers(sio: socketio.AsyncServer) -> None:
         logger.info(f"Client disconnected: {sid}")
 
     @sio.on("subscribe_day_assignments")  # type: ignore[misc]
-    async def handle_subscribe(sid: str, data: dict[str, Any]) -> None:
-        """Subscribe to assignment updates for a specific day."""
+    async def handle_subscribe(sid: str, data: dict[str, Any]) -> dict[str, Any] | None:
+        """Subscribe to assignment updates for a specific day, resuming from ``last_version``."""
         day_id = data.get("day_id")
         if not day_id:
             logger.warning(f"Client {sid} tried to subscribe without day_id")
-            return
+            return None
 
-        room = f"day_assignments_{day_id}"
+        session = await sio.get_session(sid)
+        user = await user_service.get_user_by_id_cached(session["user_id"])
+        if user is None:
+            logger.warning(f"Client {sid} of a deleted user tried to subscribe")
+            return None
+
+        # Joined first, so that no event falls between the resume and the room
+        room = day_room(day_id, admin=user.is_admin)
         await sio.enter_room(sid, room)
         logger.info(f"Client {sid} subscribed to {room}")
 
+        last_version = data.get("last_version")
+        if not isinstance(last_version, int):
+            return None
+        return await history.resume(
+            day_id, user.is_admin, last_version, published=bool(data.get("published"))
+        )
+
     @sio.on("unsubscribe_day_assignments")  # type: ignore[misc]
     async def handle_unsubscribe(sid: str, data: dict[str, Any]) -> None:
         """Unsubscribe from assignment updates for a specific day."""
@@ -39,30 +115,184 @@ async def register_assignment_handlers(sio: socketio.AsyncServer) -> None:
             logger.warning(f"Client {sid} tried to unsubscribe without day_id")
             return
 
-        room = f"day_assignments_{day_id}"
-        await sio.leave_room(sid, room)
-        logger.info(f"Client {sid} unsubscribed from {room}")
+        for admin in (False, True):
+            await sio.leave_room(sid, day_room(day_id, admin))
+        logger.info(f"Client {sid} unsubscribed from day {day_id}")
 
 
-async def broadcast_assignment_update(
-    sio: socketio.AsyncServer,
-    day_id: int,
-    event_type: str,
-    assignment_data: dict[str, Any] | None = None,
-) -> None:
+def _contiguous_runs(events: list[AssignmentEvent]) -> list[list[AssignmentEvent]]:
+    """Split events sorted by version where versions are missing.
+
+    Missing versions were handled by other workers or are hidden from the room; a
+    merged event must not skip them, or clients would take them for applied.
+    """
+    runs: list[list[AssignmentEvent]] = []
+    for event in events:
+        if runs and runs[-1][-1].version == event.base_version:
+            runs[-1].append(event)
+        else:
+            runs.append([event])
+    return runs
+
+
+def _merge(events: list[AssignmentEvent]) -> dict[str, Any]:
+    """Payload of one ``assignment_updated`` event with the net effect of ``events``."""
+    # Later changes of a user day replace earlier ones; None marks a deletion
+    changes: dict[int, DayAssignmentItem | None] = {}
+    for event in events:
+        for item in event.assignments:
+            changes[item.user_day_id] = item
+        for user_day_id in event.deleted:
+            changes[user_day_id] = None
+    types = {event.type for event in events}
+    return {
+        "type": types.pop() if len(types) == 1 else "changed",
+        "day_id": events[0].day_id,
+        "base_version": events[0].base_version,
+        "version": events[-1].version,
+        "published": events[-1].published,
+        "assignments": [item.model_dump() for item in changes.values() if item is not None],
+        "deleted": [user_day_id for user_day_id, item in changes.items() if item is None],
+        "user_day_ids": sorted(changes),
+    }
+
+
+def refetch_event(payload: dict[str, Any]) -> dict[str, Any]:
+    """The ``assignment_updated`` payload without its changes, which must be refetched."""
+    return {
+        **payload,
+        "type": "refetch",
+        "assignments": [],
+        "deleted": [],
+        "user_day_ids": [],
+    }
+
+
+class AssignmentBroadcaster:
+    """Broadcasts the assignment events delivered by the outbox to the rooms of their days.
+
+    The events of a day delivered together are merged into as few events as possible,
+    so clients apply one update instead of many.
     """
-    Broadcast assignment update to all clients subscribed to the day.
 
-    Args:
-        sio: SocketIO server instance
-        day_id: ID of the day whose assignments changed
-        event_type: Type of event ('created', 'updated', 'deleted', 'published')
-        assignment_data: Optional assignment data to send with the event
+    def __init__(self, sio: socketio.AsyncServer) -> None:
+        self.sio = sio
+
+    async def deliver(self, events: list[dict[str, Any]]) -> None:
+        """Broadcast the dumped ``events`` now, merged as far as possible."""
+        days: dict[int, list[AssignmentEvent]] = {}
+        for data in events:
+            event = AssignmentEvent.load(data)
+            days.setdefault(event.day_id, []).append(event)
+        for day_id, day_events in days.items():
+            await self._broadcast(day_id, day_events)
+
+    async def _broadcast(self, day_id: int, events: list[AssignmentEvent]) -> None:
+        events = sorted(events, key=lambda event: (event.version, event.base_version))
+        public = [event for event in events if event.public]
+        admin_room, public_room = day_room(day_id, admin=True), day_room(day_id, admin=False)
+        if len(public) == len(events):
+            await self._emit(events, [admin_room, public_room])
+        else:
+            await self._emit(events, [admin_room])
+            await self._emit(public, [public_room])
+
+    async def _emit(self, events: list[AssignmentEvent], rooms: list[str]) -> None:
+        for run in _contiguous_runs(events):
+            await self.sio.emit("assignment_updated", _merge(run), room=rooms)
+            logger.info(f"Broadcasted {len(run)} assignment updates to {', '.join(rooms)}")
+
+
+class AssignmentHistory:
+    """Recent ``assignment_updated`` events of each day, to resume subscriptions.
+
+    Keeps the last ``max_events`` events of the admin and the public room of the
+    ``max_days`` most recently updated days, whichever worker emitted them. Clients
+    that missed more get a snapshot, which is loaded once per day version however
+    many clients reconnect at the same time.
     """
-    room = f"day_assignments_{day_id}"
-    await sio.emit(
-        "assignment_updated",
-        {"type": event_type, "day_id": day_id, "assignment": assignment_data},
-        room=room,
-    )
-    logger.info(f"Broadcasted {event_type} event to room {room}")
+
+    def __init__(self, year_service: "YearService", max_events: int, max_days: int) -> None:
+        self.year_service = year_service
+        self.max_events = max_events
+        self.max_days = max_days
+        self._events: OrderedDict[tuple[int, bool], deque[dict[str, Any]]] = OrderedDict()
+        self._snapshots: OrderedDict[int, tuple[tuple[int, bool], asyncio.Task[dict[str, Any]]]] = (
+            OrderedDict()
+        )
+
+    def record(self, payload: dict[str, Any], rooms: str | list[str] | None) -> None:
+        day_id = payload["day_id"]
+        for room in [rooms] if isinstance(rooms, str) else rooms or []:
+            for admin in (False, True):
+                if room != day_room(day_id, admin):
+                    continue
+                events = self._events.pop((day_id, admin), None)
+                if events is None:
+                    events = deque(maxlen=self.max_events)
+                events.append(payload)
+                self._events[(day_id, admin)] = events
+        while len(self._events) > 2 * self.max_days:
+            self._events.popitem(last=False)
+
+    def events_since(
+        self, day_id: int, admin: bool, version: int, current_version: int
+    ) -> list[dict[str, Any]] | None:
+        """Events bringing a copy at ``version`` to ``current_version``, if all are kept."""
+        events = sorted(
+            self._events.get((day_id, admin), ()),
+            key=lambda event: (event["version"], event["base_version"]),
+        )
+        missed = []
+        for event in events:
+            if event["version"] <= version:
+                continue
+            if event["base_version"] > version or event["type"] == "refetch":
+                return None
+            missed.append(event)
+            version = event["version"]
+        return missed if version >= current_version else None
+
+    async def resume(
+        self, day_id: int, admin: bool, version: int, published: bool
+    ) -> dict[str, Any] | None:
+        day = await self.year_service.get_day_by_id(day_id)
+        if day is None:
+            return None
+        if day.assignment_published == published:
+            events = self.events_since(day_id, admin, version, day.assignment_version)
+            if events is not None:
+                return {"events": events}
+        if not (admin or day.assignment_published):
+            return {
+                "snapshot": {
+                    "version": day.assignment_version,
+                    "published": False,
+                    "assignments": [],
+                }
+            }
+        return {"snapshot": await self._snapshot(day)}
+
+    async def _snapshot(self, day: Day) -> dict[str, Any]:
+        state = (day.assignment_version, day.assignment_published)
+        cached = self._snapshots.pop(day.id, None)
+        if cached is None or cached[0] != state:
+            cached = (state, asyncio.create_task(self._load_snapshot(day)))
+        self._snapshots[day.id] = cached
+        while len(self._snapshots) > self.max_days:
+            self._snapshots.popitem(last=False)
+        try:
+            return await asyncio.shield(cached[1])
+        except Exception:
+            if self._snapshots.get(day.id) is cached:
+                del self._snapshots[day.id]
+            raise
+
+    async def _load_snapshot(self, day: Day) -> dict[str, Any]:
+        # The version was read before the assignments, so the snapshot is at least as new
+        assignments = await self.year_service.get_all_assignments_by_day_id(day.id)
+        return {
+            "version": day.assignment_version,
+            "published": day.assignment_published,
+            "assignments": [day_assignment_item(a).model_dump() for a in assignments],
+        }